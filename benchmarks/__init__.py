@@ -0,0 +1 @@
+"""Performance benchmarks for the Zomato AI service (not part of the default test run)."""
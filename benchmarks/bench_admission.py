@@ -0,0 +1,98 @@
+"""
+Goodput under overload with and without endpoint admission control.
+
+Usage (from the project root):
+
+    PYTHONPATH=src:. python benchmarks/bench_admission.py [--service-ms 10] [--duration 5]
+
+A simulated handler holds one shared lock for `--service-ms` on a worker
+thread, so the backend serves at most 1000 / service-ms requests/s however
+many threads are waiting. Requests arrive open-loop at 1x, 2x and 3x that
+capacity. Goodput counts responses that finish within the client timeout;
+without admission control the threadpool queue grows until almost every
+request misses it, while shed requests fail fast and keep goodput flat.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+import anyio.to_thread
+
+from zomato_ai.phase2.admission import AdmissionController, AdmissionLimits, AdmissionRejected
+
+
+async def run_load(
+    controller: Optional[AdmissionController],
+    *,
+    rate: float,
+    service_s: float,
+    duration: float,
+    client_timeout: float,
+) -> Dict[str, float]:
+    backend = threading.Lock()
+    counts = {"good": 0, "late": 0, "shed": 0}
+
+    def handler() -> None:
+        with backend:
+            time.sleep(service_s)
+
+    async def request() -> None:
+        started = time.perf_counter()
+        try:
+            if controller is None:
+                await anyio.to_thread.run_sync(handler)
+            else:
+                async with controller.admit():
+                    await anyio.to_thread.run_sync(handler)
+        except AdmissionRejected:
+            counts["shed"] += 1
+            return
+        counts["good" if time.perf_counter() - started <= client_timeout else "late"] += 1
+
+    tasks = []
+    deadline = time.perf_counter() + duration
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        tasks.append(asyncio.create_task(request()))
+        next_arrival += 1 / rate
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+    await asyncio.gather(*tasks)
+    return {key: value / duration for key, value in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--service-ms", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--client-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    service_s = args.service_ms / 1000
+    capacity = 1 / service_s
+    limits = AdmissionLimits(max_in_flight=2, max_queue=8, queue_timeout=0.2)
+    print(f"capacity {capacity:.0f} req/s, client timeout {args.client_timeout:g}s, admission {limits}")
+    print(f"{'load':<5} {'controller':<11} {'goodput/s':>10} {'late/s':>8} {'shed/s':>8}")
+    for multiple in (1, 2, 3):
+        for label in ("none", "admission"):
+            controller = AdmissionController("bench", limits) if label == "admission" else None
+            result = asyncio.run(
+                run_load(
+                    controller,
+                    rate=capacity * multiple,
+                    service_s=service_s,
+                    duration=args.duration,
+                    client_timeout=args.client_timeout,
+                )
+            )
+            print(
+                f"{multiple}x{'':<3} {label:<11} {result['good']:>10.1f} {result['late']:>8.1f} {result['shed']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
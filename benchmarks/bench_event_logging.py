@@ -0,0 +1,75 @@
+"""
+Per-event overhead of recommendation event logging.
+
+Usage (from the project root):
+
+    PYTHONPATH=src:. python benchmarks/bench_event_logging.py [--events 2000]
+
+Compares, on a file-backed SQLite database:
+  * per-call schema check + single-row insert (the previous behaviour),
+  * single-row insert against a bootstrapped schema,
+  * queueing onto the background batched writer (request-path cost only).
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from zomato_ai.data.migrations import bootstrap_schema
+from zomato_ai.phase4.event_writer import start_event_writer, stop_event_writer
+from zomato_ai.phase4.events import create_schema, log_recommendation_event
+
+PREFS = {"location": "BTM", "min_rating": 4.0, "preferred_cuisines": ["North Indian"], "limit": 5}
+
+
+def _log(engine) -> None:
+    log_recommendation_event(
+        engine=engine,
+        endpoint="/recommendations/pipeline",
+        preferences=PREFS,
+        candidate_count=15,
+        returned_count=5,
+    )
+
+
+def _per_event_us(n: int, fn) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", future=True)
+        bootstrap_schema(engine)
+
+        def legacy() -> None:
+            create_schema(engine)
+            _log(engine)
+
+        results = {
+            "schema check + insert (before)": _per_event_us(args.events, legacy),
+            "insert only (bootstrapped)": _per_event_us(args.events, lambda: _log(engine)),
+        }
+
+        writer = start_event_writer(engine)
+        results["background queue (request path)"] = _per_event_us(args.events, lambda: _log(engine))
+        writer.flush(timeout=30)
+        stop_event_writer(engine)
+
+    for label, us in results.items():
+        print(f"{label:<34} {us:>10.1f} us/event")
+
+
+if __name__ == "__main__":
+    main()
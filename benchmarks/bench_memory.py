@@ -0,0 +1,72 @@
+"""
+Report resident memory per restaurant: `fetch_all_restaurants` rows vs `RestaurantStore`.
+
+Usage (from the project root):
+
+    PYTHONPATH=src:. python benchmarks/bench_memory.py [--rows 100000]
+
+Each representation is loaded from the same SQLite file while `tracemalloc`
+is tracing; the figure is the memory still held once loading finishes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import pathlib
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from benchmarks.synthetic import iter_raw_rows
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.repository import fetch_all_restaurants, fetch_restaurant_store
+
+
+def retained_bytes(load: Callable[[], Any]) -> int:
+    """Bytes allocated by `load()` that are still alive while its result is held."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = load()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def measure(engine: Engine) -> Dict[str, float]:
+    """Per-restaurant bytes for each representation, plus their ratio."""
+    # Warm SQLAlchemy's statement cache so it is not charged to either side.
+    count = len(fetch_all_restaurants(engine))
+    fetch_restaurant_store(engine)
+    rows = retained_bytes(lambda: fetch_all_restaurants(engine)) / count
+    store = retained_bytes(lambda: fetch_restaurant_store(engine)) / count
+    return {"restaurants": count, "row_mappings": rows, "store": store, "ratio": rows / store}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{pathlib.Path(tmp) / 'bench.db'}", future=True)
+        ingest_records(engine, iter_raw_rows(args.rows))
+        result = measure(engine)
+        engine.dispose()
+
+    print(f"{result['restaurants']} restaurants")
+    print(f"  RowMapping list   {result['row_mappings']:>8.1f} bytes/restaurant")
+    print(f"  RestaurantStore   {result['store']:>8.1f} bytes/restaurant")
+    print(f"  reduction         {result['ratio']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
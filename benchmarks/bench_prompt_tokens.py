@@ -0,0 +1,71 @@
+"""
+Report LLM prompt size before/after compaction on representative queries.
+
+Usage (from the project root):
+
+    PYTHONPATH=src:. python benchmarks/bench_prompt_tokens.py [--rows 20000] [--budget 1200]
+
+Candidates come from `filter_restaurants` over a synthetic dataset, using the
+same pool size as the pipeline (max(limit * 3, 15)).
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.synthetic import iter_raw_rows
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.filtering import filter_restaurants
+from zomato_ai.phase2.models import UserPreference
+from zomato_ai.phase3.prompt_builder import build_recommendation_prompt, estimate_prompt_tokens
+
+QUERIES = {
+    "city+cuisine (limit 5)": UserPreference(location="BTM", preferred_cuisines=["North Indian"], limit=5),
+    "budget filter (limit 10)": UserPreference(max_price=800, min_rating=3.5, limit=10),
+    "multi-cuisine (limit 20)": UserPreference(
+        location="Koramangala", preferred_cuisines=["Chinese", "Italian", "Cafe"], limit=20
+    ),
+    "no filters (limit 50)": UserPreference(limit=50),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--budget", type=int, default=1_200)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    ingest_records(engine, iter_raw_rows(args.rows))
+
+    header = f"{'query':<26} {'cands':>5} {'verbose':>8} {'compact':>8} {'budget':>8} {'saved':>6} {'build ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for label, prefs in QUERIES.items():
+        pool = filter_restaurants(engine, prefs.model_copy(update={"limit": max(prefs.limit * 3, 15)}))
+        sizes = []
+        for kwargs in ({}, {"compact": True}, {"compact": True, "token_budget": args.budget}):
+            start = time.perf_counter()
+            system_prompt, user_prompt = build_recommendation_prompt(
+                preferences=prefs, candidates=pool, limit=prefs.limit, **kwargs
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            sizes.append(estimate_prompt_tokens(system_prompt, user_prompt))
+        saved = 1 - sizes[2] / sizes[0] if sizes[0] else 0.0
+        print(
+            f"{label:<26} {len(pool):>5} {sizes[0]:>8} {sizes[1]:>8} {sizes[2]:>8} "
+            f"{saved:>6.0%} {elapsed_ms:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
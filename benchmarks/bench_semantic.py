@@ -0,0 +1,99 @@
+"""
+Build time, query latency and recall of the free-text search index.
+
+Usage (from the project root):
+
+    PYTHONPATH=src:. python benchmarks/bench_semantic.py [--rows 100000] [--nprobe 16]
+
+Latency is `SemanticIndex.search` end to end (encoding the query included).
+Recall@50 compares the IVF top 50 against an exact scan of every vector, so
+it measures only what the partitioning loses, not the encoder's relevance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from benchmarks.synthetic import CUISINES, LOCATIONS, iter_raw_rows
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.repository import fetch_restaurant_store
+from zomato_ai.phase2.semantic import EXACT_SEARCH_MAX, MIN_SIMILARITY, SemanticIndex
+
+FREE_TEXT = ["spicy", "rooftop", "quiet", "family", "late night", "cheap", "tandoor", "wok", "cafe", "dhaba"]
+
+
+def make_queries(n: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join([rng.choice(FREE_TEXT), rng.choice(CUISINES)] + ([rng.choice(LOCATIONS)] if rng.random() < 0.3 else []))
+        for _ in range(n)
+    ]
+
+
+def measure(index: SemanticIndex, queries: List[str], nprobe: int) -> Dict[str, float]:
+    latencies = []
+    recalls = []
+    for query in queries:
+        started = time.perf_counter()
+        ids, _ = index.search(query, k=50, nprobe=nprobe)
+        latencies.append(time.perf_counter() - started)
+
+        sims = np.asarray(index.vectors @ index.encoder.encode(query))
+        exact = index.ids[np.argsort(-sims, kind="stable")[:50]]
+        exact = exact[np.sort(sims)[::-1][:50] >= MIN_SIMILARITY]
+        if len(exact):
+            recalls.append(len(set(ids.tolist()) & set(exact.tolist())) / len(exact))
+
+    candidates = index.ids[: min(EXACT_SEARCH_MAX, len(index))].tolist()
+    started = time.perf_counter()
+    for query in queries[:100]:
+        index.similarities(query, candidates)
+    exact_ms = (time.perf_counter() - started) / min(100, len(queries)) * 1000
+
+    ms = np.array(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "recall_at_50": float(np.mean(recalls)) if recalls else 1.0,
+        "exact_candidates_ms": exact_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{pathlib.Path(tmp) / 'bench.db'}", future=True)
+        ingest_records(engine, iter_raw_rows(args.rows))
+        store = fetch_restaurant_store(engine)
+        engine.dispose()
+
+        started = time.perf_counter()
+        index = SemanticIndex.from_store(store)
+        build_s = time.perf_counter() - started
+        index.save(pathlib.Path(tmp) / "index")
+        index = SemanticIndex.load(pathlib.Path(tmp) / "index")
+        result = measure(index, make_queries(args.queries), args.nprobe)
+
+    print(f"{len(index)} restaurants, {len(index.centroids)} partitions, nprobe {args.nprobe}")
+    print(f"  build             {build_s:>8.2f} s")
+    print(f"  search p50        {result['p50_ms']:>8.2f} ms")
+    print(f"  search p99        {result['p99_ms']:>8.2f} ms")
+    print(f"  recall@50         {result['recall_at_50']:>8.3f}")
+    print(f"  exact, {EXACT_SEARCH_MAX} ids  {result['exact_candidates_ms']:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
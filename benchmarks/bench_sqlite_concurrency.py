@@ -0,0 +1,122 @@
+"""
+Mixed read/write SQLite benchmark: default engine vs. the tuned WAL engine pair.
+
+Usage (from the project root):
+
+    PYTHONPATH=src:. python benchmarks/bench_sqlite_concurrency.py [--rows 50000] [--readers 8] [--duration 10]
+
+Reader threads run `filter_restaurants` (a full-table read) in a loop while
+one writer thread inserts analytics events inline, as
+ZOMATO_EVENT_WRITER=sync does. Each configuration runs against its own copy
+of the same database file. The report covers reads/s, read latency
+percentiles, writes/s and failed operations (e.g. "database is locked").
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from benchmarks.synthetic import LOCATIONS, iter_raw_rows
+from zomato_ai.data.engines import create_engine_pair
+from zomato_ai.data.migrations import bootstrap_schema
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.filtering import filter_restaurants
+from zomato_ai.phase2.models import UserPreference
+from zomato_ai.phase4.events import log_recommendation_event
+
+
+def run_mixed(engine: Engine, *, readers: int, duration: float) -> Dict[str, float]:
+    deadline = time.monotonic() + duration
+    read_latencies: List[float] = []
+    counts = {"writes": 0, "read_errors": 0, "write_errors": 0}
+    lock = threading.Lock()
+
+    def reader(n: int) -> None:
+        prefs = UserPreference(location=LOCATIONS[n % len(LOCATIONS)], limit=10)
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                filter_restaurants(engine, prefs)
+            except Exception:
+                with lock:
+                    counts["read_errors"] += 1
+                continue
+            with lock:
+                read_latencies.append(time.perf_counter() - started)
+
+    def writer() -> None:
+        while time.monotonic() < deadline:
+            try:
+                log_recommendation_event(
+                    engine=engine,
+                    endpoint="/bench",
+                    preferences={"location": "BTM"},
+                    candidate_count=10,
+                    returned_count=5,
+                )
+            except Exception:
+                counts["write_errors"] += 1
+                continue
+            counts["writes"] += 1
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ordered = sorted(read_latencies)
+    return {
+        "reads_per_s": len(ordered) / duration,
+        "read_p50_ms": statistics.median(ordered) * 1000 if ordered else 0.0,
+        "read_p95_ms": ordered[int(len(ordered) * 0.95)] * 1000 if ordered else 0.0,
+        "writes_per_s": counts["writes"] / duration,
+        "errors": counts["read_errors"] + counts["write_errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = pathlib.Path(tmp) / "base.db"
+        seed = create_engine(f"sqlite:///{base}", future=True)
+        ingest_records(seed, iter_raw_rows(args.rows))
+        seed.dispose()
+
+        results = {}
+        for label in ("default", "tuned"):
+            path = pathlib.Path(tmp) / f"{label}.db"
+            shutil.copy(base, path)
+            url = f"sqlite:///{path}"
+            engine = create_engine(url, future=True) if label == "default" else create_engine_pair(url).write
+            bootstrap_schema(engine)
+            results[label] = run_mixed(engine, readers=args.readers, duration=args.duration)
+            engine.dispose()
+
+    print(f"{args.rows} restaurants, {args.readers} readers + 1 writer, {args.duration:g}s each")
+    print(f"{'engine':<8} {'reads/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'writes/s':>9} {'errors':>7}")
+    for label, r in results.items():
+        print(
+            f"{label:<8} {r['reads_per_s']:>8.1f} {r['read_p50_ms']:>8.1f} {r['read_p95_ms']:>8.1f} "
+            f"{r['writes_per_s']:>9.1f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+pytest plumbing for the hot-path benchmark suite (benchmarks/test_bench_*.py).
+
+Run explicitly; `pytest.ini` only collects `tests/`:
+
+    pytest benchmarks -q --bench-rows 100000 --bench-save .benchmarks/main.json
+    pytest benchmarks -q --bench-compare .benchmarks/main.json --bench-threshold 0.25
+
+Each benchmark records min/median/mean over several rounds through the
+`bench` fixture. `--bench-save` writes every result to JSON; with
+`--bench-compare` the session fails if any median is more than
+`--bench-threshold` (a fraction) slower than the saved one.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("bench", "hot-path benchmarks")
+    group.addoption("--bench-rows", type=int, default=10_000, help="Synthetic restaurants (10k-1M).")
+    group.addoption("--bench-rounds", type=int, default=5, help="Timed rounds per benchmark.")
+    group.addoption("--bench-save", default=None, help="Write results to this JSON file.")
+    group.addoption("--bench-compare", default=None, help="Compare medians against this JSON file.")
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.2,
+        help="Allowed median slowdown vs. --bench-compare, as a fraction (0.2 = 20%%).",
+    )
+
+
+class BenchmarkRunner:
+    """Times a callable over several rounds and keeps the stats for the session report."""
+
+    def __init__(self, name: str, rounds: int, results: Dict[str, Dict[str, Any]]) -> None:
+        self.name = name
+        self.rounds = rounds
+        self._results = results
+
+    def __call__(self, fn: Callable[[], Any], *, rounds: int | None = None, warmup: int = 1) -> Any:
+        result = None
+        for _ in range(warmup):
+            result = fn()
+        timings: List[float] = []
+        for _ in range(rounds or self.rounds):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+        self._results[self.name] = {
+            "rounds": len(timings),
+            "min_s": min(timings),
+            "median_s": statistics.median(timings),
+            "mean_s": statistics.fmean(timings),
+        }
+        return result
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config._bench_results = {}  # type: ignore[attr-defined]
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> BenchmarkRunner:
+    results = request.config._bench_results  # type: ignore[attr-defined]
+    return BenchmarkRunner(request.node.name, request.config.getoption("--bench-rounds"), results)
+
+
+@pytest.fixture(scope="session")
+def bench_rows(request: pytest.FixtureRequest) -> int:
+    return request.config.getoption("--bench-rows")
+
+
+def _compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before or not before.get("median_s"):
+            continue
+        change = stats["median_s"] / before["median_s"] - 1
+        stats["change_vs_baseline"] = round(change, 4)
+        if change > threshold:
+            regressions.append(
+                f"{name}: median {stats['median_s'] * 1000:.2f}ms vs {before['median_s'] * 1000:.2f}ms "
+                f"(+{change:.0%}, threshold {threshold:.0%})"
+            )
+    return regressions
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    config = session.config
+    results = config._bench_results  # type: ignore[attr-defined]
+    if not results:
+        return
+
+    compare_path = config.getoption("--bench-compare")
+    regressions: List[str] = []
+    if compare_path:
+        baseline = json.loads(pathlib.Path(compare_path).read_text(encoding="utf-8"))
+        if baseline.get("rows") != config.getoption("--bench-rows"):
+            print(f"\nWARNING: baseline used {baseline.get('rows')} rows; comparing anyway.")
+        regressions = _compare(results, baseline, config.getoption("--bench-threshold"))
+
+    save_path = config.getoption("--bench-save")
+    if save_path:
+        path = pathlib.Path(save_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "rows": config.getoption("--bench-rows"),
+            "benchmarks": results,
+        }
+        path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+    if regressions:
+        print("\nBenchmark regressions:\n  " + "\n  ".join(regressions))
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    results = config._bench_results  # type: ignore[attr-defined]
+    if not results:
+        return
+    terminalreporter.section(f"benchmarks ({config.getoption('--bench-rows')} rows)")
+    for name, stats in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{name:<48} median {stats['median_s'] * 1000:>10.3f} ms   min {stats['min_s'] * 1000:>10.3f} ms"
+        )
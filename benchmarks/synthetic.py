@@ -0,0 +1,62 @@
+"""
+Synthetic Zomato-like restaurant data for benchmarks.
+
+Rows mimic the Hugging Face dataset (Bangalore localities, comma-separated
+cuisines, "1,500"-style costs and "4.1/5" ratings) with a skewed
+distribution so that a few localities and cuisines dominate, as in the
+real data.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Iterator, List
+
+LOCATIONS = [
+    "BTM", "HSR", "Koramangala 5th Block", "JP Nagar", "Whitefield", "Indiranagar",
+    "Jayanagar", "Marathahalli", "Bannerghatta Road", "Bellandur", "Electronic City",
+    "Sarjapur Road", "Ulsoor", "Brigade Road", "MG Road", "Banashankari", "Malleshwaram",
+    "Frazer Town", "Basavanagudi", "Kalyan Nagar", "Richmond Road", "Church Street",
+]
+
+CUISINES = [
+    "North Indian", "Chinese", "South Indian", "Fast Food", "Biryani", "Continental",
+    "Desserts", "Cafe", "Beverages", "Italian", "Street Food", "Bakery", "Pizza",
+    "Burger", "Andhra", "Mughlai", "Ice Cream", "Seafood", "Kerala", "Asian", "Thai",
+    "Momos", "Arabian", "Salad", "Healthy Food", "Japanese", "Mexican", "American",
+]
+
+_NAME_WORDS = [
+    "Spice", "Garden", "Kitchen", "Bistro", "Cafe", "House", "Grill", "Dhaba", "Corner",
+    "Express", "Palace", "Treat", "Bowl", "Tandoor", "Wok", "Bay", "Tales", "Table",
+]
+
+
+def _skewed_choice(rng: random.Random, items: List[str]) -> str:
+    # Rank-biased choice: item k is picked with probability ~ 1/(k+1).
+    weights = [1.0 / (k + 1) for k in range(len(items))]
+    return rng.choices(items, weights=weights, k=1)[0]
+
+
+def iter_raw_rows(n: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    """Yield `n` raw dataset-style rows (unique name+location)."""
+    rng = random.Random(seed)
+    for i in range(n):
+        cuisines: List[str] = []
+        for _ in range(rng.randint(1, 4)):
+            c = _skewed_choice(rng, CUISINES)
+            if c not in cuisines:
+                cuisines.append(c)
+        cost = rng.choice([200, 300, 400, 500, 600, 700, 800, 1000, 1200, 1500, 2000, 2500])
+        rating = rng.choice(["NEW", "-"]) if rng.random() < 0.1 else f"{rng.uniform(2.5, 4.9):.1f}/5"
+        yield {
+            "name": f"{rng.choice(_NAME_WORDS)} {rng.choice(_NAME_WORDS)} #{i}",
+            "location": _skewed_choice(rng, LOCATIONS),
+            "cuisines": ", ".join(cuisines),
+            "approx_cost(for two people)": f"{cost:,}",
+            "rate": rating,
+        }
+
+
+def make_raw_rows(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    return list(iter_raw_rows(n, seed))
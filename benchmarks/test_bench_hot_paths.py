@@ -0,0 +1,161 @@
+"""Hot-path benchmarks over a synthetic dataset; see benchmarks/conftest.py for options."""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks.bench_memory import measure as measure_memory
+from benchmarks.synthetic import LOCATIONS, make_raw_rows
+from zomato_ai.data.migrations import bootstrap_schema
+from zomato_ai.phase1.ingestion import ingest_records, normalize_row
+from zomato_ai.phase2.filtering import filter_restaurants
+from zomato_ai.phase2.models import UserPreference
+from zomato_ai.phase2.repository import fetch_all_restaurants, fetch_restaurant_store
+from zomato_ai.phase2.semantic import SemanticIndex
+from zomato_ai.phase3.parsing import parse_llm_result
+from zomato_ai.phase3.prompt_builder import build_recommendation_prompt
+from zomato_ai.phase4.dedup import dedup_rows_by_name_location, dedup_store_by_name_location
+
+# Representative mix: broad location-only, filtered, cuisine-heavy, free-text and empty.
+PREFERENCE_MIX = {
+    "location": UserPreference(location=LOCATIONS[0]),
+    "filtered": UserPreference(location=LOCATIONS[1], min_rating=4.0, max_price=800),
+    "cuisines": UserPreference(preferred_cuisines=["North Indian", "Chinese", "Biryani"], limit=20),
+    "query": UserPreference(query="spicy tandoor biryani", max_price=800),
+    "no_filters": UserPreference(),
+}
+
+
+@pytest.fixture(scope="session")
+def raw_rows(bench_rows: int) -> List[Dict[str, Any]]:
+    return make_raw_rows(bench_rows)
+
+
+@pytest.fixture(scope="session")
+def engine(tmp_path_factory, raw_rows):
+    db = tmp_path_factory.mktemp("bench") / "restaurants.db"
+    engine = create_engine(f"sqlite:///{db}", future=True)
+    ingest_records(engine, raw_rows)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def db_rows(engine):
+    return fetch_all_restaurants(engine)
+
+
+@pytest.fixture(scope="session")
+def semantic_index(engine):
+    return SemanticIndex.from_store(fetch_restaurant_store(engine))
+
+
+def test_normalize_row(bench, raw_rows):
+    sample = raw_rows[:10_000]
+    bench(lambda: [normalize_row(r) for r in sample])
+
+
+def test_ingest_records(bench, tmp_path_factory, raw_rows):
+    sample = raw_rows[:10_000]
+
+    def ingest() -> int:
+        db = tmp_path_factory.mktemp("ingest") / "ingest.db"
+        engine = create_engine(f"sqlite:///{db}", future=True)
+        bootstrap_schema(engine)
+        inserted = ingest_records(engine, sample)
+        engine.dispose()
+        return inserted
+
+    assert bench(ingest, rounds=3) == len(sample)
+
+
+def test_fetch_all_restaurants(bench, engine, raw_rows):
+    assert len(bench(lambda: fetch_all_restaurants(engine))) == len(raw_rows)
+
+
+def test_fetch_restaurant_store(bench, engine, raw_rows):
+    assert len(bench(lambda: fetch_restaurant_store(engine))) == len(raw_rows)
+
+
+def test_dedup_rows_by_name_location(bench, db_rows):
+    bench(lambda: dedup_rows_by_name_location(db_rows))
+
+
+def test_dedup_store_by_name_location(bench, engine):
+    store = fetch_restaurant_store(engine)
+    bench(lambda: dedup_store_by_name_location(store))
+
+
+def test_restaurant_store_memory(engine):
+    """The compact store must hold a restaurant in a fraction of a RowMapping's memory."""
+    result = measure_memory(engine)
+    assert result["ratio"] >= 4, result
+
+
+@pytest.mark.parametrize("shape", sorted(PREFERENCE_MIX))
+def test_filter_restaurants(bench, engine, shape):
+    bench(lambda: filter_restaurants(engine, PREFERENCE_MIX[shape]))
+
+
+def test_semantic_index_build(bench, engine, raw_rows):
+    store = fetch_restaurant_store(engine)
+    assert len(bench(lambda: SemanticIndex.from_store(store), rounds=3)) == len(raw_rows)
+
+
+def test_semantic_search(bench, semantic_index):
+    """Nearest-neighbour lookup must stay far below a request's latency budget."""
+    bench(lambda: semantic_index.search("quiet cafe desserts"), rounds=200)
+    started = time.perf_counter()
+    for _ in range(100):
+        semantic_index.search("spicy tandoor biryani")
+    assert (time.perf_counter() - started) / 100 < 0.010
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["verbose", "compact"])
+def test_build_recommendation_prompt(bench, engine, compact):
+    preferences = PREFERENCE_MIX["location"]
+    candidates = filter_restaurants(engine, preferences.model_copy(update={"limit": 30}))
+    bench(
+        lambda: build_recommendation_prompt(
+            preferences=preferences, candidates=candidates, limit=10, compact=compact
+        ),
+        rounds=200,
+    )
+
+
+def test_parse_llm_result(bench):
+    raw = json.dumps(
+        {
+            "summary": "Ten places that fit.",
+            "recommendations": [{"id": i, "reason": f"Reason number {i}, nicely worded."} for i in range(10)],
+        }
+    )
+    bench(lambda: parse_llm_result(f"Here you go:\n{raw}\n"), rounds=500)
+
+
+def test_run_pipeline_stub_client(bench, engine, monkeypatch):
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    class StubGroqClient:
+        model = "stub"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            ids = [int(line.split(" |", 1)[0]) for line in user_prompt.splitlines() if line[:1].isdigit()]
+            return json.dumps(
+                {"summary": "Stub.", "recommendations": [{"id": i, "reason": "Stub pick."} for i in ids[:5]]}
+            )
+
+    monkeypatch.setenv("GROQ_API_KEY", "stub")
+    monkeypatch.setenv("ZOMATO_EVENT_WRITER", "sync")
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", StubGroqClient)
+    preferences = UserPreference(location=LOCATIONS[2], min_rating=3.5, limit=5)
+
+    response = bench(lambda: pipeline_mod.run_pipeline(engine=engine, preferences=preferences))
+    assert len(response.recommendations) == 5
@@ -0,0 +1,208 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Speaks the OpenAI-compatible `/openai/v1/chat/completions` route the Groq SDK
+uses, so the service can be pointed at it with `GROQ_BASE_URL`:
+
+    python -m loadtest.fake_groq --port 8001 --latency lognormal:400:0.5 --error-rate 0.02 --rate-limit-rate 0.05
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8001 uvicorn zomato_ai.phase2.api:app
+
+Answers are deterministic: the candidate IDs are read back out of the
+prompt and the first N (from "Select the best N ...") are returned, so
+responses always parse and join. Latency, 5xx errors and 429s are drawn
+from a seeded RNG.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+_CANDIDATE_ID = re.compile(r"^(\d+) ?\|", re.M)
+_SELECT_N = re.compile(r"Select the best (\d+) restaurants")
+_QUERY_SECTION = re.compile(r"^### Query (\S+)\n(.*?)(?=^### Query |\Z)", re.M | re.S)
+
+
+@dataclass(frozen=True)
+class Latency:
+    """`fixed:MS`, `uniform:LO:HI` or `lognormal:MEDIAN_MS:SIGMA`."""
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, *params = spec.split(":")
+        values = [float(p) for p in params] + [0.0, 0.0]
+        if kind not in {"fixed", "uniform", "lognormal"}:
+            raise ValueError(f"Unknown latency distribution {kind!r}")
+        return cls(kind, values[0], values[1])
+
+    def sample(self, rng: random.Random) -> float:
+        """Seconds to wait before answering."""
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b) / 1000
+        if self.kind == "lognormal":
+            return self.a * rng.lognormvariate(0.0, self.b) / 1000
+        return self.a / 1000
+
+
+@dataclass(frozen=True)
+class FakeGroqSettings:
+    latency: Latency = Latency()
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: int = 0
+
+
+def _picks(section: str) -> List[Dict[str, Any]]:
+    ids = [int(i) for i in _CANDIDATE_ID.findall(section)]
+    match = _SELECT_N.search(section)
+    n = int(match.group(1)) if match else len(ids)
+    return [{"id": rid, "reason": f"Fake pick #{rank} for load testing."} for rank, rid in enumerate(ids[:n], 1)]
+
+
+def fake_answer(user_prompt: str) -> Dict[str, Any]:
+    """Deterministic JSON answer in whichever schema the prompt asks for."""
+    if '"reasons"' in user_prompt:
+        return {
+            "reasons": [
+                {"id": int(i), "reason": "A dependable local favourite."}
+                for i in _CANDIDATE_ID.findall(user_prompt)
+            ]
+        }
+    sections = _QUERY_SECTION.findall(user_prompt)
+    if sections:
+        return {
+            "results": [
+                {"query": query_id, "summary": f"Fake picks for {query_id}.", "recommendations": _picks(body)}
+                for query_id, body in sections
+            ]
+        }
+    recs = _picks(user_prompt)
+    return {"summary": f"{len(recs)} fake recommendations.", "recommendations": recs}
+
+
+def _completion(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+async def _stream(model: str, content: str, delay: float) -> AsyncIterator[bytes]:
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    pieces = [content[i : i + 32] for i in range(0, len(content), 32)] or [""]
+    for i, piece in enumerate(pieces):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": piece} if i == 0 else {"content": piece},
+                    "finish_reason": "stop" if i == len(pieces) - 1 else None,
+                }
+            ],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n".encode()
+        await asyncio.sleep(delay / len(pieces))
+    yield b"data: [DONE]\n\n"
+
+
+def _error(status: int, message: str, kind: str, headers: Dict[str, str] | None = None) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": message, "type": kind, "code": kind}},
+        status_code=status,
+        headers=headers,
+    )
+
+
+def create_fake_groq_app(settings: FakeGroqSettings = FakeGroqSettings()) -> FastAPI:
+    app = FastAPI(title="Fake Groq", docs_url=None, redoc_url=None)
+    rng = random.Random(settings.seed)
+    stats = {"requests": 0, "rate_limited": 0, "errors": 0}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        model = body.get("model", "fake-model")
+        roll = rng.random()
+        if roll < settings.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return _error(
+                429,
+                "Rate limit reached (fake).",
+                "rate_limit_exceeded",
+                {"retry-after": f"{settings.retry_after:g}"},
+            )
+        delay = settings.latency.sample(rng)
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(delay)
+            return _error(500, "Injected upstream failure (fake).", "internal_server_error")
+
+        user_prompt = next(
+            (m.get("content", "") for m in reversed(body.get("messages", [])) if m.get("role") == "user"),
+            "",
+        )
+        content = json.dumps(fake_answer(user_prompt))
+        if body.get("stream"):
+            return StreamingResponse(_stream(model, content, delay), media_type="text/event-stream")
+        await asyncio.sleep(delay)
+        return _completion(model, content)
+
+    @app.get("/stats")
+    def get_stats() -> Dict[str, int]:
+        return dict(stats)
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local fake Groq API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="fixed:300", help="fixed:MS | uniform:LO:HI | lognormal:MEDIAN_MS:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings = FakeGroqSettings(
+        latency=Latency.parse(args.latency),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(create_fake_groq_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
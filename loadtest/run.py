@@ -0,0 +1,200 @@
+"""
+Asyncio load generator for the recommendation API.
+
+Usage (service running on :8000, ideally against loadtest.fake_groq):
+
+    PYTHONPATH=src:. python -m loadtest.run --endpoint pipeline --concurrency 32 --duration 30
+
+Preferences are drawn from the service's own /locations and /cuisines with a
+skewed (Zipf-like) popularity, plus realistic price and rating filters. The
+report covers throughput, latency percentiles, status codes and the
+fallback rate: heuristic-ranked pipeline responses, or 503s from
+/recommendations/llm.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import httpx
+
+
+ENDPOINTS = {
+    "pipeline": "/recommendations/pipeline",
+    "llm": "/recommendations/llm",
+    "filter": "/recommendations",
+}
+
+PRICE_BANDS = [(None, 500), (None, 800), (300, 1200), (800, 2000), (None, None)]
+RATING_FLOORS = [None, None, 3.5, 4.0, 4.2]
+
+
+class PreferenceMix:
+    """Seeded generator of preference payloads with skewed location/cuisine popularity."""
+
+    def __init__(self, locations: List[str], cuisines: List[str], seed: int = 0) -> None:
+        self._rng = random.Random(seed)
+        self._locations = locations or [None]
+        self._cuisines = cuisines
+        # Zipf-like weights: the k-th item is picked ~1/k as often as the first.
+        self._location_weights = [1 / (k + 1) for k in range(len(self._locations))]
+        self._cuisine_weights = [1 / (k + 1) for k in range(len(self._cuisines))]
+        # Shuffle so popularity does not simply follow alphabetical order.
+        self._rng.shuffle(self._locations)
+        self._rng.shuffle(self._cuisines)
+
+    def next(self) -> Dict[str, Any]:
+        rng = self._rng
+        prefs: Dict[str, Any] = {"limit": rng.choice([5, 5, 10])}
+        if rng.random() < 0.9:
+            prefs["location"] = rng.choices(self._locations, self._location_weights)[0]
+        if self._cuisines and rng.random() < 0.6:
+            k = 1 if rng.random() < 0.8 else 2
+            prefs["preferred_cuisines"] = rng.choices(self._cuisines, self._cuisine_weights, k=k)
+        min_price, max_price = rng.choice(PRICE_BANDS)
+        if min_price is not None:
+            prefs["min_price"] = min_price
+        if max_price is not None:
+            prefs["max_price"] = max_price
+        min_rating = rng.choice(RATING_FLOORS)
+        if min_rating is not None:
+            prefs["min_rating"] = min_rating
+        return prefs
+
+
+@dataclass
+class Results:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    fallbacks: int = 0
+
+    def record(self, status: str, latency: float, fallback: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.fallbacks += int(fallback)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def _is_fallback(endpoint: str, response: httpx.Response) -> bool:
+    if endpoint == "llm":
+        return response.status_code == 503
+    if endpoint != "pipeline" or response.status_code != 200:
+        return False
+    return bool(response.json().get("fallback"))
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    mix: PreferenceMix,
+    deadline: float,
+    results: Results,
+    params: Dict[str, str],
+) -> None:
+    path = ENDPOINTS[endpoint]
+    while time.monotonic() < deadline:
+        payload = mix.next()
+        started = time.perf_counter()
+        try:
+            response = await client.post(path, json=payload, params=params)
+        except httpx.HTTPError as exc:
+            results.record(type(exc).__name__, time.perf_counter() - started, False)
+            continue
+        results.record(str(response.status_code), time.perf_counter() - started, _is_fallback(endpoint, response))
+
+
+async def run_load(
+    *,
+    base_url: str,
+    endpoint: str,
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+    mode: str | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> Dict[str, Any]:
+    """Drive `endpoint` with `concurrency` workers for `duration` seconds and return a report.
+
+    Pass an `httpx.ASGITransport` as `transport` to run against an in-process app.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60.0, limits=limits, transport=transport
+    ) as client:
+        locations = (await client.get("/locations")).json()
+        cuisines = (await client.get("/cuisines")).json()
+        mix = PreferenceMix(locations, cuisines, seed=seed)
+        params = {"mode": mode} if mode else {}
+
+        results = Results()
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(
+            *(_worker(client, endpoint, mix, deadline, results, params) for _ in range(concurrency))
+        )
+        elapsed = time.monotonic() - started
+
+    total = len(results.latencies)
+    return {
+        "endpoint": ENDPOINTS[endpoint],
+        "concurrency": concurrency,
+        "requests": total,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            f"p{p}": round(percentile(results.latencies, p) * 1000, 1) for p in (50, 95, 99)
+        },
+        "statuses": dict(sorted(results.statuses.items())),
+        "fallback_rate": round(results.fallbacks / total, 4) if total else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the recommendation API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="pipeline")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run.")
+    parser.add_argument("--mode", choices=["full", "fast"], default=None, help="Pipeline mode.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_load(
+            base_url=args.base_url,
+            endpoint=args.endpoint,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            seed=args.seed,
+            mode=args.mode,
+        )
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    lat = report["latency_ms"]
+    print(
+        f"{report['endpoint']} x{report['concurrency']}: {report['requests']} requests in "
+        f"{report['elapsed_s']}s = {report['throughput_rps']} req/s\n"
+        f"latency p50={lat['p50']}ms p95={lat['p95']}ms p99={lat['p99']}ms\n"
+        f"statuses {report['statuses']}  fallback rate {report['fallback_rate']:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Service-wide constants that are safe to import anywhere.
+
+Kept free of third-party imports so the API can read them without pulling
+in ingestion (`datasets`) or LLM (`groq`) dependencies.
+"""
+
+DEFAULT_DB_URL = "sqlite:///./zomato_restaurants.db"
+DATASET_NAME = "ManikaSaini/zomato-restaurant-recommendation"
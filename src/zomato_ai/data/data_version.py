@@ -0,0 +1,88 @@
+"""
+Version counter for the restaurant data.
+
+`ingest_records` bumps the counter in the same transaction as its insert,
+so anything derived from the restaurants (precomputed pipeline answers, the
+free-text search index) can tell it is stale, even after a re-ingest that
+leaves the row count unchanged. Request paths read it through
+`current_data_version`, which keeps the value in-process for a few seconds
+instead of querying on every request; writes in this process invalidate it
+at once, writes by other processes are seen within the TTL.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from typing import Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from .engines import read_engine_for
+
+DEFAULT_DATA_VERSION_TTL_SECONDS = 5.0
+
+# The version of a database no restaurants were ever ingested into.
+NO_DATA_VERSION = "0"
+
+metadata = MetaData()
+
+# A single row (id=1).
+data_version_table = Table(
+    "data_version",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+
+def bump_data_version(conn: Connection) -> None:
+    """Increment the version inside `conn`'s transaction (call it with the data write)."""
+    t = data_version_table
+    if conn.execute(update(t).where(t.c.id == 1).values(version=t.c.version + 1)).rowcount == 0:
+        conn.execute(insert(t).values(id=1, version=1))
+
+
+def fetch_data_version(engine: Engine) -> str:
+    """The current version, read from the database."""
+    with read_engine_for(engine).connect() as conn:
+        version = conn.execute(select(data_version_table.c.version).where(data_version_table.c.id == 1)).scalar()
+    return str(version or 0)
+
+
+def data_version_ttl_from_env() -> float:
+    """ZOMATO_DATA_VERSION_TTL_SECONDS: how long a read version is reused; 0 reads every time."""
+    raw = os.getenv("ZOMATO_DATA_VERSION_TTL_SECONDS", "").strip()
+    if not raw:
+        return DEFAULT_DATA_VERSION_TTL_SECONDS
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        raise RuntimeError(f"ZOMATO_DATA_VERSION_TTL_SECONDS must be a number, got {raw!r}")
+
+
+# Engine -> (monotonic expiry, version).
+_cached: "weakref.WeakKeyDictionary[Engine, Tuple[float, str]]" = weakref.WeakKeyDictionary()
+_cached_lock = threading.Lock()
+
+
+def current_data_version(engine: Engine) -> str:
+    """`fetch_data_version`, reused in-process for ZOMATO_DATA_VERSION_TTL_SECONDS."""
+    now = time.monotonic()
+    with _cached_lock:
+        entry = _cached.get(engine)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    version = fetch_data_version(engine)
+    with _cached_lock:
+        _cached[engine] = (now + data_version_ttl_from_env(), version)
+    return version
+
+
+def forget_data_version(engine: Engine) -> None:
+    """Drop the cached version after this process changed the data."""
+    with _cached_lock:
+        _cached.pop(engine, None)
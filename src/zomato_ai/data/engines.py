@@ -0,0 +1,218 @@
+"""
+SQLite-aware engine factory.
+
+File-backed SQLite databases get WAL journaling (readers no longer block on
+event writes), `synchronous=NORMAL`, a memory-mapped read path and a larger
+page cache. `create_engine_pair` returns a read-write engine plus a
+read-only one (`mode=ro`, `query_only`) whose pool is sized for the API's
+worker threadpool; repository reads go through `read_engine_for(engine)`.
+Other databases, and in-memory SQLite, get plain engines.
+
+`create_async_read_engine` builds the asyncio counterpart of the read-only
+engine (aiosqlite for SQLite files, asyncpg for PostgreSQL) for
+`zomato_ai.phase2.async_repository`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Starlette runs sync handlers on AnyIO's default threadpool of 40 threads.
+DEFAULT_READ_POOL_SIZE = 40
+
+
+def _int_from_env(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer, got {raw!r}")
+
+
+@dataclass(frozen=True)
+class SQLiteTuning:
+    # One mapping shared by every connection to the file.
+    mmap_bytes: int = 256 * 1024 * 1024
+    # Page cache per connection, so up to (read_pool_size + 1) x this in total.
+    # Most reads are served from the mmap anyway.
+    cache_kib: int = 4 * 1024
+    busy_timeout_ms: int = 5_000
+    read_pool_size: int = DEFAULT_READ_POOL_SIZE
+
+
+def sqlite_tuning_from_env() -> SQLiteTuning:
+    """
+    ZOMATO_SQLITE_MMAP_BYTES, ZOMATO_SQLITE_CACHE_KIB, ZOMATO_SQLITE_BUSY_TIMEOUT_MS
+    and ZOMATO_DB_READ_POOL_SIZE override the defaults.
+    """
+    defaults = SQLiteTuning()
+    tuning = SQLiteTuning(
+        mmap_bytes=_int_from_env("ZOMATO_SQLITE_MMAP_BYTES", defaults.mmap_bytes),
+        cache_kib=_int_from_env("ZOMATO_SQLITE_CACHE_KIB", defaults.cache_kib),
+        busy_timeout_ms=_int_from_env("ZOMATO_SQLITE_BUSY_TIMEOUT_MS", defaults.busy_timeout_ms),
+        read_pool_size=_int_from_env("ZOMATO_DB_READ_POOL_SIZE", defaults.read_pool_size),
+    )
+    if min(tuning.mmap_bytes, tuning.cache_kib, tuning.busy_timeout_ms) < 0 or tuning.read_pool_size < 1:
+        raise RuntimeError(f"Invalid SQLite tuning: {tuning}")
+    return tuning
+
+
+def is_sqlite_file_url(url: str | URL) -> bool:
+    url = make_url(url)
+    return (
+        url.get_backend_name() == "sqlite"
+        and url.database not in (None, "", ":memory:")
+        and url.query.get("mode") != "memory"
+    )
+
+
+def _install_pragmas(engine: Engine, tuning: SQLiteTuning, *, read_only: bool) -> None:
+    pragmas = [
+        f"PRAGMA busy_timeout = {tuning.busy_timeout_ms}",
+        f"PRAGMA mmap_size = {tuning.mmap_bytes}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size = -{tuning.cache_kib}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # WAL is persistent in the database file; readers opened later use it too.
+        pragmas += ["PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL"]
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, _record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engine(
+    url: str | URL,
+    *,
+    read_only: bool = False,
+    tuning: SQLiteTuning | None = None,
+) -> Engine:
+    """
+    Create a tuned engine for a file-backed SQLite URL, or a plain engine
+    for anything else. `read_only` opens the file with `mode=ro` and
+    `query_only`, so the pool can never write.
+    """
+    if not is_sqlite_file_url(url):
+        return create_engine(url, future=True)
+
+    tuning = tuning or sqlite_tuning_from_env()
+    url = make_url(url)
+    kwargs: dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    if read_only:
+        url = _read_only_url(url)
+        kwargs.update(pool_size=tuning.read_pool_size, max_overflow=0, pool_timeout=30)
+
+    engine = create_engine(url, future=True, **kwargs)
+    _install_pragmas(engine, tuning, read_only=read_only)
+    return engine
+
+
+def _read_only_url(url: URL) -> URL:
+    path = url.database or ""
+    if not path.startswith("file:"):
+        path = f"file:{path}"
+    return url.set(database=path, query={**url.query, "mode": "ro", "uri": "true"})
+
+
+# Async driver per backend for the asyncio extension.
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_url_for(url: str | URL) -> URL | None:
+    """
+    The asyncio-driver form of `url`, or None when there is none. In-memory
+    SQLite has no async counterpart: a second engine would see a different,
+    empty database.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None or (backend == "sqlite" and not is_sqlite_file_url(url)):
+        return None
+    return url.set(drivername=f"{backend}+{driver}")
+
+
+def create_async_read_engine(url: str | URL, tuning: SQLiteTuning | None = None) -> "AsyncEngine | None":
+    """
+    Read-only `AsyncEngine` for `url`, tuned like the sync read engine.
+
+    Returns None (callers fall back to the sync engine on a worker thread)
+    when the URL has no async form or its driver is not installed.
+    """
+    async_url = async_url_for(url)
+    if async_url is None:
+        return None
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    kwargs: dict[str, Any] = {}
+    is_sqlite = async_url.get_backend_name() == "sqlite"
+    if is_sqlite:
+        tuning = tuning or sqlite_tuning_from_env()
+        async_url = _read_only_url(async_url)
+        kwargs.update(pool_size=tuning.read_pool_size, max_overflow=0, pool_timeout=30)
+    try:
+        engine = create_async_engine(async_url, **kwargs)
+    except ImportError as exc:
+        logger.info("Async driver unavailable (%s); async routes will use the sync engine.", exc)
+        return None
+    if is_sqlite:
+        _install_pragmas(engine.sync_engine, tuning, read_only=True)
+    return engine
+
+
+class EnginePair(NamedTuple):
+    write: Engine
+    read: Engine
+
+
+_read_engines: "weakref.WeakKeyDictionary[Engine, Engine]" = weakref.WeakKeyDictionary()
+_read_engines_lock = threading.Lock()
+
+
+def register_read_engine(engine: Engine, read_engine: Engine) -> None:
+    """Route repository reads for `engine` to `read_engine`."""
+    with _read_engines_lock:
+        _read_engines[engine] = read_engine
+
+
+def read_engine_for(engine: Engine) -> Engine:
+    """The read-only engine registered for `engine`, or `engine` itself."""
+    with _read_engines_lock:
+        return _read_engines.get(engine, engine)
+
+
+def create_engine_pair(url: str | URL, tuning: SQLiteTuning | None = None) -> EnginePair:
+    """
+    Read-write and read-only engines for `url`, with the read-only one
+    registered for `read_engine_for`. Non-file databases share one engine.
+    """
+    write = create_sqlite_engine(url, tuning=tuning)
+    if not is_sqlite_file_url(url):
+        return EnginePair(write, write)
+    read = create_sqlite_engine(url, read_only=True, tuning=tuning)
+    register_read_engine(write, read)
+    return EnginePair(write, read)
@@ -0,0 +1,158 @@
+"""
+Versioned schema bootstrap for every table the service uses.
+
+`bootstrap_schema` runs once at startup (FastAPI `create_app`, Streamlit) and
+applies any migrations newer than the version recorded in `schema_version`.
+Request-time code paths assume the schema already exists.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from zomato_ai.phase1 import ingestion
+from zomato_ai.data import data_version
+from zomato_ai.phase4 import event_log, events, popularity, rollups
+from zomato_ai.phase5 import precompute, reasons
+
+
+metadata = MetaData()
+
+schema_version_table = Table(
+    "schema_version",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _create_base_tables(conn: Connection) -> None:
+    # checkfirst semantics: databases created before versioning keep their tables.
+    ingestion.metadata.create_all(conn)
+    events.metadata.create_all(conn)
+
+
+_INDEXES = [
+    Index("ix_restaurants_location", ingestion.restaurants_table.c.location),
+    Index(
+        "ix_restaurants_name_location",
+        ingestion.restaurants_table.c.name,
+        ingestion.restaurants_table.c.location,
+    ),
+    Index(
+        "ix_recommendation_events_endpoint_created_at",
+        events.recommendation_events_table.c.endpoint,
+        events.recommendation_events_table.c.created_at,
+    ),
+]
+
+
+def _create_indexes(conn: Connection) -> None:
+    for index in _INDEXES:
+        index.create(conn, checkfirst=True)
+
+
+def _create_event_log_tables(conn: Connection) -> None:
+    event_log.metadata.create_all(conn)
+    rollups.hourly_rollups_table.create(conn, checkfirst=True)
+    rollups.rollup_watermarks_table.create(conn, checkfirst=True)
+
+
+def _create_dimension_rollups(conn: Connection) -> None:
+    rollups.dimension_rollups_table.create(conn, checkfirst=True)
+
+
+def _add_popularity_tables(conn: Connection) -> None:
+    # Databases created at version 1 predate the impressions column.
+    existing = {c["name"] for c in inspect(conn).get_columns("recommendation_events")}
+    if "restaurant_ids" not in existing:
+        conn.execute(text("ALTER TABLE recommendation_events ADD COLUMN restaurant_ids VARCHAR"))
+    popularity.metadata.create_all(conn)
+
+
+def _add_data_version(conn: Connection) -> None:
+    data_version.metadata.create_all(conn)
+    # Existing data counts as version 1, so nothing precomputed earlier matches it.
+    has_rows = conn.execute(select(ingestion.restaurants_table.c.id).limit(1)).first() is not None
+    conn.execute(insert(data_version.data_version_table).values(id=1, version=1 if has_rows else 0))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "restaurants and recommendation_events tables", _create_base_tables),
+    Migration(2, "restaurant lookup and event time-range indexes", _create_indexes),
+    Migration(3, "event log compaction ledger and hourly rollups", _create_event_log_tables),
+    # Only creates the new table. It has no watermark yet, so the next
+    # refresh_rollups pass backfills it from the raw events.
+    Migration(4, "location/cuisine dimension rollups", _create_dimension_rollups),
+    Migration(5, "restaurant impressions, selections and popularity counts", _add_popularity_tables),
+    Migration(6, "precomputed pipeline results", precompute.metadata.create_all),
+    Migration(7, "per-restaurant reason templates", reasons.metadata.create_all),
+    Migration(8, "restaurant data version counter", _add_data_version),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_schema_version(conn: Connection) -> int:
+    """Return the highest applied migration version (0 for a fresh database)."""
+    schema_version_table.create(conn, checkfirst=True)
+    return conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+
+
+_bootstrapped: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+_bootstrap_lock = threading.Lock()
+
+
+def bootstrap_schema(engine: Engine) -> int:
+    """
+    Bring the database schema up to `LATEST_VERSION`.
+
+    Each migration runs in the same transaction that records it. Repeated
+    calls for an engine that was already bootstrapped in this process return
+    immediately without touching the database.
+    """
+    with _bootstrap_lock:
+        if engine in _bootstrapped:
+            return LATEST_VERSION
+        with engine.begin() as conn:
+            version = current_schema_version(conn)
+            for migration in MIGRATIONS:
+                if migration.version <= version:
+                    continue
+                migration.apply(conn)
+                conn.execute(
+                    insert(schema_version_table).values(
+                        version=migration.version,
+                        description=migration.description,
+                        applied_at=datetime.now(timezone.utc),
+                    )
+                )
+                version = migration.version
+        _bootstrapped.add(engine)
+        return version
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, Mapping, Any, List
+from typing import Callable, Iterable, Iterator, Mapping, Any, List, Optional
 import re
 
-from datasets import load_dataset
 from sqlalchemy import (
     Column,
     Float,
@@ -18,9 +17,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.engine import Engine
 
-
-DEFAULT_DB_URL = "sqlite:///./zomato_restaurants.db"
-DATASET_NAME = "ManikaSaini/zomato-restaurant-recommendation"
+from zomato_ai.config import DATASET_NAME, DEFAULT_DB_URL
 
 
 metadata = MetaData()
@@ -178,7 +175,12 @@ def ingest_records(engine: Engine, records: Iterable[Mapping[str, Any]]) -> int:
 
     Returns the number of successfully inserted rows.
     """
-    create_schema(engine)
+    # Imported lazily: the migrations module itself imports this module.
+    from zomato_ai.data.data_version import bump_data_version, forget_data_version
+    from zomato_ai.data.migrations import bootstrap_schema
+
+    # No-op after the first call for this engine.
+    bootstrap_schema(engine)
 
     normalized: List[dict[str, Any]] = []
     seen_keys: set[tuple[str, str]] = set()
@@ -210,23 +212,62 @@ def ingest_records(engine: Engine, records: Iterable[Mapping[str, Any]]) -> int:
 
     with engine.begin() as conn:
         conn.execute(insert(restaurants_table), normalized)
+        bump_data_version(conn)
+    forget_data_version(engine)
 
     return len(normalized)
 
 
-def ingest_huggingface_dataset(db_url: str = DEFAULT_DB_URL) -> int:
+# Called with a human-readable status and the fraction of work done (0-1).
+ProgressCallback = Callable[[str, float], None]
+
+# Report progress once per this many dataset rows.
+PROGRESS_EVERY_ROWS = 2000
+
+
+def ingest_huggingface_dataset(
+    db_url: str = DEFAULT_DB_URL, progress: Optional[ProgressCallback] = None
+) -> int:
     """
     Load the Zomato dataset from Hugging Face and ingest it into the database.
 
+    `progress`, if given, is called as the download, the row ingest and the
+    search-index build advance, so a UI can show where a first run is.
+
     Returns the number of inserted restaurant rows.
     """
+    # Imported here: `datasets` pulls in pyarrow/pandas, which serving never needs.
+    from datasets import load_dataset
+
+    def report(message: str, fraction: float) -> None:
+        if progress is not None:
+            progress(message, fraction)
+
     engine = create_engine_for_url(db_url)
+    report("Downloading the Zomato dataset", 0.0)
     dataset = load_dataset(DATASET_NAME, split="train")
-    count = ingest_records(engine, (dict(row) for row in dataset))
+    total = max(len(dataset), 1)
+
+    def rows() -> Iterator[dict[str, Any]]:
+        for i, row in enumerate(dataset, 1):
+            if i % PROGRESS_EVERY_ROWS == 0:
+                report(f"Reading restaurants ({i:,} of {total:,})", 0.1 + 0.7 * i / total)
+            yield dict(row)
+
+    report("Reading restaurants", 0.1)
+    count = ingest_records(engine, rows())
 
     # Basic sanity check query to ensure the table is readable.
     with engine.connect() as conn:
         conn.execute(text("SELECT COUNT(*) FROM restaurants"))
 
-    return count
+    # Embed the restaurants for free-text search now, not on the first query.
+    from zomato_ai.phase2.semantic import build_semantic_index, semantic_index_dir_for
+
+    directory = semantic_index_dir_for(engine)
+    if directory is not None:
+        report("Building the search index", 0.85)
+        build_semantic_index(engine, directory)
 
+    report(f"Ingested {count:,} restaurants", 1.0)
+    return count
@@ -0,0 +1,193 @@
+"""
+Admission control for the recommendation endpoints.
+
+Each endpoint gets an `AdmissionController`: at most `max_in_flight`
+requests run at once, up to `max_queue` more wait (FIFO) for a slot, and a
+request that waits longer than `queue_timeout` is shed. Requests are
+admitted on the event loop before they are handed to the worker
+threadpool, so excess load is turned away in microseconds instead of piling
+up behind the threads and timing out everywhere.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Literal
+
+from zomato_ai.metrics import REGISTRY
+
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "zomato_admission_in_flight",
+    "Requests currently admitted, by endpoint.",
+    labelnames=("endpoint",),
+)
+ADMISSION_QUEUED = REGISTRY.gauge(
+    "zomato_admission_queued",
+    "Requests waiting for an admission slot, by endpoint.",
+    labelnames=("endpoint",),
+)
+ADMISSION_SHED = REGISTRY.counter(
+    "zomato_admission_shed_total",
+    "Requests not admitted, by endpoint, reason (queue_full, queue_timeout) and action (rejected, degraded).",
+    labelnames=("endpoint", "reason", "action"),
+)
+ADMISSION_QUEUE_SECONDS = REGISTRY.histogram(
+    "zomato_admission_queue_seconds",
+    "Time admitted requests spent waiting for a slot, by endpoint.",
+    labelnames=("endpoint",),
+)
+
+# What an overloaded endpoint does with a shed request: answer 503, or serve
+# a cheaper degraded result where the endpoint has one.
+OverloadPolicy = Literal["reject", "degrade"]
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request cannot be admitted within the endpoint's limits."""
+
+    def __init__(self, endpoint: str, reason: str, retry_after: float = 1.0) -> None:
+        super().__init__(f"{endpoint} is overloaded: {reason}")
+        self.endpoint = endpoint
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    """Per-endpoint limits. `max_in_flight=0` disables admission control."""
+
+    max_in_flight: int = 16
+    max_queue: int = 16
+    queue_timeout: float = 1.0
+
+
+def _int_from_env(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer, got {raw!r}")
+
+
+def admission_limits_from_env(endpoint: str, default: AdmissionLimits = AdmissionLimits()) -> AdmissionLimits:
+    """
+    ZOMATO_ADMISSION_<ENDPOINT>_MAX_IN_FLIGHT, ..._MAX_QUEUE and
+    ..._QUEUE_TIMEOUT_MS override `default`, e.g.
+    ZOMATO_ADMISSION_PIPELINE_MAX_IN_FLIGHT for endpoint "pipeline".
+    """
+    prefix = f"ZOMATO_ADMISSION_{endpoint.upper()}"
+    timeout_ms = _int_from_env(f"{prefix}_QUEUE_TIMEOUT_MS", round(default.queue_timeout * 1000))
+    return AdmissionLimits(
+        max_in_flight=_int_from_env(f"{prefix}_MAX_IN_FLIGHT", default.max_in_flight),
+        max_queue=_int_from_env(f"{prefix}_MAX_QUEUE", default.max_queue),
+        queue_timeout=timeout_ms / 1000,
+    )
+
+
+def overload_policy_from_env(endpoint: str, default: OverloadPolicy = "reject") -> OverloadPolicy:
+    """ZOMATO_ADMISSION_<ENDPOINT>_OVERLOAD: "reject" (503) or "degrade"."""
+    name = f"ZOMATO_ADMISSION_{endpoint.upper()}_OVERLOAD"
+    raw = os.getenv(name, "").strip().lower() or default
+    if raw not in ("reject", "degrade"):
+        raise RuntimeError(f"{name} must be 'reject' or 'degrade', got {raw!r}")
+    return raw  # type: ignore[return-value]
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a short, bounded FIFO queue.
+
+    State is only touched from the event loop, so no lock is needed. A
+    released slot is handed straight to the oldest waiter, which keeps the
+    in-flight count at the limit while there is a queue.
+    """
+
+    def __init__(self, endpoint: str, limits: AdmissionLimits) -> None:
+        self.endpoint = endpoint
+        self.limits = limits
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        ADMISSION_IN_FLIGHT.set(0, endpoint=endpoint)
+        ADMISSION_QUEUED.set(0, endpoint=endpoint)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self._in_flight, endpoint=self.endpoint)
+        ADMISSION_QUEUED.set(len(self._waiters), endpoint=self.endpoint)
+
+    def _reject(self, reason: str) -> None:
+        # Shed counts are recorded by the caller, which knows whether the
+        # request was rejected or degraded.
+        raise AdmissionRejected(self.endpoint, reason, retry_after=max(1.0, self.limits.queue_timeout))
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting up to `queue_timeout`; raises `AdmissionRejected`."""
+        if not self.limits.max_in_flight:
+            return
+        if self._in_flight < self.limits.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._update_gauges()
+            return
+        if len(self._waiters) >= self.limits.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            # On timeout wait_for cancels the waiter, so `release` skips it.
+            await asyncio.wait_for(waiter, self.limits.queue_timeout)
+        except asyncio.TimeoutError:
+            # Since 3.12 wait_for can time out after `release` has already
+            # handed this waiter the slot; the request is admitted then, or
+            # the slot would never be released.
+            if not (waiter.done() and not waiter.cancelled()):
+                self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # The slot may have been handed over just as the client went away.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._update_gauges()
+        ADMISSION_QUEUE_SECONDS.observe(time.perf_counter() - started, endpoint=self.endpoint)
+
+    def release(self) -> None:
+        if not self.limits.max_in_flight:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the waiter; in-flight count is unchanged.
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self._in_flight = max(0, self._in_flight - 1)
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
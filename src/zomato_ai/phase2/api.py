@@ -1,40 +1,323 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
+from pydantic import BaseModel
 from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
 
-from zomato_ai.phase1.ingestion import DEFAULT_DB_URL
+from zomato_ai.data.engines import create_async_read_engine, create_engine_pair
+from zomato_ai.data.migrations import bootstrap_schema
+from zomato_ai.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+from zomato_ai.profiling import (
+    ProfileMiddleware,
+    ProfilingConfig,
+    SamplingProfiler,
+    call_profiled,
+    profile_path,
+    profiling_config_from_env,
+    token_matches,
+    tracemalloc_diff,
+)
+from zomato_ai.config import DEFAULT_DB_URL
 
+from .admission import (
+    ADMISSION_SHED,
+    AdmissionController,
+    AdmissionLimits,
+    AdmissionRejected,
+    admission_limits_from_env,
+    overload_policy_from_env,
+)
 from .filtering import filter_restaurants
 from .models import RecommendationsResponse, UserPreference
 from zomato_ai.phase3.groq_client import GroqLLMClient, load_groq_config_from_env
 from zomato_ai.phase3.orchestrator import recommend_with_groq
 from zomato_ai.phase3.models import LLMRecommendationResult
-from .repository import create_engine_for_url, fetch_unique_locations, fetch_unique_cuisines
+from zomato_ai.phase3.rate_limit import LLMRateLimitedError
+from .repository import fetch_unique_locations, fetch_unique_cuisines, restaurant_exists
+from .async_repository import fetch_unique_cuisines_async, fetch_unique_locations_async
 from zomato_ai.phase4.events import log_recommendation_event
-from zomato_ai.phase5.pipeline import run_pipeline
-from zomato_ai.phase5.models import PipelineResponse
+from zomato_ai.phase4.analytics import analytics_summary
+from zomato_ai.phase4.models import AnalyticsSummary, SelectionEvent
+from zomato_ai.phase4.popularity import (
+    SELECTIONS_STREAM,
+    load_popularity_priors_or_neutral,
+    log_selection,
+    refresh_popularity,
+    restaurant_selections_table,
+)
+from zomato_ai.phase4.rollups import PeriodicRefresher, refresh_rollups, rollup_interval_from_env
+from zomato_ai.phase4.event_log import (
+    JsonlEventSink,
+    event_log_dir_from_env,
+    event_sink_from_env,
+)
+from zomato_ai.phase4.event_writer import (
+    DatabaseEventSink,
+    event_writer_mode_from_env,
+    start_event_writer,
+    stop_event_writer,
+)
+from zomato_ai.phase5.pipeline import run_batch_pipeline, run_degraded_pipeline, run_pipeline
+from zomato_ai.phase5.models import (
+    BatchPipelineResponse,
+    BatchRecommendationsRequest,
+    PipelineMode,
+    PipelineResponse,
+)
 from zomato_ai.phase5.ui import mount_ui
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
 
-def create_app(db_url: str | None = None, engine: Engine | None = None) -> FastAPI:
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "zomato_http_request_duration_seconds",
+    "Time to handle an HTTP request, by method, route template and status code.",
+    labelnames=("method", "route", "status"),
+)
+
+
+def _json_response(model: BaseModel) -> Response:
+    """
+    Encode a model we built ourselves straight to JSON bytes.
+
+    Returning a `Response` makes FastAPI skip re-validating the value against
+    `response_model` (and the threadpool hop it takes for sync handlers).
+    The bytes come from the same pydantic serializer FastAPI would use, so
+    the output is identical.
+    """
+    return Response(model.__pydantic_serializer__.to_json(model, by_alias=True), media_type="application/json")
+
+
+def _retry_after(seconds: float) -> dict[str, str]:
+    return {"Retry-After": str(max(1, int(seconds + 0.999)))}
+
+
+def _admitted(
+    controller: AdmissionController,
+    *,
+    degrade: tuple[Callable[..., Any], AdmissionController] | None = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Wrap a sync handler so it runs on the threadpool only once `controller`
+    admits the request. Shed requests get `503` with `Retry-After`, or, with
+    `degrade=(handler, controller)`, that handler's (cheaper) answer instead.
+    Degraded work has its own limits, so overload cannot pile it up on the
+    threadpool either; when those are exhausted too the answer is `503`.
+    """
+
+    async def degraded(shed: AdmissionRejected, args: Any, kwargs: Any) -> Any:
+        degrade_handler, degrade_controller = degrade  # type: ignore[misc]
+        try:
+            await degrade_controller.acquire()
+        except AdmissionRejected as e:
+            ADMISSION_SHED.inc(endpoint=shed.endpoint, reason=shed.reason, action="rejected")
+            raise HTTPException(status_code=503, detail=str(shed), headers=_retry_after(e.retry_after))
+        ADMISSION_SHED.inc(endpoint=shed.endpoint, reason=shed.reason, action="degraded")
+        try:
+            return await run_in_threadpool(call_profiled, degrade_handler, *args, **kwargs)
+        finally:
+            degrade_controller.release()
+
+    def decorator(handler: Callable[..., Any]) -> Callable[..., Any]:
+        # functools.wraps keeps the handler's signature for FastAPI.
+        @functools.wraps(handler)
+        async def endpoint(*args: Any, **kwargs: Any) -> Any:
+            try:
+                await controller.acquire()
+            except AdmissionRejected as e:
+                if degrade is None:
+                    ADMISSION_SHED.inc(endpoint=e.endpoint, reason=e.reason, action="rejected")
+                    raise HTTPException(status_code=503, detail=str(e), headers=_retry_after(e.retry_after))
+                return await degraded(e, args, kwargs)
+            try:
+                return await run_in_threadpool(call_profiled, handler, *args, **kwargs)
+            finally:
+                controller.release()
+
+        return endpoint
+
+    return decorator
+
+
+def _mount_profiling(app: FastAPI, config: ProfilingConfig) -> None:
+    """
+    Token-guarded endpoints for profiling the whole worker. Files are also
+    kept in the profile directory and can be fetched again by id.
+    """
+
+    def require_token(x_profile_token: Optional[str] = Header(None)) -> None:
+        if not token_matches(config, x_profile_token):
+            raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+    guarded = [Depends(require_token)]
+
+    @app.post("/debug/profile", dependencies=guarded, include_in_schema=False)
+    async def profile_worker(
+        seconds: float = Query(10.0, gt=0, le=120),
+        interval_ms: float = Query(5.0, ge=1, le=1000),
+    ) -> Response:
+        """Sample every thread for `seconds` and return speedscope JSON."""
+        sampler = SamplingProfiler(interval=interval_ms / 1000).start()
+        await asyncio.sleep(seconds)
+        await run_in_threadpool(sampler.stop)
+        path = profile_path(config, "worker", ".speedscope.json")
+        sampler.dump(path, name=f"worker ({seconds:g}s)")
+        return Response(path.read_bytes(), media_type="application/json", headers={"X-Profile-Id": path.name})
+
+    @app.post("/debug/tracemalloc", dependencies=guarded, include_in_schema=False)
+    async def tracemalloc_worker(
+        seconds: float = Query(10.0, gt=0, le=600),
+        top: int = Query(25, ge=1, le=500),
+    ) -> dict[str, Any]:
+        """Top allocation growth by source line over `seconds`."""
+        snapshots = (
+            profile_path(config, "tracemalloc-before", ".tracemalloc"),
+            profile_path(config, "tracemalloc-after", ".tracemalloc"),
+        )
+        stats = await run_in_threadpool(
+            tracemalloc_diff, functools.partial(time.sleep, seconds), top=top, dump_to=snapshots
+        )
+        return {"snapshots": [path.name for path in snapshots], "top": stats}
+
+    @app.get("/debug/profiles/{profile_id}", dependencies=guarded, include_in_schema=False)
+    def get_profile(profile_id: str) -> Response:
+        path = config.output_dir / profile_id
+        if path.name != profile_id or not path.is_file():
+            raise HTTPException(status_code=404, detail="Unknown profile")
+        return Response(path.read_bytes(), media_type="application/octet-stream")
+
+
+class _RequestTimingMiddleware:
+    """
+    Plain ASGI middleware (no per-request task or body buffering) that
+    records `zomato_http_request_duration_seconds`. Requests that match no
+    route share one `route` label so unknown paths cannot blow up cardinality.
+    """
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the (shared) scope.
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=status
+            )
+
+
+def create_app(
+    db_url: str | None = None,
+    engine: Engine | None = None,
+    async_engine: "AsyncEngine | None" = None,
+) -> FastAPI:
     """
     Create and configure the FastAPI application for Phase 2.
 
     The database URL can be overridden (useful for tests); otherwise it falls
     back to the Phase 1 default or an environment variable.
+
+    Async routes read through `async_engine`. Without an explicit `engine`
+    one is built from the URL when an async driver is installed; otherwise
+    those routes run the sync repository on the threadpool.
     """
     effective_db_url = db_url or os.getenv("ZOMATO_DB_URL") or DEFAULT_DB_URL
-    effective_engine = engine or create_engine_for_url(effective_db_url)
+    # Repository reads go to a separate read-only pool (see zomato_ai.data.engines).
+    effective_engine = engine or create_engine_pair(effective_db_url).write
+    if async_engine is None and engine is None:
+        async_engine = create_async_read_engine(effective_db_url)
+
+    # Requests beyond these limits are shed before they reach the threadpool.
+    admission = {
+        name: AdmissionController(name, admission_limits_from_env(name, default))
+        for name, default in (
+            ("recommendations", AdmissionLimits(max_in_flight=32, max_queue=32, queue_timeout=0.5)),
+            ("llm", AdmissionLimits()),
+            ("pipeline", AdmissionLimits()),
+            # Shed pipeline requests served from the degraded path (OVERLOAD=degrade).
+            ("pipeline_degraded", AdmissionLimits(max_in_flight=8, max_queue=8, queue_timeout=0.25)),
+            ("batch", AdmissionLimits(max_in_flight=4, max_queue=4, queue_timeout=2.0)),
+        )
+    }
+    pipeline_overload = overload_policy_from_env("pipeline")
+
+    # Create/migrate tables once here; request handlers assume they exist.
+    bootstrap_schema(effective_engine)
+
+    # Analytics events are written off the request path unless configured otherwise.
+    if event_writer_mode_from_env() == "background":
+        sink = None
+        if event_sink_from_env() == "jsonl":
+            # Keep event writes off the serving DB; compact segments later.
+            sink = JsonlEventSink(event_log_dir_from_env())
+        start_event_writer(effective_engine, sink=sink)
+        # Selections always go to the database; the popularity job reads them there.
+        start_event_writer(
+            effective_engine,
+            stream=SELECTIONS_STREAM,
+            sink=DatabaseEventSink(effective_engine, restaurant_selections_table),
+        )
+
+    # Popularity priors are served from memory; load the last computed counts.
+    # A failure here only costs the ranking boost, so it must not stop startup.
+    load_popularity_priors_or_neutral(effective_engine)
+
+    # Keep the analytics rollups and popularity priors current off the request path.
+    rollup_interval = rollup_interval_from_env()
+    refresher = (
+        PeriodicRefresher(
+            effective_engine, rollup_interval, jobs=(refresh_rollups, refresh_popularity)
+        ).start()
+        if rollup_interval
+        else None
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        yield
+        stop_event_writer(effective_engine)
+        stop_event_writer(effective_engine, stream=SELECTIONS_STREAM)
+        if refresher is not None:
+            refresher.close()
+        if async_engine is not None:
+            await async_engine.dispose()
 
     app = FastAPI(
         title="Zomato AI Restaurant Recommendation Service - Phase 2",
         version="0.1.0",
         description="Core backend and filtering API without LLM integration.",
+        lifespan=lifespan,
     )
 
+    app.add_middleware(_RequestTimingMiddleware)
+    profiling = profiling_config_from_env()
+    if profiling is not None:
+        # Outermost, so a profiled request covers the timing middleware too.
+        app.add_middleware(ProfileMiddleware, config=profiling)
+        _mount_profiling(app, profiling)
     mount_ui(app)
 
     @app.post(
@@ -42,7 +325,8 @@ def create_app(db_url: str | None = None, engine: Engine | None = None) -> FastA
         response_model=RecommendationsResponse,
         summary="Get restaurant recommendations based on user preferences (Phase 2)",
     )
-    def get_recommendations(preferences: UserPreference) -> RecommendationsResponse:
+    @_admitted(admission["recommendations"])
+    def get_recommendations(preferences: UserPreference) -> Response:
         recommendations = filter_restaurants(effective_engine, preferences)
         log_recommendation_event(
             engine=effective_engine,
@@ -50,15 +334,17 @@ def create_app(db_url: str | None = None, engine: Engine | None = None) -> FastA
             preferences=preferences.model_dump(),
             candidate_count=0,
             returned_count=len(recommendations),
+            restaurant_ids=[r.id for r in recommendations],
         )
-        return RecommendationsResponse(recommendations=recommendations)
+        return _json_response(RecommendationsResponse(recommendations=recommendations))
 
     @app.post(
         "/recommendations/llm",
         response_model=LLMRecommendationResult,
         summary="Get LLM-enhanced recommendations (Phase 3 - Groq)",
     )
-    def get_recommendations_llm(preferences: UserPreference) -> LLMRecommendationResult:
+    @_admitted(admission["llm"])
+    def get_recommendations_llm(preferences: UserPreference) -> Response:
         """
         Phase 3 endpoint. Requires GROQ_API_KEY to be set.
 
@@ -83,32 +369,75 @@ def create_app(db_url: str | None = None, engine: Engine | None = None) -> FastA
                 candidate_count=0,
                 returned_count=0,
             )
-            return LLMRecommendationResult(summary="No matches found.", recommendations=[])
+            return _json_response(LLMRecommendationResult(summary="No matches found.", recommendations=[]))
 
         client = GroqLLMClient(config)
-        result = recommend_with_groq(
-            client=client,
-            preferences=preferences,
-            candidates=candidates,
-            limit=preferences.limit,
-        )
+        try:
+            result = recommend_with_groq(
+                client=client,
+                preferences=preferences,
+                candidates=candidates,
+                limit=preferences.limit,
+            )
+        except LLMRateLimitedError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers=_retry_after(e.retry_after),
+            )
         log_recommendation_event(
             engine=effective_engine,
             endpoint="/recommendations/llm",
             preferences=preferences.model_dump(),
             candidate_count=len(candidates),
             returned_count=len(result.recommendations),
+            restaurant_ids=[r.id for r in result.recommendations],
         )
-        return result
+        return _json_response(result)
+
+    def get_recommendations_pipeline_degraded(preferences: UserPreference, mode: PipelineMode) -> Response:
+        """Overload answer: precomputed or heuristic-only, never the LLM."""
+        return _json_response(run_degraded_pipeline(engine=effective_engine, preferences=preferences))
 
     @app.post(
         "/recommendations/pipeline",
         response_model=PipelineResponse,
         summary="User → Filter → Groq LLM → Response (Phase 5)",
     )
-    def get_recommendations_pipeline(preferences: UserPreference) -> PipelineResponse:
+    @_admitted(
+        admission["pipeline"],
+        degrade=(
+            (get_recommendations_pipeline_degraded, admission["pipeline_degraded"])
+            if pipeline_overload == "degrade"
+            else None
+        ),
+    )
+    def get_recommendations_pipeline(
+        preferences: UserPreference,
+        mode: PipelineMode = Query(
+            "full", description="'fast' skips the LLM and uses stored reason templates."
+        ),
+    ) -> Response:
+        try:
+            return _json_response(run_pipeline(engine=effective_engine, preferences=preferences, mode=mode))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.post(
+        "/recommendations/batch",
+        response_model=BatchPipelineResponse,
+        summary="Pipeline recommendations for many preference sets in one call",
+    )
+    @_admitted(admission["batch"])
+    def get_recommendations_batch(request: BatchRecommendationsRequest) -> Response:
+        """
+        Runs the Phase 5 pipeline for every item. Results come back in input
+        order; invalid or failed items carry an `error` instead of a result.
+        """
         try:
-            return run_pipeline(engine=effective_engine, preferences=preferences)
+            return _json_response(run_batch_pipeline(engine=effective_engine, items=request.items))
         except HTTPException:
             raise
         except Exception as e:
@@ -119,27 +448,73 @@ def create_app(db_url: str | None = None, engine: Engine | None = None) -> FastA
         response_model=list[str],
         summary="Get all unique restaurant locations from the dataset",
     )
-    def get_locations() -> list[str]:
+    async def get_locations() -> list[str]:
         """
         Returns a sorted list of every unique location present in the
         restaurants table.  Used by the UI to populate the location dropdown.
         """
-        return fetch_unique_locations(effective_engine)
+        if async_engine is not None:
+            return await fetch_unique_locations_async(async_engine)
+        return await run_in_threadpool(fetch_unique_locations, effective_engine)
 
     @app.get(
         "/cuisines",
         response_model=list[str],
         summary="Get all unique cuisine names from the dataset",
     )
-    def get_cuisines() -> list[str]:
+    async def get_cuisines() -> list[str]:
         """
         Returns a sorted list of every unique cuisine present in the
         restaurants table.  Used by the UI to power the cuisines datalist.
         """
-        return fetch_unique_cuisines(effective_engine)
+        if async_engine is not None:
+            return await fetch_unique_cuisines_async(async_engine)
+        return await run_in_threadpool(fetch_unique_cuisines, effective_engine)
 
-    return app
+    @app.post(
+        "/events/selection",
+        status_code=204,
+        summary="Record that the user picked a recommended restaurant",
+    )
+    def post_selection_event(event: SelectionEvent) -> Response:
+        """Selections feed the popularity priors used in ranking."""
+        if not restaurant_exists(effective_engine, event.restaurant_id):
+            raise HTTPException(status_code=404, detail="Unknown restaurant")
+        log_selection(engine=effective_engine, restaurant_id=event.restaurant_id, endpoint=event.endpoint)
+        return Response(status_code=204)
+
+    @app.get(
+        "/analytics/summary",
+        response_model=AnalyticsSummary,
+        summary="Recent recommendation traffic, from precomputed rollups",
+    )
+    def get_analytics_summary(
+        hours: int = Query(24, ge=1, le=24 * 90),
+        endpoint: Optional[str] = None,
+        top: int = Query(10, ge=1, le=100),
+    ) -> Response:
+        """
+        Per-endpoint counts, zero-result rate and averages plus the top
+        locations and cuisines. Reads only the rollup tables, which lag raw
+        events by at most ZOMATO_ROLLUP_INTERVAL_SECONDS.
+        """
+        return _json_response(analytics_summary(effective_engine, hours=hours, endpoint=endpoint, top=top))
+
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics() -> Response:
+        """Expose in-process service metrics in Prometheus text format."""
+        return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
+    return app
 
-app = create_app()
 
+def __getattr__(name: str) -> Any:
+    """
+    Build the default `app` on first access rather than at import, so
+    `uvicorn zomato_ai.phase2.api:app` works while importing this module
+    (tests, tooling) does not open the database or start background threads.
+    """
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
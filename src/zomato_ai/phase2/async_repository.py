@@ -0,0 +1,45 @@
+"""
+asyncio variants of the read functions in `repository`.
+
+They run the same statements and post-processing over an `AsyncEngine`
+(see `zomato_ai.data.engines.create_async_read_engine`), so async routes can
+await database reads instead of holding the event loop or a worker thread.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Mapping
+
+from . import repository
+from .records import RestaurantStore
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+async def fetch_all_restaurants_async(engine: "AsyncEngine") -> List[Mapping[str, Any]]:
+    """Async form of `repository.fetch_all_restaurants`."""
+    async with engine.connect() as conn:
+        result = await conn.execute(repository.restaurants_query())
+        return list(result.mappings().all())
+
+
+async def fetch_restaurant_store_async(engine: "AsyncEngine") -> RestaurantStore:
+    """Async form of `repository.fetch_restaurant_store`."""
+    async with engine.connect() as conn:
+        result = await conn.execute(repository.restaurants_query())
+        return RestaurantStore.from_tuples(result)
+
+
+async def fetch_unique_locations_async(engine: "AsyncEngine") -> List[str]:
+    """Async form of `repository.fetch_unique_locations`."""
+    async with engine.connect() as conn:
+        rows = (await conn.execute(repository.locations_query())).scalars().all()
+    return repository.clean_locations(rows)
+
+
+async def fetch_unique_cuisines_async(engine: "AsyncEngine") -> List[str]:
+    """Async form of `repository.fetch_unique_cuisines`."""
+    async with engine.connect() as conn:
+        rows = (await conn.execute(repository.cuisines_query())).scalars().all()
+    return repository.split_cuisines(rows)
@@ -1,24 +1,32 @@
 from __future__ import annotations
 
-from typing import List, Mapping, Any
+import heapq
+from operator import itemgetter
+from typing import TYPE_CHECKING, List, Mapping, Any, Sequence
 
 from sqlalchemy.engine import Engine
 
+from zomato_ai.metrics import span
+
 from .models import Restaurant, UserPreference
-from .repository import fetch_all_restaurants
-from zomato_ai.phase4.dedup import dedup_rows_by_name_location
+from .records import MISSING, RATING_SCALE, RestaurantStore
+from .repository import fetch_restaurant_store
+from zomato_ai.phase4.dedup import dedup_store_by_name_location
+from zomato_ai.phase4.popularity import PopularityPriors, get_popularity_priors
+
+if TYPE_CHECKING:
+    from .semantic import SemanticIndex
 
 
-def _matches_location(row: Mapping[str, Any], location: str | None) -> bool:
+def _matches_location(restaurant_location: str | None, location: str | None) -> bool:
     if not location:
         return True
-    if not row.get("location"):
+    if not restaurant_location:
         return False
-    return location.lower() in str(row["location"]).lower()
+    return location.lower() in restaurant_location.lower()
 
 
-def _matches_price(row: Mapping[str, Any], min_price: int | None, max_price: int | None) -> bool:
-    price = row.get("price_range")
+def _matches_price(price: int | None, min_price: int | None, max_price: int | None) -> bool:
     if price is None:
         return True
     if min_price is not None and price < min_price:
@@ -28,20 +36,18 @@ def _matches_price(row: Mapping[str, Any], min_price: int | None, max_price: int
     return True
 
 
-def _matches_rating(row: Mapping[str, Any], min_rating: float | None) -> bool:
-    rating = row.get("rating")
+def _matches_rating(rating: float | None, min_rating: float | None) -> bool:
     if min_rating is None or rating is None:
         return True
     return rating >= min_rating
 
 
-def _matches_cuisines(row: Mapping[str, Any], preferred_cuisines: list[str] | None) -> bool:
+def _matches_cuisines(cuisines_value: str | None, preferred_cuisines: list[str] | None) -> bool:
     if not preferred_cuisines:
         return True
-    cuisines_value = row.get("cuisines")
     if not cuisines_value:
         return False
-    cuisines_lower = [c.strip().lower() for c in str(cuisines_value).split(",") if c.strip()]
+    cuisines_lower = [c.strip().lower() for c in cuisines_value.split(",") if c.strip()]
     cuisine_set = set(cuisines_lower)
     for pref in preferred_cuisines:
         if pref.strip().lower() in cuisine_set:
@@ -49,56 +55,149 @@ def _matches_cuisines(row: Mapping[str, Any], preferred_cuisines: list[str] | No
     return False
 
 
-def compute_score(row: Mapping[str, Any], preferences: UserPreference) -> float:
+def compute_score(
+    rating: float | None,
+    price: int | None,
+    restaurant_id: int,
+    preferences: UserPreference,
+    priors: PopularityPriors | None = None,
+) -> float:
     """
     Compute a simple heuristic score for a restaurant.
 
     Higher rating improves the score. Prices above the user's preferred max
     price incur a small penalty. This is intentionally simple for Phase 2.
+    With `priors`, the restaurant's popularity prior is blended in at the
+    configured weight (ZOMATO_POPULARITY_WEIGHT).
     """
-    rating = row.get("rating") or 0.0
-    price = row.get("price_range") or 0
-    base = float(rating) * 2.0
+    base = float(rating or 0.0) * 2.0
 
     penalty = 0.0
     if preferences.max_price is not None and price and price > preferences.max_price:
         penalty = (price - preferences.max_price) * 0.01
 
-    return base - penalty
+    boost = priors.boost(restaurant_id) if priors is not None else 0.0
 
+    return base - penalty + boost
 
-def filter_restaurants(engine: Engine, preferences: UserPreference) -> List[Restaurant]:
-    """
-    Filter restaurants from the database according to user preferences and
-    return them sorted by a heuristic score.
+
+def _filter_store(
+    store: RestaurantStore,
+    preferences: UserPreference,
+    semantic: "SemanticIndex | None" = None,
+) -> List[Restaurant]:
     """
-    rows = dedup_rows_by_name_location(fetch_all_restaurants(engine))
+    Filter and rank a `RestaurantStore` with the `_matches_*` predicates and
+    `compute_score`.
 
-    filtered: list[Restaurant] = []
-    for row in rows:
-        if not _matches_location(row, preferences.location):
-            continue
-        if not _matches_price(row, preferences.min_price, preferences.max_price):
+    With a free-text `query`, only restaurants similar to it are kept and
+    the similarity is added to the score (see `zomato_ai.phase2.semantic`);
+    without a `semantic` index one is built from the store.
+    """
+    priors = get_popularity_priors()
+    # Location and cuisine predicates depend only on the interned string, so
+    # evaluate them once per distinct value rather than once per row.
+    location_ok = [_matches_location(loc, preferences.location) for loc in store.locations]
+    cuisine_ok = [_matches_cuisines(c, preferences.preferred_cuisines) for c in store.cuisines]
+    min_price, max_price, min_rating = preferences.min_price, preferences.max_price, preferences.min_rating
+    # Predicates for filters the user left empty always pass; skip the calls.
+    check_price = min_price is not None or max_price is not None
+    check_rating = min_rating is not None
+
+    ids = store.ids
+    scored: list[tuple[float, int]] = []
+    rows = zip(store.location_codes, store.cuisine_codes, store.prices, store.ratings)
+    for i, (location_code, cuisine_code, price_code, rating_code) in enumerate(rows):
+        if not location_ok[location_code] or not cuisine_ok[cuisine_code]:
             continue
-        if not _matches_rating(row, preferences.min_rating):
+        price = price_code if price_code != MISSING else None
+        rating = rating_code / RATING_SCALE if rating_code != MISSING else None
+        if check_price and not _matches_price(price, min_price, max_price):
             continue
-        if not _matches_cuisines(row, preferences.preferred_cuisines or []):
+        if check_rating and not _matches_rating(rating, min_rating):
             continue
-
-        score = compute_score(row, preferences)
-        filtered.append(
-            Restaurant(
-                id=row["id"],
-                name=row["name"],
-                location=row.get("location"),
-                cuisines=row.get("cuisines"),
-                price_range=row.get("price_range"),
-                rating=row.get("rating"),
-                score=score,
-            )
+        scored.append((compute_score(rating, price, ids[i], preferences, priors), i))
+
+    if preferences.query and preferences.query.strip():
+        scored = _apply_query(scored, store, preferences.query, semantic)
+
+    # Same order as a stable descending sort; models are built only for the rows returned.
+    top = heapq.nlargest(preferences.limit, scored, key=itemgetter(0))
+    return [
+        Restaurant(
+            id=ids[i],
+            name=store.name(i),
+            location=store.location(i),
+            cuisines=store.cuisine(i),
+            price_range=store.price_range(i),
+            rating=store.rating(i),
+            score=score,
         )
+        for score, i in top
+    ]
+
+
+def _apply_query(
+    scored: list[tuple[float, int]],
+    store: RestaurantStore,
+    query: str,
+    semantic: "SemanticIndex | None",
+) -> list[tuple[float, int]]:
+    from .semantic import SEMANTIC_WEIGHT, SemanticIndex
+
+    if semantic is None:
+        semantic = SemanticIndex.from_store(store)
+    ids = store.ids
+    matches = semantic.matches(query, [ids[i] for _, i in scored])
+    return [
+        (score + SEMANTIC_WEIGHT * matches[ids[i]], i) for score, i in scored if ids[i] in matches
+    ]
+
+
+def _semantic_index(engine: Engine, preferences_list: Sequence[UserPreference]) -> "SemanticIndex | None":
+    """The engine's search index, loaded only when some query asks for free-text matching."""
+    if not any(p.query and p.query.strip() for p in preferences_list):
+        return None
+    from .semantic import semantic_index_for
 
-    filtered.sort(key=lambda r: r.score, reverse=True)
+    with span("semantic_index"):
+        return semantic_index_for(engine)
 
-    return filtered[: preferences.limit]
 
+def _filter_rows(rows: Sequence[Mapping[str, Any]], preferences: UserPreference) -> List[Restaurant]:
+    return _filter_store(RestaurantStore.from_rows(rows), preferences)
+
+
+def _fetch_deduped_store(engine: Engine) -> RestaurantStore:
+    with span("db_fetch"):
+        store = fetch_restaurant_store(engine)
+    with span("dedup"):
+        return dedup_store_by_name_location(store)
+
+
+def filter_restaurants(engine: Engine, preferences: UserPreference) -> List[Restaurant]:
+    """
+    Filter restaurants from the database according to user preferences and
+    return them sorted by a heuristic score.
+    """
+    store = _fetch_deduped_store(engine)
+    semantic = _semantic_index(engine, [preferences])
+    with span("filter"):
+        return _filter_store(store, preferences, semantic)
+
+
+def filter_restaurants_many(
+    engine: Engine, preferences_list: Sequence[UserPreference]
+) -> List[List[Restaurant]]:
+    """
+    Filter restaurants for many preference sets against a single snapshot.
+
+    The table is fetched and deduplicated once; results are returned in the
+    same order as `preferences_list`.
+    """
+    if not preferences_list:
+        return []
+    store = _fetch_deduped_store(engine)
+    semantic = _semantic_index(engine, preferences_list)
+    with span("filter"):
+        return [_filter_store(store, preferences, semantic) for preferences in preferences_list]
@@ -24,6 +24,11 @@ class UserPreference(BaseModel):
         default=None,
         description="List of cuisines the user prefers, e.g. ['Italian', 'Chinese'].",
     )
+    query: Optional[str] = Field(
+        default=None,
+        max_length=200,
+        description="Free-text description matched against names, cuisines and locations, e.g. 'rooftop grill'.",
+    )
     limit: int = Field(
         default=10,
         ge=1,
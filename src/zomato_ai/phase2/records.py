@@ -0,0 +1,186 @@
+"""
+Compact in-memory form of the restaurants table for the filtering hot path.
+
+`RestaurantStore` keeps one column per field instead of one mapping per row:
+ids, prices and ratings live in fixed-width `array`s, names are packed into
+one string with an offsets array, and locations and cuisine strings are
+stored once each and referenced by integer code. A restaurant costs roughly
+its name's characters plus ~30 bytes, instead of a SQLAlchemy `RowMapping`
+holding its own copies of every string and number.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Ratings are stored as hundredths (4.1 -> 410); the dataset uses one decimal.
+RATING_SCALE = 100
+# Sentinel for a missing price or rating.
+MISSING = -1
+
+# (id, name, location, cuisines, price_range, rating), as selected from the table.
+RowTuple = Tuple[int, str, Optional[str], Optional[str], Optional[int], Optional[float]]
+
+
+class _Interner:
+    """Assigns a stable code to each distinct value (None included)."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: List[str | None] = []
+        self._codes: Dict[str | None, int] = {}
+
+    def code(self, value: str | None) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class RestaurantStore:
+    """
+    Struct-of-arrays view of restaurant rows.
+
+    Row `i` is (`ids[i]`, `name(i)`, `location(i)`, `cuisine(i)`,
+    `price_range(i)`, `rating(i)`). Stores are immutable once built; `take`
+    returns a new store sharing the location and cuisine tables.
+    """
+
+    __slots__ = (
+        "ids",
+        "_names",
+        "_name_offsets",
+        "location_codes",
+        "cuisine_codes",
+        "prices",
+        "ratings",
+        "locations",
+        "cuisines",
+    )
+
+    def __init__(
+        self,
+        ids: array,
+        names: str,
+        name_offsets: array,
+        location_codes: array,
+        cuisine_codes: array,
+        prices: array,
+        ratings: array,
+        locations: Sequence[str | None],
+        cuisines: Sequence[str | None],
+    ) -> None:
+        self.ids = ids
+        # Name i is names[name_offsets[i]:name_offsets[i + 1]].
+        self._names = names
+        self._name_offsets = name_offsets
+        self.location_codes = location_codes
+        self.cuisine_codes = cuisine_codes
+        self.prices = prices
+        self.ratings = ratings
+        self.locations = locations
+        self.cuisines = cuisines
+
+    @classmethod
+    def from_tuples(cls, rows: Iterable[RowTuple]) -> "RestaurantStore":
+        """Build from (id, name, location, cuisines, price_range, rating) tuples."""
+        ids, location_codes, cuisine_codes = array("q"), array("I"), array("I")
+        prices, ratings = array("i"), array("h")
+        names: List[str] = []
+        name_offsets = array("I", [0])
+        end = 0
+        locations, cuisines = _Interner(), _Interner()
+        for rid, name, location, cuisine, price, rating in rows:
+            ids.append(rid)
+            names.append(name)
+            end += len(name)
+            name_offsets.append(end)
+            location_codes.append(locations.code(location))
+            cuisine_codes.append(cuisines.code(cuisine))
+            prices.append(MISSING if price is None else int(price))
+            ratings.append(MISSING if rating is None else round(rating * RATING_SCALE))
+        return cls(
+            ids,
+            "".join(names),
+            name_offsets,
+            location_codes,
+            cuisine_codes,
+            prices,
+            ratings,
+            locations.values,
+            cuisines.values,
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "RestaurantStore":
+        """Build from mapping rows as returned by `fetch_all_restaurants`."""
+        return cls.from_tuples(
+            (
+                row["id"],
+                row["name"],
+                row.get("location"),
+                row.get("cuisines"),
+                row.get("price_range"),
+                row.get("rating"),
+            )
+            for row in rows
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def name(self, i: int) -> str:
+        return self._names[self._name_offsets[i] : self._name_offsets[i + 1]]
+
+    def iter_names(self) -> Iterator[str]:
+        names, offsets = self._names, self._name_offsets
+        return (names[start:end] for start, end in zip(offsets, offsets[1:]))
+
+    def price_range(self, i: int) -> int | None:
+        price = self.prices[i]
+        return None if price == MISSING else price
+
+    def rating(self, i: int) -> float | None:
+        rating = self.ratings[i]
+        return None if rating == MISSING else rating / RATING_SCALE
+
+    def location(self, i: int) -> str | None:
+        return self.locations[self.location_codes[i]]
+
+    def cuisine(self, i: int) -> str | None:
+        return self.cuisines[self.cuisine_codes[i]]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Row `i` as a plain mapping (for callers outside the hot path)."""
+        return {
+            "id": self.ids[i],
+            "name": self.name(i),
+            "location": self.location(i),
+            "cuisines": self.cuisine(i),
+            "price_range": self.price_range(i),
+            "rating": self.rating(i),
+        }
+
+    def take(self, indices: Iterable[int]) -> "RestaurantStore":
+        """New store with only the rows at `indices`, in that order."""
+        indices = list(indices)
+        names = [self.name(i) for i in indices]
+        name_offsets = array("I", [0])
+        end = 0
+        for name in names:
+            end += len(name)
+            name_offsets.append(end)
+        return RestaurantStore(
+            array("q", (self.ids[i] for i in indices)),
+            "".join(names),
+            name_offsets,
+            array("I", (self.location_codes[i] for i in indices)),
+            array("I", (self.cuisine_codes[i] for i in indices)),
+            array("i", (self.prices[i] for i in indices)),
+            array("h", (self.ratings[i] for i in indices)),
+            self.locations,
+            self.cuisines,
+        )
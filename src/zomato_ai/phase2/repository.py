@@ -9,12 +9,17 @@ from sqlalchemy import (
     MetaData,
     String,
     Table,
-    create_engine,
+    Select,
     select,
 )
 from sqlalchemy.engine import Engine
 
-from zomato_ai.phase1.ingestion import DEFAULT_DB_URL
+from zomato_ai.config import DEFAULT_DB_URL
+# fetch_data_version is re-exported for callers that read the restaurants here.
+from zomato_ai.data.data_version import fetch_data_version
+from zomato_ai.data.engines import create_sqlite_engine, read_engine_for
+
+from .records import RestaurantStore
 
 
 metadata = MetaData()
@@ -35,14 +40,17 @@ def create_engine_for_url(db_url: str | None = None) -> Engine:
     """
     Create a SQLAlchemy engine for the given database URL.
 
-    Defaults to the Phase 1 SQLite database if no URL is provided.
+    Defaults to the Phase 1 SQLite database if no URL is provided. SQLite
+    files get WAL and the tuned pragmas from `zomato_ai.data.engines`.
     """
-    return create_engine(db_url or DEFAULT_DB_URL, future=True)
+    return create_sqlite_engine(db_url or DEFAULT_DB_URL)
 
 
-def fetch_all_restaurants(engine: Engine) -> List[Mapping[str, Any]]:
-    """Fetch all restaurants from the database as plain mapping objects."""
-    stmt = select(
+# Statements and row post-processing are shared with `async_repository`.
+
+
+def restaurants_query() -> Select:
+    return select(
         restaurants_table.c.id,
         restaurants_table.c.name,
         restaurants_table.c.location,
@@ -50,23 +58,20 @@ def fetch_all_restaurants(engine: Engine) -> List[Mapping[str, Any]]:
         restaurants_table.c.price_range,
         restaurants_table.c.rating,
     )
-    with engine.connect() as conn:
-        result = conn.execute(stmt)
-        rows = result.mappings().all()
-    return list(rows)
 
 
-def fetch_unique_locations(engine: Engine) -> List[str]:
-    """
-    Return a sorted list of unique, non-empty location strings from the
-    restaurants table.  Whitespace is stripped and empty values are excluded.
-    """
-    stmt = select(restaurants_table.c.location).distinct()
-    with engine.connect() as conn:
-        rows = conn.execute(stmt).scalars().all()
+def locations_query() -> Select:
+    return select(restaurants_table.c.location).distinct()
+
 
+def cuisines_query() -> Select:
+    return select(restaurants_table.c.cuisines)
+
+
+def clean_locations(values: Iterable[Any]) -> List[str]:
+    """Strip, drop empty values, deduplicate and sort case-insensitively."""
     locations: set[str] = set()
-    for raw in rows:
+    for raw in values:
         if raw is None:
             continue
         cleaned = str(raw).strip()
@@ -76,19 +81,10 @@ def fetch_unique_locations(engine: Engine) -> List[str]:
     return sorted(locations, key=str.casefold)
 
 
-def fetch_unique_cuisines(engine: Engine) -> List[str]:
-    """
-    Return a sorted list of unique individual cuisine names found in the
-    restaurants table.  Each row may contain a comma-separated list of
-    cuisines; this function splits them, strips whitespace, deduplicates,
-    and returns a sorted result.
-    """
-    stmt = select(restaurants_table.c.cuisines)
-    with engine.connect() as conn:
-        rows = conn.execute(stmt).scalars().all()
-
+def split_cuisines(values: Iterable[Any]) -> List[str]:
+    """Split comma-separated cuisine lists into sorted, unique names."""
     cuisines: set[str] = set()
-    for raw in rows:
+    for raw in values:
         if raw is None:
             continue
         for part in str(raw).split(","):
@@ -97,3 +93,51 @@ def fetch_unique_cuisines(engine: Engine) -> List[str]:
                 cuisines.add(cleaned)
 
     return sorted(cuisines, key=str.casefold)
+
+
+def fetch_all_restaurants(engine: Engine) -> List[Mapping[str, Any]]:
+    """Fetch all restaurants from the database as plain mapping objects."""
+    with read_engine_for(engine).connect() as conn:
+        result = conn.execute(restaurants_query())
+        rows = result.mappings().all()
+    return list(rows)
+
+
+def fetch_restaurant_store(engine: Engine) -> RestaurantStore:
+    """
+    Fetch all restaurants into a compact `RestaurantStore`.
+
+    Rows are streamed straight into the store's columns, so no per-row
+    mapping objects are kept.
+    """
+    with read_engine_for(engine).connect() as conn:
+        return RestaurantStore.from_tuples(conn.execute(restaurants_query()))
+
+
+def restaurant_exists(engine: Engine, restaurant_id: int) -> bool:
+    """Return True if `restaurant_id` is a row in the restaurants table."""
+    query = select(restaurants_table.c.id).where(restaurants_table.c.id == restaurant_id)
+    with read_engine_for(engine).connect() as conn:
+        return conn.execute(query).first() is not None
+
+
+def fetch_unique_locations(engine: Engine) -> List[str]:
+    """
+    Return a sorted list of unique, non-empty location strings from the
+    restaurants table.  Whitespace is stripped and empty values are excluded.
+    """
+    with read_engine_for(engine).connect() as conn:
+        rows = conn.execute(locations_query()).scalars().all()
+    return clean_locations(rows)
+
+
+def fetch_unique_cuisines(engine: Engine) -> List[str]:
+    """
+    Return a sorted list of unique individual cuisine names found in the
+    restaurants table.  Each row may contain a comma-separated list of
+    cuisines; this function splits them, strips whitespace, deduplicates,
+    and returns a sorted result.
+    """
+    with read_engine_for(engine).connect() as conn:
+        rows = conn.execute(cuisines_query()).scalars().all()
+    return split_cuisines(rows)
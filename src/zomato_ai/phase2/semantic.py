@@ -0,0 +1,459 @@
+"""
+Local free-text search over restaurants (`UserPreference.query`).
+
+Each restaurant's name, cuisines and location are embedded with hashed
+TF-IDF: word and character-trigram features are hashed (with a sign bit)
+into `dim` buckets, weighted by sublinear term frequency and per-bucket
+IDF, and L2-normalised, so cosine similarity is a dot product. Everything
+runs on the CPU with numpy; no model download is needed.
+
+Vectors are grouped by an IVF (inverted file) index: spherical k-means
+centroids partition the rows, each partition is stored contiguously, and a
+query scans only the `nprobe` partitions whose centroids are closest.
+Small candidate sets (after the structured filters) are scored exactly
+instead. On disk each saved index is a directory of `.npy` files under the
+index directory, named by a `current` pointer file; the vector matrix is
+opened as a read-only memory map.
+
+Build an index after ingesting (`python -m zomato_ai.phase2.semantic`). The
+API builds one on the first query if none was saved; when the restaurant
+data changes it keeps serving the index it has while a background thread
+builds the new one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import pathlib
+import re
+import shutil
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Engine, make_url
+
+from zomato_ai.data.data_version import current_data_version, fetch_data_version
+from zomato_ai.data.engines import is_sqlite_file_url
+
+from .records import RestaurantStore
+from .repository import create_engine_for_url, fetch_restaurant_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 256
+# Candidate sets up to this size are scored exactly rather than through IVF.
+EXACT_SEARCH_MAX = 4096
+# Nearest neighbours fetched from IVF before the structured filters apply.
+ANN_CANDIDATES = 1000
+DEFAULT_NPROBE = 16
+# Hash collisions leave unrelated texts with small similarities (|s| < ~0.06
+# in practice); below this a restaurant is not a match.
+MIN_SIMILARITY = 0.1
+# Weight of cosine similarity (0-1) against the heuristic score (rating x 2).
+SEMANTIC_WEIGHT = 10.0
+
+# File in an index directory naming the saved version to load.
+_CURRENT = "current"
+
+# Words start with a letter; bare numbers ("#12", "1947") carry no meaning here.
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9]*")
+
+
+class HashedTfidfEncoder:
+    """
+    Hashed TF-IDF text encoder. A text's vector is the sum of its tokens'
+    feature vectors (the word plus its character trigrams, each hashed to a
+    signed bucket) scaled by per-bucket IDF. Hashes are CRC32 of the
+    feature string, so vectors are stable across processes (unlike `hash()`).
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, idf: np.ndarray | None = None) -> None:
+        self.dim = dim
+        self.idf = idf if idf is not None else np.ones(dim, dtype=np.float32)
+
+    def token_features(self, token: str) -> List[Tuple[int, float]]:
+        """(bucket, sign) for the word itself and each of its padded character trigrams."""
+        padded = f"#{token}#"
+        features = []
+        for gram in [f"w:{token}"] + [padded[i : i + 3] for i in range(len(padded) - 2)]:
+            h = zlib.crc32(gram.encode("utf-8"))
+            features.append((h % self.dim, 1.0 if h & 0x80000000 else -1.0))
+        return features
+
+    def fit_transform(self, documents: Sequence[Sequence[str | None]], chunk: int = 8192) -> np.ndarray:
+        """
+        Learn per-bucket IDF from `documents` (each a sequence of text
+        fields) and return their unit vectors. Tokenisation is cached per
+        distinct field value, since cuisines and locations repeat heavily.
+        """
+        vocab: Dict[str, int] = {}
+        field_tokens: Dict[str | None, List[int]] = {None: []}
+        tokens: List[int] = []
+        counts: List[int] = []
+        for fields in documents:
+            before = len(tokens)
+            for field in fields:
+                ids = field_tokens.get(field)
+                if ids is None:
+                    ids = field_tokens[field] = [
+                        vocab.setdefault(token, len(vocab)) for token in _TOKEN_RE.findall(field.lower())
+                    ]
+                tokens.extend(ids)
+            counts.append(len(tokens) - before)
+
+        # Each token's signed buckets, flattened (CSR-style: token t owns
+        # entries feature_ptr[t]:feature_ptr[t + 1]).
+        per_token = [self.token_features(token) for token in vocab]
+        feature_ptr = np.concatenate([[0], np.cumsum([len(f) for f in per_token])]).astype(np.int64)
+        feature_bucket = np.fromiter((b for f in per_token for b, _ in f), dtype=np.int64, count=feature_ptr[-1])
+        feature_sign = np.fromiter((v for f in per_token for _, v in f), dtype=np.float64, count=feature_ptr[-1])
+
+        # Scatter-add every token's features into its document's row, a chunk
+        # of documents at a time to bound the temporary arrays.
+        n = len(counts)
+        matrix = np.zeros((n, self.dim), dtype=np.float32)
+        token_arr = np.asarray(tokens, dtype=np.int64)
+        token_doc = np.repeat(np.arange(n, dtype=np.int64), counts)
+        ends = np.concatenate([[0], np.cumsum(np.asarray(counts, dtype=np.int64))])
+        for lo in range(0, n, chunk):
+            hi = min(n, lo + chunk)
+            occurrences = token_arr[ends[lo] : ends[hi]]
+            sizes = feature_ptr[occurrences + 1] - feature_ptr[occurrences]
+            # Position of every feature of every occurrence in the flat arrays.
+            first = np.repeat(feature_ptr[occurrences] - np.cumsum(sizes) + sizes, sizes)
+            features = first + np.arange(int(sizes.sum()), dtype=np.int64)
+            rows = np.repeat(token_doc[ends[lo] : ends[hi]] - lo, sizes)
+            flat = rows * self.dim + feature_bucket[features]
+            block = np.bincount(flat, weights=feature_sign[features], minlength=(hi - lo) * self.dim)
+            matrix[lo:hi] = block.reshape(hi - lo, self.dim)
+
+        df = np.count_nonzero(matrix, axis=0)
+        self.idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+        matrix *= self.idf
+        return _normalise_rows(matrix)
+
+    def encode(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            for bucket, sign in self.token_features(token):
+                vector[bucket] += sign
+        vector *= self.idf
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def _spherical_kmeans(vectors: np.ndarray, k: int, *, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids that maximise dot product with their members (trained on a sample)."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), k * 64), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        present, starts = np.unique(assignment[order], return_index=True)
+        sums = np.zeros_like(centroids)
+        sums[present] = np.add.reduceat(sample[order], starts, axis=0)
+        empty = ~np.bincount(assignment, minlength=k).astype(bool)
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = _normalise_rows(sums)
+    return centroids
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    return np.concatenate(
+        [np.argmax(vectors[i : i + chunk] @ centroids.T, axis=1) for i in range(0, len(vectors), chunk)]
+        or [np.zeros(0, dtype=np.int64)]
+    )
+
+
+class SemanticIndex:
+    """
+    IVF index over restaurant vectors. Row order groups partitions: rows
+    `offsets[p]:offsets[p + 1]` of `vectors` and `ids` belong to centroid `p`.
+    """
+
+    def __init__(
+        self,
+        *,
+        encoder: HashedTfidfEncoder,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        data_version: str = "",
+    ) -> None:
+        self.encoder = encoder
+        self.vectors = vectors
+        self.ids = ids
+        self.centroids = centroids
+        self.offsets = offsets
+        self.data_version = data_version
+        self._id_order = np.argsort(ids, kind="stable")
+        self._sorted_ids = ids[self._id_order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[int],
+        documents: Sequence[Sequence[str | None]],
+        *,
+        dim: int = DEFAULT_DIM,
+        nlist: int | None = None,
+        data_version: str = "",
+    ) -> "SemanticIndex":
+        encoder = HashedTfidfEncoder(dim)
+        vectors = encoder.fit_transform(documents)
+        ids_arr = np.asarray(ids, dtype=np.int64)
+        if nlist is None:
+            nlist = max(1, min(1024, int(math.sqrt(len(ids_arr)))))
+        nlist = max(1, min(nlist, len(ids_arr)))
+        if len(ids_arr):
+            centroids = _spherical_kmeans(vectors, nlist)
+            assignment = _assign(vectors, centroids)
+        else:
+            centroids = np.zeros((0, dim), dtype=np.float32)
+            assignment = np.zeros(0, dtype=np.int64)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))])
+        return cls(
+            encoder=encoder,
+            vectors=np.ascontiguousarray(vectors[order]),
+            ids=ids_arr[order],
+            centroids=centroids,
+            offsets=offsets.astype(np.int64),
+            data_version=data_version,
+        )
+
+    @classmethod
+    def from_store(cls, store: RestaurantStore, *, data_version: str = "", **kwargs) -> "SemanticIndex":
+        documents = [(name, store.cuisine(i), store.location(i)) for i, name in enumerate(store.iter_names())]
+        return cls.build(list(store.ids), documents, data_version=data_version, **kwargs)
+
+    def save(self, directory: pathlib.Path) -> None:
+        """
+        Write the index to a new subdirectory of `directory` and point
+        `current` at it. Concurrent writers never touch each other's files;
+        a pointer left naming a removed save falls back to the newest one.
+        Older saves are removed, except the one just before this, which a
+        reader may still be opening.
+        """
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"v{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        staging = directory / f".{name}.tmp"
+        staging.mkdir()
+        np.save(staging / "vectors.npy", self.vectors)
+        np.save(staging / "ids.npy", self.ids)
+        np.save(staging / "centroids.npy", self.centroids)
+        np.save(staging / "offsets.npy", self.offsets)
+        np.save(staging / "idf.npy", self.encoder.idf)
+        (staging / "meta.json").write_text(
+            json.dumps({"dim": self.encoder.dim, "count": len(self), "data_version": self.data_version})
+        )
+        staging.rename(directory / name)
+        pointer = directory / f".{_CURRENT}-{name}.tmp"
+        pointer.write_text(name)
+        os.replace(pointer, directory / _CURRENT)
+        # Open memory maps of the removed files stay valid after the unlink.
+        older = sorted(p for p in directory.glob("v*") if p.name < name)
+        for old in older[:-1]:
+            # Renamed out of the `v*` names first, so no reader finds it half deleted.
+            retired = directory / f".{old.name}.retired"
+            try:
+                old.rename(retired)
+            except OSError:
+                continue  # Another save is removing it.
+            shutil.rmtree(retired, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: pathlib.Path) -> "SemanticIndex":
+        """Open the index `directory/current` points at."""
+        directory = pathlib.Path(directory)
+        for _ in range(2):
+            try:
+                return cls._load_saved(_current_save(directory))
+            except FileNotFoundError:
+                # A save running meanwhile removed that version; look again.
+                pass
+        return cls._load_saved(_current_save(directory))
+
+    @classmethod
+    def _load_saved(cls, directory: pathlib.Path) -> "SemanticIndex":
+        meta = json.loads((directory / "meta.json").read_text())
+        return cls(
+            encoder=HashedTfidfEncoder(meta["dim"], idf=np.load(directory / "idf.npy")),
+            vectors=np.load(directory / "vectors.npy", mmap_mode="r"),
+            ids=np.load(directory / "ids.npy"),
+            centroids=np.load(directory / "centroids.npy"),
+            offsets=np.load(directory / "offsets.npy"),
+            data_version=meta["data_version"],
+        )
+
+    def search(self, query: str, k: int = ANN_CANDIDATES, nprobe: int = DEFAULT_NPROBE) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-`k` (ids, similarities) of at least MIN_SIMILARITY, best first."""
+        q = self.encoder.encode(query)
+        if not len(self) or not q.any():
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        closeness = self.centroids @ q
+        nprobe = min(nprobe, len(closeness))
+        probe = np.argpartition(-closeness, nprobe - 1)[:nprobe] if nprobe < len(closeness) else range(len(closeness))
+        rows = np.concatenate([np.arange(self.offsets[p], self.offsets[p + 1]) for p in probe])
+        sims = np.concatenate([self.vectors[self.offsets[p] : self.offsets[p + 1]] @ q for p in probe])
+        if len(sims) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            rows, sims = rows[top], sims[top]
+        best = np.argsort(-sims, kind="stable")
+        rows, sims = rows[best], sims[best]
+        relevant = sims >= MIN_SIMILARITY
+        return self.ids[rows[relevant]], sims[relevant]
+
+    def similarities(self, query: str, ids: Sequence[int]) -> np.ndarray:
+        """Exact similarity of `query` to each of `ids` (0 for ids not in the index)."""
+        ids_arr = np.asarray(ids, dtype=np.int64)
+        result = np.zeros(len(ids_arr), dtype=np.float32)
+        if not len(self) or not len(ids_arr):
+            return result
+        pos = np.minimum(np.searchsorted(self._sorted_ids, ids_arr), len(self) - 1)
+        known = self._sorted_ids[pos] == ids_arr
+        rows = self._id_order[pos[known]]
+        result[known] = self.vectors[rows] @ self.encoder.encode(query)
+        return result
+
+    def matches(self, query: str, candidate_ids: Sequence[int]) -> Dict[int, float]:
+        """
+        id -> similarity for the candidates that match `query`. Few
+        candidates are scored exactly; otherwise the IVF neighbours of the
+        query are intersected with them.
+        """
+        if len(candidate_ids) <= EXACT_SEARCH_MAX:
+            sims = self.similarities(query, candidate_ids)
+            return {int(i): float(s) for i, s in zip(candidate_ids, sims) if s >= MIN_SIMILARITY}
+        ids, sims = self.search(query)
+        return dict(zip(ids.tolist(), sims.tolist()))
+
+
+def _current_save(directory: pathlib.Path) -> pathlib.Path:
+    """
+    The save `current` names. Concurrent saves can leave it naming one a
+    newer save has removed; the newest remaining save is used then.
+    """
+    named = directory / (directory / _CURRENT).read_text().strip()
+    if named.is_dir():
+        return named
+    saves = sorted(directory.glob("v*"))
+    if not saves:
+        raise FileNotFoundError(f"No saved index in {directory}")
+    return saves[-1]
+
+
+def semantic_index_dir_for(engine: Engine) -> pathlib.Path | None:
+    """ZOMATO_SEMANTIC_INDEX_DIR, else `<db file>.semantic` next to a SQLite file; None otherwise."""
+    configured = os.getenv("ZOMATO_SEMANTIC_INDEX_DIR", "").strip()
+    if configured:
+        return pathlib.Path(configured)
+    if not is_sqlite_file_url(engine.url):
+        return None
+    database = make_url(engine.url).database or ""
+    return pathlib.Path(database.removeprefix("file:")).with_suffix(".semantic")
+
+
+def build_semantic_index(engine: Engine, directory: pathlib.Path | None = None) -> SemanticIndex:
+    """Embed every restaurant in the database and save the index to `directory` if given."""
+    data_version = fetch_data_version(engine)
+    index = SemanticIndex.from_store(fetch_restaurant_store(engine), data_version=data_version)
+    if directory is not None:
+        index.save(directory)
+    return index
+
+
+def _load_if_saved(directory: pathlib.Path | None) -> SemanticIndex | None:
+    if directory is None or not (directory / _CURRENT).exists():
+        return None
+    return SemanticIndex.load(directory)
+
+
+_indexes: "weakref.WeakKeyDictionary[Engine, SemanticIndex]" = weakref.WeakKeyDictionary()
+_rebuilding: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+_indexes_lock = threading.Lock()
+# Held only while a request waits for the first index of a database.
+_first_build_lock = threading.Lock()
+
+
+def semantic_index_for(engine: Engine) -> SemanticIndex:
+    """
+    The index for `engine`: cached in memory, else loaded from its
+    directory, else built (and saved) now. An index older than the data is
+    still returned; a background thread builds the current one, which
+    later calls get.
+    """
+    with _indexes_lock:
+        index = _indexes.get(engine)
+    if index is None:
+        with _first_build_lock:
+            with _indexes_lock:
+                index = _indexes.get(engine)
+            if index is None:
+                directory = semantic_index_dir_for(engine)
+                index = _load_if_saved(directory) or build_semantic_index(engine, directory)
+                with _indexes_lock:
+                    _indexes[engine] = index
+    if index.data_version != current_data_version(engine):
+        _rebuild_in_background(engine)
+    return index
+
+
+def _rebuild_in_background(engine: Engine) -> None:
+    with _indexes_lock:
+        if engine in _rebuilding:
+            return
+        _rebuilding.add(engine)
+    threading.Thread(target=_rebuild, args=(engine,), name="semantic-index-rebuild", daemon=True).start()
+
+
+def _rebuild(engine: Engine) -> None:
+    try:
+        directory = semantic_index_dir_for(engine)
+        # Another worker process may have saved the current index already.
+        index = _load_if_saved(directory)
+        if index is None or index.data_version != fetch_data_version(engine):
+            index = build_semantic_index(engine, directory)
+        with _indexes_lock:
+            _indexes[engine] = index
+    except Exception:
+        logger.exception("Rebuilding the semantic index failed; serving the previous one")
+    finally:
+        with _indexes_lock:
+            _rebuilding.discard(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the free-text search index for the restaurants table.")
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+    engine = create_engine_for_url(args.db_url)
+    directory = semantic_index_dir_for(engine)
+    index = build_semantic_index(engine, directory)
+    print(f"Indexed {len(index)} restaurants in {len(index.centroids)} partitions -> {directory}")
+
+
+if __name__ == "__main__":
+    main()
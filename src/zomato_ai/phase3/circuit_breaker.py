@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Deque, Iterator
+
+from zomato_ai.metrics import REGISTRY
+
+from .rate_limit import LLM_REJECTED, LLMRateLimitedError
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    "zomato_llm_circuit_transitions_total",
+    "LLM circuit breaker state transitions.",
+    labelnames=("from_state", "to_state"),
+)
+CIRCUIT_OPEN_SECONDS = REGISTRY.counter(
+    "zomato_llm_circuit_open_seconds_total",
+    "Total time the LLM circuit breaker has spent open (completed open periods).",
+)
+
+
+class CircuitOpenError(LLMRateLimitedError):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("circuit_open", retry_after=retry_after)
+
+
+@dataclass(frozen=True)
+class CircuitBreakerConfig:
+    """
+    Thresholds for the LLM circuit breaker.
+
+    The breaker opens after `failure_threshold` consecutive failures, or when
+    at least `failure_rate` of the last `window_size` calls failed. Calls
+    slower than `slow_call_seconds` count as failures. After `open_seconds`
+    the breaker lets `half_open_probes` calls through to test recovery.
+    """
+
+    failure_threshold: int = 5
+    failure_rate: float = 0.5
+    window_size: int = 20
+    slow_call_seconds: float = 10.0
+    open_seconds: float = 30.0
+    half_open_probes: int = 1
+
+
+def _float_from_env(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        raise RuntimeError(f"{name} must be a number, got {raw!r}")
+
+
+def load_circuit_breaker_config_from_env() -> CircuitBreakerConfig:
+    return CircuitBreakerConfig(
+        failure_threshold=int(_float_from_env("GROQ_BREAKER_FAILURE_THRESHOLD", 5)),
+        slow_call_seconds=_float_from_env("GROQ_BREAKER_SLOW_CALL_SECONDS", 10.0),
+        open_seconds=_float_from_env("GROQ_BREAKER_OPEN_SECONDS", 30.0),
+    )
+
+
+class CircuitBreaker:
+    """
+    Closed → open → half-open circuit breaker for upstream LLM calls.
+
+    While open, `guard()` raises `CircuitOpenError` immediately so callers
+    skip straight to their fallback instead of paying for a doomed call.
+    Client-side rate-limit rejections are neutral: they neither trip nor
+    heal the breaker.
+    """
+
+    def __init__(
+        self,
+        config: CircuitBreakerConfig,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.config = config
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, config.window_size))
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._reopen_at = 0.0
+        self._probes_in_flight = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def open_for(self) -> float:
+        """Seconds the breaker has currently been open (0 unless open/half-open)."""
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return 0.0
+            return self._clock() - self._opened_at
+
+    def _transition(self, new_state: CircuitState) -> None:
+        old_state = self._state
+        if old_state == new_state:
+            return
+        now = self._clock()
+        if new_state == CircuitState.OPEN and old_state == CircuitState.CLOSED:
+            self._opened_at = now
+        if new_state == CircuitState.CLOSED:
+            CIRCUIT_OPEN_SECONDS.inc(now - self._opened_at)
+            self._outcomes.clear()
+            self._consecutive_failures = 0
+        if new_state == CircuitState.OPEN:
+            # Re-opening after a failed probe restarts the cool-down but keeps
+            # the original open timestamp for the open-duration metric.
+            self._reopen_at = now + self.config.open_seconds
+        self._state = new_state
+        CIRCUIT_TRANSITIONS.inc(from_state=old_state.value, to_state=new_state.value)
+
+    def _maybe_half_open(self) -> None:
+        if self._state == CircuitState.OPEN and self._clock() >= self._reopen_at:
+            self._transition(CircuitState.HALF_OPEN)
+            self._probes_in_flight = 0
+
+    def _should_trip(self) -> bool:
+        if self._consecutive_failures >= self.config.failure_threshold:
+            return True
+        if len(self._outcomes) < self._outcomes.maxlen:
+            return False
+        failures = sum(1 for ok in self._outcomes if not ok)
+        return failures / len(self._outcomes) >= self.config.failure_rate
+
+    def before_call(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CircuitState.OPEN:
+                LLM_REJECTED.inc(reason="circuit_open")
+                raise CircuitOpenError(retry_after=max(0.0, self._reopen_at - self._clock()))
+            if self._state == CircuitState.HALF_OPEN:
+                if self._probes_in_flight >= self.config.half_open_probes:
+                    LLM_REJECTED.inc(reason="circuit_open")
+                    raise CircuitOpenError(retry_after=1.0)
+                self._probes_in_flight += 1
+
+    def _finish_probe(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record_success(self, latency: float) -> None:
+        if latency >= self.config.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            self._finish_probe()
+            self._consecutive_failures = 0
+            self._outcomes.append(True)
+            if self._state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._finish_probe()
+            self._consecutive_failures += 1
+            self._outcomes.append(False)
+            if self._state == CircuitState.HALF_OPEN or (
+                self._state == CircuitState.CLOSED and self._should_trip()
+            ):
+                self._transition(CircuitState.OPEN)
+
+    def record_neutral(self) -> None:
+        with self._lock:
+            self._finish_probe()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Wrap one upstream call, recording its outcome and latency."""
+        self.before_call()
+        start = self._clock()
+        try:
+            yield
+        except LLMRateLimitedError:
+            self.record_neutral()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or interrupted: no verdict on upstream, but free the probe slot.
+            self.record_neutral()
+            raise
+        else:
+            self.record_success(self._clock() - start)
+
+
+_breaker: CircuitBreaker | None = None
+_breaker_lock = threading.Lock()
+
+
+def get_llm_circuit_breaker() -> CircuitBreaker:
+    """Process-wide breaker for Groq calls, configured from the environment on first use."""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(load_circuit_breaker_config_from_env())
+        return _breaker
+
+
+def configure_llm_circuit_breaker(config: CircuitBreakerConfig) -> CircuitBreaker:
+    """Replace the process-wide breaker (e.g. in tests or at startup)."""
+    global _breaker
+    with _breaker_lock:
+        _breaker = CircuitBreaker(config)
+        return _breaker
+
+
+REGISTRY.gauge(
+    "zomato_llm_circuit_state",
+    "LLM circuit breaker state (0=closed, 1=half-open, 2=open).",
+).set_function(lambda: _STATE_VALUES[get_llm_circuit_breaker().state])
+REGISTRY.gauge(
+    "zomato_llm_circuit_open_duration_seconds",
+    "How long the LLM circuit breaker has been open in the current episode.",
+).set_function(lambda: get_llm_circuit_breaker().open_for())
@@ -3,13 +3,13 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 
-from groq import Groq
-
 
 @dataclass(frozen=True)
 class GroqConfig:
     api_key: str
     model: str
+    # Override the API host, e.g. to point at the local fake server in loadtest/.
+    base_url: str | None = None
 
 
 def load_groq_config_from_env() -> GroqConfig:
@@ -18,13 +18,17 @@ def load_groq_config_from_env() -> GroqConfig:
         raise RuntimeError("Missing GROQ_API_KEY in environment (.env)")
 
     model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile").strip() or "llama-3.3-70b-versatile"
-    return GroqConfig(api_key=api_key, model=model)
+    base_url = os.getenv("GROQ_BASE_URL", "").strip() or None
+    return GroqConfig(api_key=api_key, model=model, base_url=base_url)
 
 
 class GroqLLMClient:
     def __init__(self, config: GroqConfig) -> None:
+        # The SDK (and its httpx/pydantic models) loads on first use, not at API import.
+        from groq import Groq
+
         self._config = config
-        self._client = Groq(api_key=config.api_key)
+        self._client = Groq(api_key=config.api_key, base_url=config.base_url)
 
     @property
     def model(self) -> str:
@@ -14,3 +14,16 @@ class LLMRecommendationResult(BaseModel):
     summary: str = Field(..., description="Overall summary of the recommendations.")
     recommendations: List[LLMRecommendationItem]
 
+
+class LLMBatchQueryResult(LLMRecommendationResult):
+    query: str = Field(..., description="Query section ID from the batched prompt, e.g. 'Q1'.")
+
+
+class LLMBatchResult(BaseModel):
+    results: List[LLMBatchQueryResult]
+
+
+class LLMReasonTemplates(BaseModel):
+    reasons: List[LLMRecommendationItem] = Field(
+        ..., description="One preference-independent description per restaurant ID."
+    )
@@ -1,13 +1,79 @@
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Callable, Sequence, TypeVar
 
+from zomato_ai.metrics import REGISTRY, span
 from zomato_ai.phase2.models import Restaurant, UserPreference
 
+from .circuit_breaker import get_llm_circuit_breaker
 from .groq_client import GroqLLMClient
 from .models import LLMRecommendationResult
-from .parsing import parse_llm_result
-from .prompt_builder import build_recommendation_prompt
+from .parsing import parse_llm_batch_result, parse_llm_result, parse_reason_templates
+from .prompt_builder import (
+    BatchQuery,
+    build_batch_recommendation_prompt,
+    build_reason_template_prompt,
+    build_recommendation_prompt,
+    estimate_prompt_tokens,
+    load_prompt_config_from_env,
+)
+from .rate_limit import get_llm_admission
+from .single_flight import llm_single_flight, prompt_key
+
+LLM_ERRORS = REGISTRY.counter(
+    "zomato_llm_errors_total",
+    "Failed Groq calls and unparseable answers, by HTTP status, exception type or 'parse'.",
+    labelnames=("error",),
+)
+
+T = TypeVar("T")
+
+
+def _request_key(client: GroqLLMClient, system_prompt: str, user_prompt: str) -> str:
+    return prompt_key(
+        model=str(getattr(client, "model", "")),
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+    )
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Return the upstream back-off for a Groq 429, or None for other errors."""
+    if getattr(exc, "status_code", None) != 429:
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return max(1.0, float(headers.get("retry-after", 1.0)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _admitted_complete(client: GroqLLMClient, system_prompt: str, user_prompt: str) -> str:
+    """
+    Call the client only if the circuit breaker is closed (or probing) and
+    the client-side rate limits admit the request.
+    """
+    admission = get_llm_admission()
+    with get_llm_circuit_breaker().guard():
+        with admission.admit(estimate_prompt_tokens(system_prompt, user_prompt)):
+            try:
+                return client.complete_json(system_prompt=system_prompt, user_prompt=user_prompt)
+            except Exception as exc:
+                status = getattr(exc, "status_code", None)
+                LLM_ERRORS.inc(error=str(status) if status is not None else type(exc).__name__)
+                retry_after = _retry_after_seconds(exc)
+                if retry_after is not None:
+                    admission.backoff(retry_after)
+                raise
+
+
+def _parse(parser: Callable[[str], T], raw: str) -> T:
+    with span("parse"):
+        try:
+            return parser(raw)
+        except Exception:
+            LLM_ERRORS.inc(error="parse")
+            raise
 
 
 def recommend_with_groq(
@@ -19,12 +85,89 @@ def recommend_with_groq(
 ) -> LLMRecommendationResult:
     """
     Ask Groq LLM to pick and explain the best restaurants from candidates.
+
+    Concurrent calls with an identical prompt are coalesced into a single
+    Groq request. Raises `LLMRateLimitedError` without calling Groq when the
+    request is over the client-side rate or concurrency budget, or
+    `CircuitOpenError` (a subclass) while Groq is considered unhealthy.
     """
-    system_prompt, user_prompt = build_recommendation_prompt(
-        preferences=preferences,
-        candidates=candidates,
-        limit=limit,
-    )
-    raw = client.complete_json(system_prompt=system_prompt, user_prompt=user_prompt)
-    return parse_llm_result(raw)
+    with span("prompt_build"):
+        prompt_config = load_prompt_config_from_env()
+        system_prompt, user_prompt = build_recommendation_prompt(
+            preferences=preferences,
+            candidates=candidates,
+            limit=limit,
+            compact=prompt_config.compact,
+            token_budget=prompt_config.token_budget,
+        )
+    with span("llm"):
+        raw = llm_single_flight.do(
+            _request_key(client, system_prompt, user_prompt),
+            lambda: _admitted_complete(client, system_prompt, user_prompt),
+        )
+    return _parse(parse_llm_result, raw)
+
 
+async def recommend_with_groq_async(
+    *,
+    client: GroqLLMClient,
+    preferences: UserPreference,
+    candidates: Sequence[Restaurant],
+    limit: int,
+) -> LLMRecommendationResult:
+    """Async variant of `recommend_with_groq` for `async def` handlers."""
+    with span("prompt_build"):
+        prompt_config = load_prompt_config_from_env()
+        system_prompt, user_prompt = build_recommendation_prompt(
+            preferences=preferences,
+            candidates=candidates,
+            limit=limit,
+            compact=prompt_config.compact,
+            token_budget=prompt_config.token_budget,
+        )
+    with span("llm"):
+        raw = await llm_single_flight.do_async(
+            _request_key(client, system_prompt, user_prompt),
+            lambda: _admitted_complete(client, system_prompt, user_prompt),
+        )
+    return _parse(parse_llm_result, raw)
+
+
+def recommend_batch_with_groq(
+    *,
+    client: GroqLLMClient,
+    queries: Sequence[BatchQuery],
+) -> dict[str, LLMRecommendationResult]:
+    """
+    Answer several recommendation queries with a single Groq call.
+
+    Returns results keyed by `BatchQuery.query_id`; queries the model did not
+    answer are missing from the mapping so callers can fall back per query.
+    """
+    with span("prompt_build"):
+        prompt_config = load_prompt_config_from_env()
+        system_prompt, user_prompt = build_batch_recommendation_prompt(
+            queries=queries,
+            compact=prompt_config.compact,
+        )
+    with span("llm"):
+        raw = llm_single_flight.do(
+            _request_key(client, system_prompt, user_prompt),
+            lambda: _admitted_complete(client, system_prompt, user_prompt),
+        )
+    return _parse(parse_llm_batch_result, raw)
+
+
+def generate_reason_templates_with_groq(
+    *,
+    client: GroqLLMClient,
+    restaurants: Sequence[Restaurant],
+) -> dict[int, str]:
+    """
+    Ask Groq for a stored, preference-independent reason per restaurant in
+    one call. IDs the model skipped or invented are left out of the result.
+    """
+    system_prompt, user_prompt = build_reason_template_prompt(restaurants=restaurants)
+    raw = _admitted_complete(client, system_prompt, user_prompt)
+    known = {r.id for r in restaurants}
+    return {rid: reason for rid, reason in parse_reason_templates(raw).items() if rid in known}
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from .models import LLMRecommendationResult
+from .models import LLMBatchResult, LLMReasonTemplates, LLMRecommendationResult
 
 
 def _extract_json_object(text: str) -> str:
@@ -23,3 +23,26 @@ def parse_llm_result(text: str) -> LLMRecommendationResult:
     data: Any = json.loads(raw)
     return LLMRecommendationResult.model_validate(data)
 
+
+def parse_llm_batch_result(text: str) -> dict[str, LLMRecommendationResult]:
+    """
+    Parse a multi-query LLM response into per-query results keyed by the
+    query section ID. Sections the model omitted are simply absent.
+    """
+    raw = _extract_json_object(text)
+    data: Any = json.loads(raw)
+    batch = LLMBatchResult.model_validate(data)
+    return {
+        item.query.strip(): LLMRecommendationResult(
+            summary=item.summary, recommendations=item.recommendations
+        )
+        for item in batch.results
+    }
+
+
+def parse_reason_templates(text: str) -> dict[int, str]:
+    """Parse a reason-template response into {restaurant_id: template}."""
+    raw = _extract_json_object(text)
+    data: Any = json.loads(raw)
+    templates = LLMReasonTemplates.model_validate(data)
+    return {item.id: item.reason.strip() for item in templates.reasons if item.reason.strip()}
@@ -1,29 +1,66 @@
 from __future__ import annotations
 
-from typing import Sequence
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import NamedTuple, Sequence
 
 from zomato_ai.phase2.models import Restaurant, UserPreference
 
 
-def build_recommendation_prompt(
-    *,
-    preferences: UserPreference,
-    candidates: Sequence[Restaurant],
-    limit: int,
-) -> tuple[str, str]:
+# Letter runs, 1-3 digit groups and single punctuation marks roughly match how
+# BPE tokenizers (e.g. Llama 3) split short tabular text.
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d{1,3}|[^\w\s]|_")
+
+
+def estimate_tokens(text: str) -> int:
     """
-    Build (system_prompt, user_prompt) for Groq LLM.
+    Fast local token estimate: one token per punctuation mark and per 1-3
+    digit group, and one token per ~6 letters of a word.
+    """
+    return sum(1 + (len(piece) - 1) // 6 for piece in _TOKEN_PIECES.findall(text))
 
-    The model is instructed to ONLY recommend from the provided candidates and
-    to output strict JSON.
+
+def estimate_prompt_tokens(system_prompt: str, user_prompt: str) -> int:
+    """Estimate the prompt tokens Groq will count for a (system, user) pair."""
+    # Chat formatting adds a handful of tokens per message.
+    return estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + 8
+
+
+@dataclass(frozen=True)
+class PromptConfig:
     """
-    system_prompt = (
-        "You are a restaurant recommendation assistant. "
-        "You MUST ONLY recommend restaurants from the candidate list provided. "
-        "Do not invent restaurants or details. "
-        "Return STRICT JSON only, no markdown, no extra text."
-    )
+    Prompt rendering options.
+
+    `compact` switches candidates to a header-once table with aliases for
+    repeated locations and cuisines. `token_budget` (compact mode only) caps
+    the estimated prompt size by dropping the lowest-scored candidates.
+    """
+
+    compact: bool = False
+    token_budget: int | None = None
+
+
+def load_prompt_config_from_env() -> PromptConfig:
+    compact = os.getenv("ZOMATO_PROMPT_COMPACT", "").strip().lower() in {"1", "true", "yes", "on"}
+    raw_budget = os.getenv("ZOMATO_PROMPT_TOKEN_BUDGET", "").strip()
+    try:
+        token_budget = int(raw_budget) if raw_budget else None
+    except ValueError:
+        raise RuntimeError(f"ZOMATO_PROMPT_TOKEN_BUDGET must be an integer, got {raw_budget!r}")
+    return PromptConfig(compact=compact, token_budget=token_budget)
 
+
+_SYSTEM_PROMPT = (
+    "You are a restaurant recommendation assistant. "
+    "You MUST ONLY recommend restaurants from the candidate list provided. "
+    "Do not invent restaurants or details. "
+    "Return STRICT JSON only, no markdown, no extra text."
+)
+
+
+def _preferences_text(preferences: UserPreference) -> str:
     prefs_lines: list[str] = []
     if preferences.location:
         prefs_lines.append(f"- location contains: {preferences.location}")
@@ -35,9 +72,28 @@ def build_recommendation_prompt(
         prefs_lines.append(f"- maximum price: {preferences.max_price}")
     if preferences.preferred_cuisines:
         prefs_lines.append(f"- preferred cuisines: {', '.join(preferences.preferred_cuisines)}")
+    if preferences.query:
+        prefs_lines.append(f"- looking for: {preferences.query}")
+
+    return "\n".join(prefs_lines) if prefs_lines else "- (no explicit filters)"
+
+
+def _task_text(limit: int) -> str:
+    return (
+        "Task:\n"
+        f"- Select the best {limit} restaurants from the candidates.\n"
+        "- Explain briefly why each one matches the preferences.\n"
+        "- Output STRICT JSON with this schema:\n"
+        '{\n'
+        '  "summary": "string",\n'
+        '  "recommendations": [\n'
+        '    { "id": 123, "reason": "string" }\n'
+        "  ]\n"
+        "}\n"
+    )
 
-    prefs_text = "\n".join(prefs_lines) if prefs_lines else "- (no explicit filters)"
 
+def _verbose_candidates_text(candidates: Sequence[Restaurant]) -> str:
     # Keep candidate context compact.
     candidate_lines: list[str] = []
     for r in candidates:
@@ -46,25 +102,192 @@ def build_recommendation_prompt(
             f"price={r.price_range if r.price_range is not None else ''} | "
             f"rating={r.rating if r.rating is not None else ''}"
         )
+    return (
+        "Candidate restaurants (ID | name | location | cuisines | price | rating):\n"
+        + "\n".join(candidate_lines)
+    )
 
-    candidates_text = "\n".join(candidate_lines)
 
-    user_prompt = (
+def _candidates_text(candidates: Sequence[Restaurant], compact: bool) -> str:
+    if compact:
+        return _compact_candidates_text(sorted(candidates, key=lambda r: r.score, reverse=True))
+    return _verbose_candidates_text(candidates)
+
+
+_CELL_BREAKS = re.compile(r"\s*\|\s*|\s+")
+
+
+def _cell(value: str | None) -> str:
+    """One table cell: "|" and newlines in the data would split rows and columns."""
+    if not value:
+        return ""
+    return _CELL_BREAKS.sub(lambda m: " / " if "|" in m.group() else " ", value).strip()
+
+
+def _split_cuisines(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [_cell(c) for c in value.split(",") if _cell(c)]
+
+
+def _compact_candidates_text(candidates: Sequence[Restaurant]) -> str:
+    """
+    Render candidates as a header-once table. Locations and cuisines that
+    occur more than once are replaced by short aliases (L1, C1, ...) defined
+    in a legend above the table.
+    """
+    location_counts = Counter(_cell(r.location) for r in candidates if _cell(r.location))
+    cuisine_counts = Counter(c for r in candidates for c in _split_cuisines(r.cuisines))
+
+    location_alias = {
+        loc: f"L{i}"
+        for i, (loc, n) in enumerate(
+            ((loc, n) for loc, n in location_counts.most_common() if n > 1), start=1
+        )
+    }
+    cuisine_alias = {
+        c: f"C{i}"
+        for i, (c, n) in enumerate(
+            ((c, n) for c, n in cuisine_counts.most_common() if n > 1), start=1
+        )
+    }
+
+    lines: list[str] = []
+    if location_alias:
+        lines.append("Locations: " + "; ".join(f"{a}={loc}" for loc, a in location_alias.items()))
+    if cuisine_alias:
+        lines.append("Cuisines: " + "; ".join(f"{a}={c}" for c, a in cuisine_alias.items()))
+    lines.append("Candidate restaurants (id|name|location|cuisines|price|rating):")
+    for r in candidates:
+        loc = _cell(r.location)
+        loc = location_alias.get(loc, loc)
+        cuisines = ",".join(cuisine_alias.get(c, c) for c in _split_cuisines(r.cuisines))
+        price = r.price_range if r.price_range is not None else ""
+        rating = r.rating if r.rating is not None else ""
+        lines.append(f"{r.id}|{_cell(r.name)}|{loc}|{cuisines}|{price}|{rating}")
+    return "\n".join(lines)
+
+
+def _user_prompt(prefs_text: str, candidates_text: str, limit: int) -> str:
+    return (
         "User preferences:\n"
         f"{prefs_text}\n\n"
-        "Candidate restaurants (ID | name | location | cuisines | price | rating):\n"
         f"{candidates_text}\n\n"
+        f"{_task_text(limit)}"
+    )
+
+
+def build_recommendation_prompt(
+    *,
+    preferences: UserPreference,
+    candidates: Sequence[Restaurant],
+    limit: int,
+    compact: bool = False,
+    token_budget: int | None = None,
+) -> tuple[str, str]:
+    """
+    Build (system_prompt, user_prompt) for Groq LLM.
+
+    The model is instructed to ONLY recommend from the provided candidates and
+    to output strict JSON.
+
+    With `compact=True` candidates are rendered as an aliased table and, if
+    `token_budget` is set, the lowest heuristic scores are dropped until the
+    estimated prompt fits. At least `limit` candidates are always kept so the
+    model can still fill the requested number of picks.
+    """
+    prefs_text = _preferences_text(preferences)
+
+    if not compact:
+        return _SYSTEM_PROMPT, _user_prompt(prefs_text, _verbose_candidates_text(candidates), limit)
+
+    ranked = sorted(candidates, key=lambda r: r.score, reverse=True)
+    keep = len(ranked)
+    min_keep = min(limit, len(ranked))
+    while True:
+        user_prompt = _user_prompt(prefs_text, _compact_candidates_text(ranked[:keep]), limit)
+        if token_budget is None or keep <= min_keep:
+            break
+        tokens = estimate_prompt_tokens(_SYSTEM_PROMPT, user_prompt)
+        if tokens <= token_budget:
+            break
+        # Shrink proportionally to the overshoot, by at least one row.
+        keep = max(min_keep, min(keep - 1, int(keep * token_budget / tokens)))
+
+    return _SYSTEM_PROMPT, user_prompt
+
+
+class BatchQuery(NamedTuple):
+    """One section of a multi-query prompt."""
+
+    query_id: str
+    preferences: UserPreference
+    candidates: Sequence[Restaurant]
+    limit: int
+
+
+def build_batch_recommendation_prompt(
+    *,
+    queries: Sequence[BatchQuery],
+    compact: bool = False,
+) -> tuple[str, str]:
+    """
+    Build (system_prompt, user_prompt) that asks for several independent
+    recommendation lists in one LLM call.
+
+    Each query gets its own section with its own preferences and candidate
+    list; the model must only pick IDs from the matching section and answer
+    with one result object per query ID.
+    """
+    sections: list[str] = []
+    for query in queries:
+        sections.append(
+            f"### Query {query.query_id}\n"
+            "User preferences:\n"
+            f"{_preferences_text(query.preferences)}\n"
+            f"{_candidates_text(query.candidates, compact)}\n"
+            f"Select the best {query.limit} restaurants for this query."
+        )
+
+    user_prompt = (
+        "\n\n".join(sections)
+        + "\n\n"
         "Task:\n"
-        f"- Select the best {limit} restaurants from the candidates.\n"
-        "- Explain briefly why each one matches the preferences.\n"
+        "- Answer every query independently, using ONLY that query's candidates.\n"
+        "- Explain briefly why each pick matches that query's preferences.\n"
         "- Output STRICT JSON with this schema:\n"
         '{\n'
-        '  "summary": "string",\n'
-        '  "recommendations": [\n'
-        '    { "id": 123, "reason": "string" }\n'
+        '  "results": [\n'
+        '    {\n'
+        '      "query": "Q1",\n'
+        '      "summary": "string",\n'
+        '      "recommendations": [ { "id": 123, "reason": "string" } ]\n'
+        "    }\n"
         "  ]\n"
         "}\n"
     )
+    return _SYSTEM_PROMPT, user_prompt
 
-    return system_prompt, user_prompt
 
+def build_reason_template_prompt(*, restaurants: Sequence[Restaurant]) -> tuple[str, str]:
+    """
+    Build (system_prompt, user_prompt) asking for one short, reusable
+    description per restaurant.
+
+    The descriptions must not mention any user, so they can be stored and
+    combined with whatever preferences a later request matched.
+    """
+    user_prompt = (
+        f"{_verbose_candidates_text(restaurants)}\n\n"
+        "Task:\n"
+        "- For EVERY restaurant above, write one sentence (max 20 words) describing\n"
+        "  why someone would enjoy it, using only the details given.\n"
+        "- Do not address the reader or mention preferences, budgets or searches.\n"
+        "- Output STRICT JSON with this schema:\n"
+        '{\n'
+        '  "reasons": [\n'
+        '    { "id": 123, "reason": "string" }\n'
+        "  ]\n"
+        "}\n"
+    )
+    return _SYSTEM_PROMPT, user_prompt
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from zomato_ai.metrics import REGISTRY
+
+
+# Defaults mirror Groq's free-tier limits for llama-3.3-70b-versatile.
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 12_000
+DEFAULT_MAX_CONCURRENCY = 4
+
+LLM_REJECTED = REGISTRY.counter(
+    "zomato_llm_admission_rejected_total",
+    "LLM calls rejected client-side before reaching Groq.",
+    labelnames=("reason",),
+)
+
+
+class LLMRateLimitedError(RuntimeError):
+    """Raised when an LLM call is rejected by the client-side admission layer."""
+
+    def __init__(self, reason: str, retry_after: float = 1.0) -> None:
+        super().__init__(f"LLM call rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class LLMLimits:
+    """Client-side budget for Groq calls. A value of 0 disables that limit."""
+
+    requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE
+    tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+
+
+def _int_from_env(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer, got {raw!r}")
+
+
+def load_llm_limits_from_env() -> LLMLimits:
+    return LLMLimits(
+        requests_per_minute=_int_from_env("GROQ_MAX_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE),
+        tokens_per_minute=_int_from_env("GROQ_MAX_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE),
+        max_concurrency=_int_from_env("GROQ_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY),
+    )
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills
+    continuously at `refill_per_second`. Not thread-safe on its own; callers
+    serialize access.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def try_take(self, amount: float) -> bool:
+        self._refill()
+        if amount > self._tokens:
+            return False
+        self._tokens -= amount
+        return True
+
+    def give_back(self, amount: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def seconds_until(self, amount: float) -> float:
+        """Time until `amount` tokens would be available (inf if never)."""
+        if amount > self.capacity or self.refill_per_second <= 0:
+            return float("inf")
+        missing = amount - self.available()
+        return max(0.0, missing / self.refill_per_second)
+
+
+class LLMAdmission:
+    """
+    Non-blocking admission control for LLM calls.
+
+    A call is admitted only if a request token, enough prompt-token budget,
+    and a concurrency slot are all available right now. Otherwise
+    `LLMRateLimitedError` is raised immediately so the caller can fall back
+    to heuristic ranking instead of queueing behind Groq's own limits.
+    """
+
+    def __init__(self, limits: LLMLimits, clock: Callable[[], float] = time.monotonic) -> None:
+        self.limits = limits
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests = (
+            TokenBucket(limits.requests_per_minute, limits.requests_per_minute / 60.0, clock)
+            if limits.requests_per_minute
+            else None
+        )
+        self._tokens = (
+            TokenBucket(limits.tokens_per_minute, limits.tokens_per_minute / 60.0, clock)
+            if limits.tokens_per_minute
+            else None
+        )
+        self._in_flight = 0
+        self._blocked_until = 0.0
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def available_requests(self) -> float:
+        with self._lock:
+            return self._requests.available() if self._requests else float("inf")
+
+    def available_tokens(self) -> float:
+        with self._lock:
+            return self._tokens.available() if self._tokens else float("inf")
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        LLM_REJECTED.inc(reason=reason)
+        raise LLMRateLimitedError(reason, retry_after=min(retry_after, 60.0))
+
+    def acquire(self, estimated_tokens: int) -> None:
+        with self._lock:
+            now = self._clock()
+            if now < self._blocked_until:
+                self._reject("upstream_backoff", self._blocked_until - now)
+            if self.limits.max_concurrency and self._in_flight >= self.limits.max_concurrency:
+                self._reject("concurrency", 1.0)
+            if self._requests and not self._requests.try_take(1):
+                self._reject("requests_per_minute", self._requests.seconds_until(1))
+            if self._tokens and not self._tokens.try_take(estimated_tokens):
+                if self._requests:
+                    self._requests.give_back(1)
+                self._reject("tokens_per_minute", self._tokens.seconds_until(estimated_tokens))
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def backoff(self, seconds: float) -> None:
+        """Stop admitting calls for `seconds`, e.g. after an upstream 429."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    @contextmanager
+    def admit(self, estimated_tokens: int) -> Iterator[None]:
+        self.acquire(estimated_tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_admission: LLMAdmission | None = None
+_admission_lock = threading.Lock()
+
+
+def get_llm_admission() -> LLMAdmission:
+    """Process-wide admission layer, configured from the environment on first use."""
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = LLMAdmission(load_llm_limits_from_env())
+        return _admission
+
+
+def configure_llm_admission(limits: LLMLimits) -> LLMAdmission:
+    """Replace the process-wide admission layer (e.g. in tests or at startup)."""
+    global _admission
+    with _admission_lock:
+        _admission = LLMAdmission(limits)
+        return _admission
+
+
+def _finite(value: float) -> float:
+    return value if value != float("inf") else -1.0
+
+
+REGISTRY.gauge(
+    "zomato_llm_inflight",
+    "LLM calls currently admitted and waiting on Groq.",
+).set_function(lambda: get_llm_admission().in_flight())
+REGISTRY.gauge(
+    "zomato_llm_request_budget_available",
+    "Requests left in the per-minute bucket (-1 when unlimited).",
+).set_function(lambda: _finite(get_llm_admission().available_requests()))
+REGISTRY.gauge(
+    "zomato_llm_token_budget_available",
+    "Prompt tokens left in the per-minute bucket (-1 when unlimited).",
+).set_function(lambda: _finite(get_llm_admission().available_tokens()))
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Tuple, TypeVar
+
+from zomato_ai.metrics import REGISTRY
+
+
+T = TypeVar("T")
+
+COALESCE_LEADERS = REGISTRY.counter(
+    "zomato_llm_singleflight_leaders_total",
+    "LLM calls actually issued by a single-flight leader.",
+)
+COALESCE_FOLLOWERS = REGISTRY.counter(
+    "zomato_llm_singleflight_coalesced_total",
+    "LLM requests that awaited an identical in-flight call instead of issuing their own.",
+)
+
+
+def prompt_key(*, model: str, system_prompt: str, user_prompt: str) -> str:
+    """Canonical hash of an LLM request; identical prompts share a key."""
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, user_prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is still running wait for the same result (or exception)
+    instead of repeating the work. Sync callers block on a
+    `concurrent.futures.Future`; each async caller awaits its own asyncio
+    future that is resolved from it, so both handler modes coalesce with each
+    other and a cancelled async caller never cancels the shared call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                COALESCE_FOLLOWERS.inc()
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            COALESCE_LEADERS.inc()
+            return future, True
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _run(self, key: str, future: Future, fn: Callable[[], T]) -> None:
+        # The key is dropped before the result is published, so a caller
+        # arriving afterwards starts a fresh call instead of joining this one.
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._forget(key)
+            future.set_exception(exc)
+        else:
+            self._forget(key)
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run `fn` once per in-flight key and return its result to every caller."""
+        future, leader = self._claim(key)
+        if leader:
+            self._run(key, future, fn)
+        return future.result()
+
+    async def do_async(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Async variant of `do`. A blocking `fn` is executed in the default
+        executor so the event loop is never blocked by the leader's call.
+        """
+        future, leader = self._claim(key)
+        loop = asyncio.get_running_loop()
+        if leader:
+            loop.run_in_executor(None, self._run, key, future, fn)
+        return await _own_waiter(loop, future)
+
+
+def _own_waiter(loop: asyncio.AbstractEventLoop, future: Future) -> asyncio.Future:
+    """
+    An asyncio future that takes `future`'s outcome. Unlike
+    `asyncio.wrap_future`, cancelling it leaves `future` (and every other
+    caller waiting on it) alone.
+    """
+    waiter = loop.create_future()
+
+    def settle(done: Future) -> None:
+        if waiter.done():
+            return
+        exc = done.exception()
+        if exc is not None:
+            waiter.set_exception(exc)
+        else:
+            waiter.set_result(done.result())
+
+    def on_done(done: Future) -> None:
+        try:
+            loop.call_soon_threadsafe(settle, done)
+        except RuntimeError:
+            pass  # The caller's loop has closed; nobody is waiting any more.
+
+    future.add_done_callback(on_done)
+    return waiter
+
+
+# Process-wide group used for Groq calls.
+llm_single_flight = SingleFlight()
+
+REGISTRY.gauge(
+    "zomato_llm_singleflight_inflight",
+    "Distinct LLM prompts currently in flight.",
+).set_function(llm_single_flight.in_flight)
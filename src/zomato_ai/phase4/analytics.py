@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Mapping
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from .models import AnalyticsSummary, DimensionSummary, EndpointSummary, HourlyCount, RollupStats
+from .rollups import dimension_rollups_table, hourly_rollups_table
+
+
+def _stats(row: Mapping[str, Any]) -> dict[str, Any]:
+    count = row["event_count"] or 0
+    if not count:
+        return {
+            "event_count": 0,
+            "zero_result_rate": 0.0,
+            "avg_candidate_count": 0.0,
+            "avg_returned_count": 0.0,
+        }
+    return {
+        "event_count": count,
+        "zero_result_rate": round(row["zero_result_count"] / count, 4),
+        "avg_candidate_count": round(row["candidate_sum"] / count, 2),
+        "avg_returned_count": round(row["returned_sum"] / count, 2),
+    }
+
+
+def _sums(table):
+    return (
+        func.sum(table.c.event_count).label("event_count"),
+        func.sum(table.c.zero_result_count).label("zero_result_count"),
+        func.sum(table.c.candidate_sum).label("candidate_sum"),
+        func.sum(table.c.returned_sum).label("returned_sum"),
+    )
+
+
+def analytics_summary(
+    engine: Engine,
+    *,
+    hours: int = 24,
+    endpoint: str | None = None,
+    top: int = 10,
+) -> AnalyticsSummary:
+    """
+    Summarise the last `hours` hours of recommendation traffic.
+
+    Reads only the rollup tables, so the cost depends on the number of
+    (endpoint, hour, dimension) buckets rather than on the number of raw
+    events. Data is as fresh as the last `refresh_rollups` pass.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).replace(
+        minute=0, second=0, microsecond=0
+    )
+    hourly_t = hourly_rollups_table
+    dims_t = dimension_rollups_table
+
+    hourly_where = [hourly_t.c.hour >= since]
+    dims_where = [dims_t.c.hour >= since]
+    if endpoint is not None:
+        hourly_where.append(hourly_t.c.endpoint == endpoint)
+        dims_where.append(dims_t.c.endpoint == endpoint)
+
+    with engine.connect() as conn:
+        totals = conn.execute(select(*_sums(hourly_t)).where(*hourly_where)).mappings().one()
+        by_endpoint = (
+            conn.execute(
+                select(hourly_t.c.endpoint, *_sums(hourly_t))
+                .where(*hourly_where)
+                .group_by(hourly_t.c.endpoint)
+                .order_by(hourly_t.c.endpoint)
+            )
+            .mappings()
+            .all()
+        )
+        by_hour = conn.execute(
+            select(hourly_t.c.hour, func.sum(hourly_t.c.event_count))
+            .where(*hourly_where)
+            .group_by(hourly_t.c.hour)
+            .order_by(hourly_t.c.hour)
+        ).all()
+
+        def top_values(dimension: str) -> List[DimensionSummary]:
+            rows = (
+                conn.execute(
+                    select(dims_t.c.value, *_sums(dims_t))
+                    .where(*dims_where, dims_t.c.dimension == dimension)
+                    .group_by(dims_t.c.value)
+                    .order_by(func.sum(dims_t.c.event_count).desc(), dims_t.c.value)
+                    .limit(top)
+                )
+                .mappings()
+                .all()
+            )
+            return [DimensionSummary(value=r["value"], **_stats(r)) for r in rows]
+
+        top_locations = top_values("location")
+        top_cuisines = top_values("cuisine")
+
+    return AnalyticsSummary(
+        since=since,
+        endpoint=endpoint,
+        totals=RollupStats(**_stats(totals)),
+        endpoints=[EndpointSummary(endpoint=r["endpoint"], **_stats(r)) for r in by_endpoint],
+        hourly=[HourlyCount(hour=hour, event_count=count) for hour, count in by_hour],
+        top_locations=top_locations,
+        top_cuisines=top_cuisines,
+    )
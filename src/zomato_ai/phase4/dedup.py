@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Iterable, Mapping, Any, List
 
+from zomato_ai.phase2.records import RestaurantStore
+
 
 def dedup_rows_by_name_location(rows: Iterable[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
     """
@@ -24,3 +26,25 @@ def dedup_rows_by_name_location(rows: Iterable[Mapping[str, Any]]) -> List[Mappi
         unique.append(row)
     return unique
 
+
+def dedup_store_by_name_location(store: RestaurantStore) -> RestaurantStore:
+    """
+    `dedup_rows_by_name_location` for a `RestaurantStore`: keeps the first
+    row per (name, location) and drops rows with an empty name.
+    """
+    # Normalize each distinct location once rather than once per row.
+    location_keys = [str(loc or "").strip().lower() for loc in store.locations]
+    seen: set[tuple[str, str]] = set()
+    keep: list[int] = []
+    for i, (name, location_code) in enumerate(zip(store.iter_names(), store.location_codes)):
+        name_key = str(name or "").strip().lower()
+        if not name_key:
+            continue
+        key = (name_key, location_keys[location_code])
+        if key in seen:
+            continue
+        seen.add(key)
+        keep.append(i)
+    if len(keep) == len(store):
+        return store
+    return store.take(keep)
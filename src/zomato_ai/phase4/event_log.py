@@ -0,0 +1,257 @@
+"""
+Append-only, segment-rotated JSONL log for recommendation events.
+
+With `ZOMATO_EVENT_SINK=jsonl` the background event writer appends events to
+local segment files instead of the serving database. `compact_event_log`
+later loads closed segments into `recommendation_events` in bulk and
+refreshes the hourly rollups, so during traffic the database only serves
+reads.
+
+    python -m zomato_ai.phase4.event_log --dir ./event_log
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.engine import Engine
+
+from .events import recommendation_events_table
+from .rollups import refresh_rollups
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_LOG_DIR = "./event_log"
+
+OPEN_SUFFIX = ".jsonl.open"
+CLOSED_SUFFIX = ".jsonl"
+
+
+metadata = MetaData()
+
+compacted_segments_table = Table(
+    "compacted_event_segments",
+    metadata,
+    Column("segment", String, primary_key=True),
+    Column("event_count", Integer, nullable=False),
+    Column("compacted_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def event_sink_from_env() -> str:
+    """`database` (default) or `jsonl`."""
+    sink = os.getenv("ZOMATO_EVENT_SINK", "database").strip().lower() or "database"
+    if sink not in {"database", "jsonl"}:
+        raise RuntimeError(f"ZOMATO_EVENT_SINK must be 'database' or 'jsonl', got {sink!r}")
+    return sink
+
+
+def event_log_dir_from_env() -> Path:
+    return Path(os.getenv("ZOMATO_EVENT_LOG_DIR", DEFAULT_EVENT_LOG_DIR))
+
+
+class JsonlEventSink:
+    """
+    Appends events as JSON lines to the active segment and rotates it once it
+    exceeds `max_segment_bytes` or `max_segment_seconds`.
+
+    The active segment ends in `.jsonl.open`; rotation renames it to
+    `.jsonl`, which marks it as closed and ready for compaction. Segment
+    names include the process id so several workers can share a directory.
+    A timer thread closes a segment that reaches `max_segment_seconds` even
+    when no further events arrive, so quiet periods still get compacted.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: float = 3600.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_segment_bytes
+        self._max_seconds = max_segment_seconds
+        self._lock = threading.Lock()
+        # Wakes the rotation timer when a segment opens or the sink closes.
+        self._changed = threading.Condition(self._lock)
+        self._closing = False
+        self._file: IO[str] | None = None
+        self._path: Path | None = None
+        self._opened_at = 0.0
+        self._seq = 0
+        self._timer = threading.Thread(target=self._rotate_when_due, name="event-log-rotation", daemon=True)
+        self._timer.start()
+
+    def _open_segment(self) -> None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self._seq += 1
+        self._path = self.directory / f"events-{stamp}-{os.getpid()}-{self._seq:04d}{OPEN_SUFFIX}"
+        self._file = self._path.open("a", encoding="utf-8")
+        self._opened_at = time.monotonic()
+        self._changed.notify()
+
+    def _rotate(self) -> None:
+        if self._file is None or self._path is None:
+            return
+        self._file.close()
+        closed = self._path.with_name(self._path.name[: -len(OPEN_SUFFIX)] + CLOSED_SUFFIX)
+        if self._path.stat().st_size:
+            self._path.rename(closed)
+        else:
+            self._path.unlink()
+        self._file = None
+        self._path = None
+
+    def write_many(self, batch: List[Dict[str, Any]]) -> None:
+        lines = "".join(
+            json.dumps(
+                {**event, "created_at": event["created_at"].isoformat()},
+                ensure_ascii=False,
+            )
+            + "\n"
+            for event in batch
+        )
+        with self._lock:
+            if self._file is not None and (
+                self._file.tell() >= self._max_bytes
+                or time.monotonic() - self._opened_at >= self._max_seconds
+            ):
+                self._rotate()
+            if self._file is None:
+                self._open_segment()
+            assert self._file is not None
+            self._file.write(lines)
+            self._file.flush()
+
+    def _rotate_when_due(self) -> None:
+        with self._changed:
+            while not self._closing:
+                if self._file is None:
+                    self._changed.wait()
+                    continue
+                remaining = self._opened_at + self._max_seconds - time.monotonic()
+                if remaining <= 0:
+                    self._rotate()
+                else:
+                    self._changed.wait(remaining)
+
+    def close(self) -> None:
+        """Close the active segment so it becomes eligible for compaction."""
+        with self._lock:
+            self._rotate()
+            self._closing = True
+            self._changed.notify_all()
+        self._timer.join(timeout=1.0)
+
+
+@dataclass(frozen=True)
+class CompactionReport:
+    segments: int
+    events: int
+    rolled_up: int
+
+
+def _read_segment(path: Path) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+    with path.open(encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+                event["created_at"] = datetime.fromisoformat(event["created_at"])
+                # Segments written before impressions were logged lack this key.
+                event.setdefault("restaurant_ids", None)
+            except (ValueError, KeyError):
+                # A torn final line from a crashed worker must not block compaction.
+                logger.warning("Skipping malformed event at %s:%d", path.name, line_no)
+                continue
+            events.append(event)
+    return events
+
+
+def compact_event_log(
+    engine: Engine,
+    directory: str | Path,
+    *,
+    chunk_size: int = 1_000,
+    keep_segments: bool = False,
+) -> CompactionReport:
+    """
+    Load every closed segment into `recommendation_events` and refresh the
+    hourly rollups.
+
+    Each segment is inserted and recorded in `compacted_event_segments` in a
+    single transaction, so a segment is never loaded twice even if the job
+    dies before it can delete (or archive, with `keep_segments`) the file.
+    """
+    directory = Path(directory)
+    archive = directory / "compacted"
+    segments = events = 0
+
+    for path in sorted(directory.glob(f"*{CLOSED_SUFFIX}")):
+        with engine.begin() as conn:
+            already = conn.execute(
+                select(compacted_segments_table.c.segment).where(
+                    compacted_segments_table.c.segment == path.name
+                )
+            ).first()
+            if already is None:
+                batch = _read_segment(path)
+                for start in range(0, len(batch), chunk_size):
+                    conn.execute(
+                        insert(recommendation_events_table).values(batch[start : start + chunk_size])
+                    )
+                conn.execute(
+                    insert(compacted_segments_table).values(
+                        segment=path.name,
+                        event_count=len(batch),
+                        compacted_at=datetime.now(timezone.utc),
+                    )
+                )
+                segments += 1
+                events += len(batch)
+
+        if keep_segments:
+            archive.mkdir(exist_ok=True)
+            path.rename(archive / path.name)
+        else:
+            path.unlink()
+
+    return CompactionReport(segments=segments, events=events, rolled_up=refresh_rollups(engine))
+
+
+def main() -> None:
+    # Imported here so that importing this module stays cheap for the API.
+    from zomato_ai.data.migrations import bootstrap_schema
+    from zomato_ai.phase2.repository import create_engine_for_url
+
+    parser = argparse.ArgumentParser(description="Compact closed event log segments into the database.")
+    parser.add_argument("--dir", default=str(event_log_dir_from_env()))
+    parser.add_argument("--db-url", default=os.getenv("ZOMATO_DB_URL") or None)
+    parser.add_argument("--keep-segments", action="store_true", help="Archive instead of deleting.")
+    args = parser.parse_args()
+
+    engine = create_engine_for_url(args.db_url)
+    bootstrap_schema(engine)
+    report = compact_event_log(engine, args.dir, keep_segments=args.keep_segments)
+    print(
+        f"Compacted {report.segments} segment(s), {report.events} event(s); "
+        f"rolled up {report.rolled_up} event(s)."
+    )
+
+
+if __name__ == "__main__":
+    main()
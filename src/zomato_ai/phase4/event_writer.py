@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Protocol
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Engine
+
+from zomato_ai.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+EVENTS_WRITTEN = REGISTRY.counter(
+    "zomato_events_written_total",
+    "Recommendation events persisted by the background writer.",
+)
+EVENTS_DROPPED = REGISTRY.counter(
+    "zomato_events_dropped_total",
+    "Recommendation events dropped because the writer queue was full or a flush failed.",
+    labelnames=("reason",),
+)
+EVENT_BATCHES = REGISTRY.counter(
+    "zomato_event_batches_total",
+    "Multi-row event inserts issued by the background writer.",
+)
+EVENT_QUEUE_DEPTH = REGISTRY.gauge(
+    "zomato_event_queue_depth",
+    "Events waiting in the background writer queue.",
+)
+
+
+class EventSink(Protocol):
+    """Destination for batches of recommendation event rows."""
+
+    def write_many(self, batch: List[Dict[str, Any]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class DatabaseEventSink:
+    """Writes rows straight into `table` (by default `recommendation_events`)."""
+
+    def __init__(self, engine: Engine, table: Table | None = None) -> None:
+        self._engine = engine
+        self._table = table
+
+    def write_many(self, batch: List[Dict[str, Any]]) -> None:
+        table = self._table
+        if table is None:
+            # Imported here to avoid a circular import with the events module.
+            from .events import recommendation_events_table
+
+            table = recommendation_events_table
+        with self._engine.begin() as conn:
+            conn.execute(insert(table).values(batch))
+
+    def close(self) -> None:
+        pass
+
+
+def event_writer_mode_from_env() -> str:
+    """`background` (default) queues events off the request path; `sync` writes inline."""
+    mode = os.getenv("ZOMATO_EVENT_WRITER", "background").strip().lower() or "background"
+    if mode not in {"background", "sync"}:
+        raise RuntimeError(f"ZOMATO_EVENT_WRITER must be 'background' or 'sync', got {mode!r}")
+    return mode
+
+
+# Put on the queue by `close` to wake a worker blocked waiting for events.
+_WAKE: Any = object()
+
+
+class BackgroundEventWriter:
+    """
+    Bounded in-memory queue drained by a worker thread.
+
+    Request handlers call `submit`, which never blocks: when the queue is full
+    the event is dropped and counted. The worker hands events to the sink
+    (multi-row database inserts by default) once `batch_size` events are
+    waiting or `flush_interval` seconds have passed since the first one
+    arrived.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        sink: EventSink | None = None,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self._sink: EventSink = sink or DatabaseEventSink(engine)
+        # Holds event rows, plus at most one `_WAKE` marker on shutdown.
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="recommendation-event-writer", daemon=True
+        )
+        self._dropped_since_warning = 0
+
+    def start(self) -> "BackgroundEventWriter":
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def submit(self, payload: Dict[str, Any]) -> bool:
+        """Queue one event row; returns False if it had to be dropped."""
+        with self._pending_cond:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self._done(1)
+            EVENTS_DROPPED.inc(reason="queue_full")
+            self._dropped_since_warning += 1
+            if self._dropped_since_warning == 1 or self._dropped_since_warning % 1000 == 0:
+                logger.warning(
+                    "Event writer queue full; dropped %d event(s) so far.", self._dropped_since_warning
+                )
+            return False
+        EVENT_QUEUE_DEPTH.inc()
+        return True
+
+    def _done(self, count: int) -> None:
+        with self._pending_cond:
+            self._pending -= count
+            if self._pending <= 0:
+                self._pending_cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued event has been written (or dropped)."""
+        with self._pending_cond:
+            return self._pending_cond.wait_for(lambda: self._pending <= 0, timeout=timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the worker after writing everything already queued."""
+        if not self._thread.is_alive():
+            return
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass  # A full queue means the worker is not waiting for events.
+        self._thread.join(timeout=timeout)
+
+    def _collect_batch(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        try:
+            item = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return batch
+        if item is not _WAKE:
+            batch.append(item)
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stop.is_set():
+                    # Drain whatever is already queued without waiting further.
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is not _WAKE:
+                batch.append(item)
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self._sink.write_many(batch)
+        except Exception:
+            logger.exception("Failed to write %d recommendation event(s).", len(batch))
+            EVENTS_DROPPED.inc(len(batch), reason="write_error")
+        else:
+            EVENTS_WRITTEN.inc(len(batch))
+            EVENT_BATCHES.inc()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            if batch:
+                EVENT_QUEUE_DEPTH.dec(len(batch))
+                try:
+                    self._write(batch)
+                finally:
+                    self._done(len(batch))
+            elif self._stop.is_set():
+                self._sink.close()
+                return
+
+
+# Recommendation events; other row kinds (selections) use a stream of their own.
+EVENTS_STREAM = "recommendation_events"
+
+# Engine -> stream -> writer.
+_writers: "weakref.WeakKeyDictionary[Engine, Dict[str, BackgroundEventWriter]]" = weakref.WeakKeyDictionary()
+_writers_lock = threading.Lock()
+
+
+def get_event_writer(engine: Engine, stream: str = EVENTS_STREAM) -> BackgroundEventWriter | None:
+    with _writers_lock:
+        writer = _writers.get(engine, {}).get(stream)
+    return writer if writer is not None and writer.running else None
+
+
+def start_event_writer(engine: Engine, *, stream: str = EVENTS_STREAM, **kwargs: Any) -> BackgroundEventWriter:
+    """
+    Start (or return the already running) background writer for `engine`'s
+    `stream`. Rows logged to it are queued from then on, and anything still
+    queued is flushed at interpreter exit.
+    """
+    with _writers_lock:
+        streams = _writers.setdefault(engine, {})
+        writer = streams.get(stream)
+        if writer is not None and writer.running:
+            return writer
+        writer = BackgroundEventWriter(engine, **kwargs).start()
+        streams[stream] = writer
+    atexit.register(writer.close)
+    return writer
+
+
+def stop_event_writer(engine: Engine, timeout: float = 5.0, *, stream: str = EVENTS_STREAM) -> None:
+    """Flush and stop the background writer for `engine`'s `stream`, if any."""
+    with _writers_lock:
+        writer = _writers.get(engine, {}).pop(stream, None)
+    if writer is not None:
+        writer.close(timeout=timeout)
+        atexit.unregister(writer.close)
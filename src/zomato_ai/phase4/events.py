@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timezone
-from typing import Any, Mapping
+from typing import Any, Mapping, Sequence
 
 from sqlalchemy import (
     Column,
@@ -15,6 +15,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.engine import Engine
 
+from zomato_ai.metrics import span
+
+from .event_writer import get_event_writer
+
 
 metadata = MetaData()
 
@@ -27,6 +31,8 @@ recommendation_events_table = Table(
     Column("preferences_json", String, nullable=False),
     Column("candidate_count", Integer, nullable=False),
     Column("returned_count", Integer, nullable=False),
+    # JSON list of the restaurant ids shown to the user (impressions).
+    Column("restaurant_ids", String, nullable=True),
 )
 
 
@@ -42,18 +48,32 @@ def log_recommendation_event(
     preferences: Mapping[str, Any],
     candidate_count: int,
     returned_count: int,
+    restaurant_ids: Sequence[int] | None = None,
 ) -> None:
     """
     Persist a lightweight analytics event for evaluation/feedback loops.
+
+    If a background writer is running for `engine` the event is only queued,
+    so the caller does no database I/O; otherwise it is written inline. The
+    table is expected to exist (see `zomato_ai.data.migrations`).
+
+    `restaurant_ids` are the restaurants actually returned; they feed the
+    popularity priors as impressions.
     """
-    create_schema(engine)
-    payload = {
-        "created_at": datetime.now(timezone.utc),
-        "endpoint": endpoint,
-        "preferences_json": json.dumps(preferences, ensure_ascii=False),
-        "candidate_count": int(candidate_count),
-        "returned_count": int(returned_count),
-    }
-    with engine.begin() as conn:
-        conn.execute(insert(recommendation_events_table), [payload])
+    with span("event_log"):
+        payload = {
+            "created_at": datetime.now(timezone.utc),
+            "endpoint": endpoint,
+            "preferences_json": json.dumps(preferences, ensure_ascii=False),
+            "candidate_count": int(candidate_count),
+            "returned_count": int(returned_count),
+            "restaurant_ids": json.dumps(list(restaurant_ids)) if restaurant_ids is not None else None,
+        }
+        writer = get_event_writer(engine)
+        if writer is not None:
+            writer.submit(payload)
+            return
+
+        with engine.begin() as conn:
+            conn.execute(insert(recommendation_events_table), [payload])
 
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class RollupStats(BaseModel):
+    event_count: int
+    zero_result_rate: float = Field(..., description="Share of events that returned no restaurants.")
+    avg_candidate_count: float
+    avg_returned_count: float
+
+
+class EndpointSummary(RollupStats):
+    endpoint: str
+
+
+class DimensionSummary(RollupStats):
+    value: str
+
+
+class HourlyCount(BaseModel):
+    hour: datetime
+    event_count: int
+
+
+class AnalyticsSummary(BaseModel):
+    since: datetime = Field(..., description="Start of the summarised window (UTC, hour-aligned).")
+    endpoint: Optional[str] = None
+    totals: RollupStats
+    endpoints: List[EndpointSummary]
+    hourly: List[HourlyCount]
+    top_locations: List[DimensionSummary]
+    top_cuisines: List[DimensionSummary]
+
+
+class SelectionEvent(BaseModel):
+    restaurant_id: int = Field(..., ge=1, description="Restaurant the user picked.")
+    endpoint: Optional[str] = Field(
+        default=None, description="Endpoint whose recommendations the pick came from."
+    )
@@ -0,0 +1,303 @@
+"""
+Per-restaurant popularity priors learned from impressions and selections.
+
+Impressions are the `restaurant_ids` recorded on `recommendation_events`;
+selections are logged through `POST /events/selection`. `refresh_popularity`
+folds new rows into the `restaurant_popularity` table incrementally, in
+bounded batches (one watermark per source, shared with the analytics
+rollups), and then rebuilds the in-memory priors.
+
+The priors are a compact `array("f")` keyed by a sorted array of restaurant
+ids, so ranking reads them with a binary search and no query. Only counted
+restaurants that still exist get a slot, so the size follows the number of
+restaurants, not the largest id ever logged. A refresh builds a new snapshot
+and swaps a single reference, so requests never wait for it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from zomato_ai.phase2.repository import restaurants_table
+
+from .event_writer import get_event_writer
+from .events import recommendation_events_table
+from .rollups import rollup_watermarks_table
+
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-impressions at the global selection rate added to every restaurant,
+# so a single lucky click on a rarely shown restaurant does not dominate.
+PRIOR_STRENGTH = 20.0
+
+metadata = MetaData()
+
+restaurant_selections_table = Table(
+    "restaurant_selections",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("restaurant_id", Integer, nullable=False),
+    Column("endpoint", String, nullable=True),
+)
+
+restaurant_popularity_table = Table(
+    "restaurant_popularity",
+    metadata,
+    Column("restaurant_id", Integer, primary_key=True),
+    Column("impressions", Integer, nullable=False),
+    Column("selections", Integer, nullable=False),
+)
+
+_IMPRESSIONS_WATERMARK = "restaurant_popularity:impressions"
+_SELECTIONS_WATERMARK = "restaurant_popularity:selections"
+
+# Background writer stream for selections (see `event_writer.start_event_writer`).
+SELECTIONS_STREAM = "restaurant_selections"
+
+
+def log_selection(*, engine: Engine, restaurant_id: int, endpoint: str | None = None) -> None:
+    """
+    Record that the user picked `restaurant_id` from a recommendation list.
+
+    Queued when a background writer runs for the selections stream, like
+    recommendation events; otherwise written inline.
+    """
+    row = {
+        "created_at": datetime.now(timezone.utc),
+        "restaurant_id": int(restaurant_id),
+        "endpoint": endpoint,
+    }
+    writer = get_event_writer(engine, SELECTIONS_STREAM)
+    if writer is not None:
+        writer.submit(row)
+        return
+    with engine.begin() as conn:
+        conn.execute(insert(restaurant_selections_table), [row])
+
+
+def popularity_weight_from_env() -> float:
+    """Score points added for the most popular restaurant; 0 (default) disables the prior."""
+    raw = os.getenv("ZOMATO_POPULARITY_WEIGHT", "").strip()
+    if not raw:
+        return 0.0
+    try:
+        return float(raw)
+    except ValueError:
+        raise RuntimeError(f"ZOMATO_POPULARITY_WEIGHT must be a number, got {raw!r}")
+
+
+class PopularityPriors:
+    """Immutable snapshot of priors in [0, 1], keyed by restaurant id."""
+
+    __slots__ = ("weight", "_ids", "_scores")
+
+    def __init__(
+        self, ids: array | None = None, scores: array | None = None, weight: float = 0.0
+    ) -> None:
+        self.weight = weight
+        # `ids` is sorted; `scores[i]` is the prior of `ids[i]`.
+        self._ids = ids if ids is not None else array("q")
+        self._scores = scores if scores is not None else array("f")
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def prior(self, restaurant_id: int) -> float:
+        i = bisect_left(self._ids, restaurant_id)
+        if i < len(self._ids) and self._ids[i] == restaurant_id:
+            return self._scores[i]
+        return 0.0
+
+    def boost(self, restaurant_id: int) -> float:
+        """Score adjustment for `restaurant_id` (0.0 when the prior is disabled)."""
+        if not self.weight:
+            return 0.0
+        return self.weight * self.prior(restaurant_id)
+
+
+def build_priors(counts: Mapping[int, tuple[int, int]], weight: float) -> PopularityPriors:
+    """
+    Turn (impressions, selections) per restaurant into priors.
+
+    Each restaurant's selection rate is smoothed towards the global rate and
+    then scaled so the best restaurant gets 1.0.
+    """
+    if not counts:
+        return PopularityPriors(weight=weight)
+    total_impressions = sum(i for i, _ in counts.values())
+    total_selections = sum(s for _, s in counts.values())
+    global_rate = total_selections / total_impressions if total_impressions else 0.0
+
+    rates: Dict[int, float] = {
+        rid: (selections + PRIOR_STRENGTH * global_rate) / (impressions + PRIOR_STRENGTH)
+        for rid, (impressions, selections) in counts.items()
+    }
+    top = max(rates.values())
+    ids = array("q", sorted(rates))
+    scores = array("f", (rates[rid] / top if top > 0 else 0.0 for rid in ids))
+    return PopularityPriors(ids, scores, weight)
+
+
+_priors: PopularityPriors | None = None
+
+
+def get_popularity_priors() -> PopularityPriors:
+    """Return the current snapshot; callers should not hold on to it across requests."""
+    global _priors
+    if _priors is None:
+        _priors = PopularityPriors(weight=popularity_weight_from_env())
+    return _priors
+
+
+def configure_popularity_priors(priors: PopularityPriors) -> None:
+    global _priors
+    _priors = priors
+
+
+def _advance(conn: Connection, name: str, last_id: int | None, new_last_id: int) -> None:
+    if last_id is None:
+        conn.execute(insert(rollup_watermarks_table).values(name=name, last_event_id=new_last_id))
+    else:
+        conn.execute(
+            update(rollup_watermarks_table)
+            .where(rollup_watermarks_table.c.name == name)
+            .values(last_event_id=new_last_id)
+        )
+
+
+def _watermark(conn: Connection, name: str) -> int | None:
+    return conn.execute(
+        select(rollup_watermarks_table.c.last_event_id).where(rollup_watermarks_table.c.name == name)
+    ).scalar()
+
+
+def _add_counts(conn: Connection, impressions: Counter, selections: Counter) -> None:
+    t = restaurant_popularity_table
+    for rid in impressions.keys() | selections.keys():
+        existing = conn.execute(select(t).where(t.c.restaurant_id == rid)).mappings().first()
+        if existing is None:
+            conn.execute(
+                insert(t).values(
+                    restaurant_id=rid, impressions=impressions[rid], selections=selections[rid]
+                )
+            )
+        else:
+            conn.execute(
+                update(t)
+                .where(t.c.restaurant_id == rid)
+                .values(
+                    impressions=existing["impressions"] + impressions[rid],
+                    selections=existing["selections"] + selections[rid],
+                )
+            )
+
+
+def _impression_ids(value: Any) -> list[int]:
+    try:
+        ids = json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return []
+    return [int(i) for i in ids if isinstance(i, int)]
+
+
+def update_popularity_counts(engine: Engine, batch_size: int = 10_000) -> int:
+    """
+    Fold events and selections logged since the last pass into
+    `restaurant_popularity`, at most `batch_size` rows of each per
+    transaction. Each batch advances its watermarks in the same transaction,
+    so an interrupted pass loses nothing. Returns the number of source rows
+    consumed.
+    """
+    events_t = recommendation_events_table
+    selections_t = restaurant_selections_table
+    consumed = 0
+    while True:
+        with engine.begin() as conn:
+            last_event = _watermark(conn, _IMPRESSIONS_WATERMARK)
+            last_selection = _watermark(conn, _SELECTIONS_WATERMARK)
+            event_rows = conn.execute(
+                select(events_t.c.id, events_t.c.restaurant_ids)
+                .where(events_t.c.id > (last_event or 0))
+                .order_by(events_t.c.id)
+                .limit(batch_size)
+            ).all()
+            selection_rows = conn.execute(
+                select(selections_t.c.id, selections_t.c.restaurant_id)
+                .where(selections_t.c.id > (last_selection or 0))
+                .order_by(selections_t.c.id)
+                .limit(batch_size)
+            ).all()
+
+            impressions: Counter = Counter()
+            for _, ids in event_rows:
+                impressions.update(_impression_ids(ids))
+            selections: Counter = Counter(rid for _, rid in selection_rows)
+            _add_counts(conn, impressions, selections)
+
+            if event_rows:
+                _advance(conn, _IMPRESSIONS_WATERMARK, last_event, event_rows[-1][0])
+            if selection_rows:
+                _advance(conn, _SELECTIONS_WATERMARK, last_selection, selection_rows[-1][0])
+        consumed += len(event_rows) + len(selection_rows)
+        if len(event_rows) < batch_size and len(selection_rows) < batch_size:
+            return consumed
+
+
+def load_popularity_priors(engine: Engine, weight: float | None = None) -> PopularityPriors:
+    """Rebuild the in-memory priors from `restaurant_popularity` and swap them in."""
+    t = restaurant_popularity_table
+    # Counts for ids that are not (or no longer) restaurants are ignored.
+    query = select(t.c.restaurant_id, t.c.impressions, t.c.selections).join(
+        restaurants_table, restaurants_table.c.id == t.c.restaurant_id
+    )
+    with engine.connect() as conn:
+        counts = {
+            row.restaurant_id: (row.impressions, row.selections) for row in conn.execute(query)
+        }
+    priors = build_priors(counts, get_popularity_priors().weight if weight is None else weight)
+    # A single reference swap: in-flight requests keep the snapshot they read.
+    configure_popularity_priors(priors)
+    return priors
+
+
+def load_popularity_priors_or_neutral(engine: Engine) -> PopularityPriors:
+    """
+    `load_popularity_priors`, but a failure is logged and neutral priors are
+    served instead: ranking without the prior beats not serving at all.
+    """
+    try:
+        return load_popularity_priors(engine)
+    except Exception:
+        logger.exception("Could not load popularity priors; ranking without them.")
+        priors = PopularityPriors(weight=get_popularity_priors().weight)
+        configure_popularity_priors(priors)
+        return priors
+
+
+def refresh_popularity(engine: Engine) -> int:
+    """Incrementally update the counts, then swap in freshly built priors."""
+    consumed = update_popularity_counts(engine)
+    load_popularity_priors_or_neutral(engine)
+    return consumed
@@ -0,0 +1,267 @@
+"""
+Incrementally maintained rollups of `recommendation_events`.
+
+Two tables are kept, both bucketed by endpoint and hour:
+
+- `recommendation_rollups_hourly`: one row per (endpoint, hour).
+- `recommendation_rollups_dimensions`: one row per (endpoint, hour,
+  dimension, value), where dimension is `location` or `cuisine` taken from
+  the event's preferences. An event with several preferred cuisines counts
+  once towards each of them.
+
+Rows hold counts and sums only; rates and averages are derived at read time
+(see `zomato_ai.phase4.analytics`). Each table has its own watermark on the
+event id, so a table added later backfills itself from the raw events on its
+first pass.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from .events import recommendation_events_table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROLLUP_INTERVAL_SECONDS = 60.0
+
+_MEASURES = ("event_count", "zero_result_count", "candidate_sum", "returned_sum")
+
+
+def _measure_columns() -> List[Column]:
+    return [Column(name, Integer, nullable=False) for name in _MEASURES]
+
+
+metadata = MetaData()
+
+hourly_rollups_table = Table(
+    "recommendation_rollups_hourly",
+    metadata,
+    Column("endpoint", String, primary_key=True),
+    Column("hour", DateTime(timezone=True), primary_key=True),
+    *_measure_columns(),
+)
+
+dimension_rollups_table = Table(
+    "recommendation_rollups_dimensions",
+    metadata,
+    Column("endpoint", String, primary_key=True),
+    Column("hour", DateTime(timezone=True), primary_key=True),
+    Column("dimension", String, primary_key=True),
+    Column("value", String, primary_key=True),
+    *_measure_columns(),
+)
+
+rollup_watermarks_table = Table(
+    "rollup_watermarks",
+    metadata,
+    Column("name", String, primary_key=True),
+    Column("last_event_id", Integer, nullable=False),
+)
+
+
+_Key = Tuple[Any, ...]
+
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _preferences(event: Mapping[str, Any]) -> Dict[str, Any]:
+    try:
+        prefs = json.loads(event["preferences_json"])
+    except (TypeError, ValueError):
+        return {}
+    return prefs if isinstance(prefs, dict) else {}
+
+
+def _hourly_keys(event: Mapping[str, Any]) -> Iterable[_Key]:
+    yield (event["endpoint"], _hour(event["created_at"]))
+
+
+def _dimension_keys(event: Mapping[str, Any]) -> Iterable[_Key]:
+    prefs = _preferences(event)
+    base = (event["endpoint"], _hour(event["created_at"]))
+    location = prefs.get("location")
+    if isinstance(location, str) and location.strip():
+        yield base + ("location", location.strip().lower())
+    cuisines = prefs.get("preferred_cuisines") or []
+    for cuisine in {c.strip().lower() for c in cuisines if isinstance(c, str) and c.strip()}:
+        yield base + ("cuisine", cuisine)
+
+
+class _Rollup(NamedTuple):
+    table: Table
+    key_columns: Sequence[str]
+    keys: Callable[[Mapping[str, Any]], Iterable[_Key]]
+
+
+_ROLLUPS = [
+    _Rollup(hourly_rollups_table, ("endpoint", "hour"), _hourly_keys),
+    _Rollup(
+        dimension_rollups_table,
+        ("endpoint", "hour", "dimension", "value"),
+        _dimension_keys,
+    ),
+]
+
+
+def _aggregate(rollup: _Rollup, events: Iterable[Mapping[str, Any]]) -> Dict[_Key, Dict[str, int]]:
+    totals: Dict[_Key, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(_MEASURES, 0))
+    for event in events:
+        for key in rollup.keys(event):
+            bucket = totals[key]
+            bucket["event_count"] += 1
+            bucket["zero_result_count"] += 1 if event["returned_count"] == 0 else 0
+            bucket["candidate_sum"] += event["candidate_count"]
+            bucket["returned_sum"] += event["returned_count"]
+    return totals
+
+
+def _merge(conn: Connection, rollup: _Rollup, totals: Dict[_Key, Dict[str, int]]) -> None:
+    """Add aggregated counts to existing rollup rows, inserting new rows as needed."""
+    t = rollup.table
+    for key, delta in totals.items():
+        key_values = dict(zip(rollup.key_columns, key))
+        where = and_(*(t.c[col] == value for col, value in key_values.items()))
+        existing = conn.execute(select(t).where(where)).mappings().first()
+        if existing is None:
+            conn.execute(insert(t).values(**key_values, **delta))
+        else:
+            conn.execute(
+                update(t)
+                .where(where)
+                .values(**{col: existing[col] + value for col, value in delta.items()})
+            )
+
+
+def _refresh_one(engine: Engine, rollup: _Rollup, batch_size: int) -> int:
+    events_t = recommendation_events_table
+    watermark = rollup.table.name
+    processed = 0
+    while True:
+        with engine.begin() as conn:
+            last_id = conn.execute(
+                select(rollup_watermarks_table.c.last_event_id).where(
+                    rollup_watermarks_table.c.name == watermark
+                )
+            ).scalar()
+            rows = (
+                conn.execute(
+                    select(
+                        events_t.c.id,
+                        events_t.c.created_at,
+                        events_t.c.endpoint,
+                        events_t.c.preferences_json,
+                        events_t.c.candidate_count,
+                        events_t.c.returned_count,
+                    )
+                    .where(events_t.c.id > (last_id or 0))
+                    .order_by(events_t.c.id)
+                    .limit(batch_size)
+                )
+                .mappings()
+                .all()
+            )
+            if not rows:
+                return processed
+
+            _merge(conn, rollup, _aggregate(rollup, rows))
+            new_last_id = rows[-1]["id"]
+            if last_id is None:
+                conn.execute(
+                    insert(rollup_watermarks_table).values(name=watermark, last_event_id=new_last_id)
+                )
+            else:
+                conn.execute(
+                    update(rollup_watermarks_table)
+                    .where(rollup_watermarks_table.c.name == watermark)
+                    .values(last_event_id=new_last_id)
+                )
+            processed += len(rows)
+
+
+def refresh_rollups(engine: Engine, batch_size: int = 10_000) -> int:
+    """
+    Incrementally fold new `recommendation_events` rows into every rollup
+    table.
+
+    Each watermark is stored in the same transaction as its rollup update,
+    so every event is counted exactly once even if a pass is interrupted.
+    Returns the number of new events seen by the hourly rollup.
+    """
+    counts = [_refresh_one(engine, rollup, batch_size) for rollup in _ROLLUPS]
+    return counts[0]
+
+
+def rollup_interval_from_env() -> float:
+    """Seconds between periodic rollup passes; 0 disables the refresher."""
+    raw = os.getenv("ZOMATO_ROLLUP_INTERVAL_SECONDS", "").strip()
+    if not raw:
+        return DEFAULT_ROLLUP_INTERVAL_SECONDS
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        raise RuntimeError(f"ZOMATO_ROLLUP_INTERVAL_SECONDS must be a number, got {raw!r}")
+
+
+class PeriodicRefresher:
+    """
+    Runs incremental refresh jobs (by default `refresh_rollups`) every
+    `interval` seconds on a daemon thread, off the request path.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        interval: float = DEFAULT_ROLLUP_INTERVAL_SECONDS,
+        jobs: Sequence[Callable[[Engine], Any]] = (),
+    ) -> None:
+        self._engine = engine
+        self._interval = interval
+        self._jobs = tuple(jobs) or (refresh_rollups,)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rollup-refresher", daemon=True)
+
+    def start(self) -> "PeriodicRefresher":
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            for job in self._jobs:
+                try:
+                    job(self._engine)
+                except Exception:
+                    logger.exception(
+                        "%s failed; retrying in %.0fs.", getattr(job, "__name__", job), self._interval
+                    )
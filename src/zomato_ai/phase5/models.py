@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
+# "full" asks the LLM to pick and explain; "fast" ranks heuristically and uses
+# stored per-restaurant reason templates.
+PipelineMode = Literal["full", "fast"]
+
+
 class PipelineRecommendation(BaseModel):
     id: int
     name: str
@@ -19,4 +24,27 @@ class PipelineRecommendation(BaseModel):
 class PipelineResponse(BaseModel):
     summary: str
     recommendations: List[PipelineRecommendation]
+    fallback: bool = Field(
+        False,
+        description="True when heuristic ranking stands in for the LLM's picks (LLM failed or request shed).",
+    )
+
+
+class BatchRecommendationsRequest(BaseModel):
+    # Any JSON value: an item that is not a preference object fails on its own, not the batch.
+    items: List[Any] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Preference sets (UserPreference objects); each is validated independently.",
+    )
+
+
+class BatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request.")
+    result: Optional[PipelineResponse] = None
+    error: Optional[str] = None
+
 
+class BatchPipelineResponse(BaseModel):
+    results: List[BatchItemResult]
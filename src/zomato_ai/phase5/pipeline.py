@@ -1,20 +1,40 @@
 from __future__ import annotations
 
 import logging
-from typing import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Mapping, Sequence
 
+from pydantic import ValidationError
 from sqlalchemy.engine import Engine
 
-from zomato_ai.phase2.filtering import filter_restaurants
+from zomato_ai.metrics import REGISTRY, span
+from zomato_ai.phase2.filtering import filter_restaurants, filter_restaurants_many
 from zomato_ai.phase2.models import Restaurant, UserPreference
-from zomato_ai.phase3.groq_client import GroqLLMClient, load_groq_config_from_env
-from zomato_ai.phase3.orchestrator import recommend_with_groq
+from zomato_ai.phase3.groq_client import GroqConfig, GroqLLMClient, load_groq_config_from_env
+from zomato_ai.phase3.models import LLMRecommendationResult
+from zomato_ai.phase3.orchestrator import recommend_batch_with_groq, recommend_with_groq
+from zomato_ai.phase3.prompt_builder import BatchQuery
+from zomato_ai.phase3.rate_limit import LLMRateLimitedError, get_llm_admission
 from zomato_ai.phase4.events import log_recommendation_event
 
-from .models import PipelineRecommendation, PipelineResponse
+from .models import (
+    BatchItemResult,
+    BatchPipelineResponse,
+    PipelineMode,
+    PipelineRecommendation,
+    PipelineResponse,
+)
+from .precompute import lookup_precomputed
+from .reasons import assemble_reason, fetch_reason_templates, local_reason_template
 
 logger = logging.getLogger(__name__)
 
+PIPELINE_FALLBACKS = REGISTRY.counter(
+    "zomato_pipeline_fallbacks_total",
+    "Queries answered with heuristic ranking instead of LLM picks, by reason.",
+    labelnames=("reason",),
+)
+
 
 def _heuristic_fallback(
     candidates: Sequence[Restaurant], limit: int
@@ -36,44 +56,62 @@ def _heuristic_fallback(
     return PipelineResponse(
         summary=f"Top {len(recs)} restaurants based on ratings and your preferences.",
         recommendations=recs,
+        fallback=True,
     )
 
 
-def run_pipeline(
+def _candidate_pool_preferences(preferences: UserPreference) -> UserPreference:
+    """Widen the limit so the LLM selects top N from a larger pool."""
+    return preferences.model_copy(update={"limit": max(preferences.limit * 3, 15)})
+
+
+def _join_llm_result(
+    candidate_pool: Sequence[Restaurant], llm_result: LLMRecommendationResult
+) -> list[PipelineRecommendation]:
+    """Join LLM-ranked ids back to restaurant objects, dropping unknown ids."""
+    by_id: dict[int, Restaurant] = {r.id: r for r in candidate_pool}
+    joined: list[PipelineRecommendation] = []
+    for item in llm_result.recommendations:
+        r = by_id.get(item.id)
+        if not r:
+            continue
+        joined.append(
+            PipelineRecommendation(
+                id=r.id,
+                name=r.name,
+                location=r.location,
+                cuisines=r.cuisines,
+                price_range=r.price_range,
+                rating=r.rating,
+                score=r.score,
+                reason=item.reason,
+            )
+        )
+    return joined
+
+
+def compute_pipeline(
     *,
     engine: Engine,
     preferences: UserPreference,
-) -> PipelineResponse:
+    config: GroqConfig,
+) -> tuple[PipelineResponse, int]:
     """
-    End-to-end pipeline:
-    User preferences → Filter candidates → Groq LLM chooses/explains → Response.
+    Filter → Groq LLM → join, without logging.
 
-    Falls back to heuristic ranking if the LLM call fails or returns bad output.
+    Returns the response and the size of the candidate pool. Falls back to
+    heuristic ranking if the LLM call fails or returns bad output.
     """
-    try:
-        config = load_groq_config_from_env()
-    except RuntimeError:
-        raise
-
     # Filter a larger candidate pool; LLM selects top N from it.
-    candidate_pool = filter_restaurants(
-        engine,
-        preferences.model_copy(update={"limit": max(preferences.limit * 3, 15)}),
-    )
+    candidate_pool = filter_restaurants(engine, _candidate_pool_preferences(preferences))
 
     if not candidate_pool:
-        log_recommendation_event(
-            engine=engine,
-            endpoint="/recommendations/pipeline",
-            preferences=preferences.model_dump(),
-            candidate_count=0,
-            returned_count=0,
-        )
-        return PipelineResponse(summary="No matches found.", recommendations=[])
+        return PipelineResponse(summary="No matches found.", recommendations=[]), 0
 
     # ── Try Groq LLM ──────────────────────────────────────────────────────────
     joined: list[PipelineRecommendation] = []
     summary = ""
+    fallback_reason = "no_match"
 
     try:
         client = GroqLLMClient(config)
@@ -83,49 +121,292 @@ def run_pipeline(
             candidates=candidate_pool,
             limit=preferences.limit,
         )
-
-        # Join LLM-ranked ids back to restaurant objects.
-        by_id: dict[int, Restaurant] = {r.id: r for r in candidate_pool}
-        for item in llm_result.recommendations:
-            r = by_id.get(item.id)
-            if not r:
-                continue
-            joined.append(
-                PipelineRecommendation(
-                    id=r.id,
-                    name=r.name,
-                    location=r.location,
-                    cuisines=r.cuisines,
-                    price_range=r.price_range,
-                    rating=r.rating,
-                    score=r.score,
-                    reason=item.reason,
-                )
-            )
+        with span("join"):
+            joined = _join_llm_result(candidate_pool, llm_result)
         summary = llm_result.summary
 
+    except LLMRateLimitedError as exc:
+        # Over budget or circuit open: skip straight to the heuristic ranking.
+        logger.info("LLM call skipped (%s); using heuristic ranking.", exc.reason)
+        fallback_reason = "rate_limited"
     except Exception as exc:
         logger.warning("LLM call failed (%s); falling back to heuristic ranking.", exc)
+        fallback_reason = "llm_error"
 
     # ── Fallback: use heuristic results if LLM returned nothing usable ────────
     if not joined:
+        PIPELINE_FALLBACKS.inc(reason=fallback_reason)
         logger.info("No LLM results matched candidates — using heuristic fallback.")
-        fallback = _heuristic_fallback(candidate_pool, preferences.limit)
-        log_recommendation_event(
-            engine=engine,
-            endpoint="/recommendations/pipeline",
-            preferences=preferences.model_dump(),
-            candidate_count=len(candidate_pool),
-            returned_count=len(fallback.recommendations),
+        return _heuristic_fallback(candidate_pool, preferences.limit), len(candidate_pool)
+
+    return PipelineResponse(summary=summary, recommendations=joined), len(candidate_pool)
+
+
+def compute_fast_pipeline(
+    *,
+    engine: Engine,
+    preferences: UserPreference,
+) -> tuple[PipelineResponse, int]:
+    """
+    Filter → heuristic ranking → stored reason templates, with no LLM call.
+
+    Restaurants without a stored template get the local stand-in.
+    """
+    candidates = filter_restaurants(engine, preferences)
+    if not candidates:
+        return PipelineResponse(summary="No matches found.", recommendations=[]), 0
+
+    with span("reasons"):
+        templates = fetch_reason_templates(engine, (r.id for r in candidates))
+        recs = [
+            PipelineRecommendation(
+                id=r.id,
+                name=r.name,
+                location=r.location,
+                cuisines=r.cuisines,
+                price_range=r.price_range,
+                rating=r.rating,
+                score=r.score,
+                reason=assemble_reason(templates.get(r.id) or local_reason_template(r), r, preferences),
+            )
+            for r in candidates
+        ]
+    summary = f"Top {len(recs)} restaurants based on ratings and your preferences."
+    return PipelineResponse(summary=summary, recommendations=recs), len(candidates)
+
+
+def _lookup_precomputed(
+    engine: Engine, preferences: UserPreference
+) -> tuple[PipelineResponse, int] | None:
+    with span("precompute_lookup"):
+        return lookup_precomputed(engine, preferences)
+
+
+def run_pipeline(
+    *,
+    engine: Engine,
+    preferences: UserPreference,
+    mode: PipelineMode = "full",
+) -> PipelineResponse:
+    """
+    End-to-end pipeline:
+    User preferences → Filter candidates → Groq LLM chooses/explains → Response.
+
+    Hot query shapes are served from the precomputed table when an entry for
+    the current data version exists (see `zomato_ai.phase5.precompute`);
+    everything else is computed live. `mode="fast"` skips the LLM entirely
+    and explains picks with stored reason templates.
+    """
+    response, candidate_count = resolve_pipeline(engine=engine, preferences=preferences, mode=mode)
+    log_pipeline_event(engine, preferences, response, candidate_count)
+    return response
+
+
+def resolve_pipeline(
+    *,
+    engine: Engine,
+    preferences: UserPreference,
+    mode: PipelineMode = "full",
+) -> tuple[PipelineResponse, int]:
+    """
+    `run_pipeline` without logging: the response and the candidate pool
+    size, for callers that cache responses but log every request.
+    """
+    if mode == "fast":
+        response, candidate_count = compute_fast_pipeline(engine=engine, preferences=preferences)
+    elif (precomputed := _lookup_precomputed(engine, preferences)) is not None:
+        response, candidate_count = precomputed
+    else:
+        config = load_groq_config_from_env()
+        response, candidate_count = compute_pipeline(
+            engine=engine, preferences=preferences, config=config
         )
-        return fallback
+    return response, candidate_count
 
+
+def run_degraded_pipeline(*, engine: Engine, preferences: UserPreference) -> PipelineResponse:
+    """
+    Cheapest acceptable answer for an overloaded pipeline endpoint: the
+    precomputed entry when there is one, otherwise the fast (no-LLM) path.
+    """
+    precomputed = _lookup_precomputed(engine, preferences)
+    if precomputed is not None:
+        response, candidate_count = precomputed
+    else:
+        response, candidate_count = compute_fast_pipeline(engine=engine, preferences=preferences)
+        response.fallback = True
+
+    log_pipeline_event(engine, preferences, response, candidate_count)
+    return response
+
+
+def log_pipeline_event(
+    engine: Engine, preferences: UserPreference, response: PipelineResponse, candidate_count: int
+) -> None:
     log_recommendation_event(
         engine=engine,
         endpoint="/recommendations/pipeline",
         preferences=preferences.model_dump(),
-        candidate_count=len(candidate_pool),
-        returned_count=len(joined),
+        candidate_count=candidate_count,
+        returned_count=len(response.recommendations),
+        restaurant_ids=[r.id for r in response.recommendations],
+    )
+
+
+# Queries with at most this many requested results are grouped into shared
+# multi-query prompts; larger ones get a prompt of their own.
+BATCH_SMALL_QUERY_LIMIT = 10
+BATCH_QUERIES_PER_PROMPT = 5
+
+
+def _llm_results_for_batch(
+    client: GroqLLMClient,
+    work: Sequence[tuple[UserPreference, Sequence[Restaurant]]],
+) -> list[LLMRecommendationResult | None]:
+    """
+    Run the LLM stage for distinct batch queries. Small queries share
+    multi-query prompts; a failed call yields None for the affected queries so
+    they fall back to heuristic ranking individually. The calls run
+    concurrently, at most as many at once as the LLM admission layer admits.
+    """
+    results: list[LLMRecommendationResult | None] = [None] * len(work)
+
+    small = [i for i, (prefs, _) in enumerate(work) if prefs.limit <= BATCH_SMALL_QUERY_LIMIT]
+    large = [i for i, (prefs, _) in enumerate(work) if prefs.limit > BATCH_SMALL_QUERY_LIMIT]
+    groups = [
+        small[start : start + BATCH_QUERIES_PER_PROMPT]
+        for start in range(0, len(small), BATCH_QUERIES_PER_PROMPT)
+    ]
+    # A group of one is sent as a regular single-query prompt.
+    singles = large + [group[0] for group in groups if len(group) == 1]
+    groups = [group for group in groups if len(group) > 1]
+
+    # Each call fills only its own slots of `results`.
+    def run_single(i: int) -> None:
+        prefs, pool = work[i]
+        try:
+            results[i] = recommend_with_groq(
+                client=client, preferences=prefs, candidates=pool, limit=prefs.limit
+            )
+        except LLMRateLimitedError as exc:
+            logger.info("LLM call skipped (%s); using heuristic ranking.", exc.reason)
+            PIPELINE_FALLBACKS.inc(reason="rate_limited")
+        except Exception as exc:
+            logger.warning("LLM call failed (%s); falling back to heuristic ranking.", exc)
+            PIPELINE_FALLBACKS.inc(reason="llm_error")
+
+    def run_group(group: list[int]) -> None:
+        queries = [
+            BatchQuery(query_id=f"Q{n}", preferences=work[i][0], candidates=work[i][1], limit=work[i][0].limit)
+            for n, i in enumerate(group, start=1)
+        ]
+        try:
+            by_query = recommend_batch_with_groq(client=client, queries=queries)
+        except LLMRateLimitedError as exc:
+            logger.info("Batched LLM call skipped (%s); using heuristic ranking.", exc.reason)
+            PIPELINE_FALLBACKS.inc(len(group), reason="rate_limited")
+            return
+        except Exception as exc:
+            logger.warning("Batched LLM call failed (%s); falling back to heuristic ranking.", exc)
+            PIPELINE_FALLBACKS.inc(len(group), reason="llm_error")
+            return
+        for query, i in zip(queries, group):
+            results[i] = by_query.get(query.query_id)
+            if results[i] is None:
+                PIPELINE_FALLBACKS.inc(reason="no_match")
+
+    calls: list[Callable[[], None]] = [lambda i=i: run_single(i) for i in singles]
+    calls += [lambda group=group: run_group(group) for group in groups]
+    # More parallel calls than the admission layer's concurrency would only be rejected.
+    workers = min(len(calls), get_llm_admission().limits.max_concurrency or len(calls))
+    if workers <= 1:
+        for call in calls:
+            call()
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-llm") as executor:
+            for future in [executor.submit(call) for call in calls]:
+                future.result()
+
+    return results
+
+
+def run_batch_pipeline(
+    *,
+    engine: Engine,
+    items: Sequence[UserPreference | Mapping[str, Any]],
+) -> BatchPipelineResponse:
+    """
+    Batch variant of `run_pipeline` for many preference sets.
+
+    All queries are filtered against one snapshot of the restaurants table,
+    identical queries are computed once, and small queries share LLM calls.
+    Results are returned in input order; an item that fails validation or
+    processing gets an `error` instead of failing the whole batch.
+    """
+    config = load_groq_config_from_env()
+
+    results: list[BatchItemResult] = [BatchItemResult(index=i) for i in range(len(items))]
+
+    # Validate items and collapse identical queries.
+    distinct: dict[str, UserPreference] = {}
+    query_key_by_index: dict[int, str] = {}
+    for i, item in enumerate(items):
+        try:
+            prefs = item if isinstance(item, UserPreference) else UserPreference.model_validate(item)
+        except ValidationError as exc:
+            results[i].error = f"Invalid preferences: {exc.errors(include_url=False)}"
+            continue
+        key = prefs.model_dump_json()
+        distinct.setdefault(key, prefs)
+        query_key_by_index[i] = key
+
+    keys = list(distinct)
+    pools = dict(
+        zip(keys, filter_restaurants_many(engine, [_candidate_pool_preferences(distinct[k]) for k in keys]))
+    )
+
+    work_keys = [key for key in keys if pools[key]]
+    llm_results = (
+        _llm_results_for_batch(GroqLLMClient(config), [(distinct[k], pools[k]) for k in work_keys])
+        if work_keys
+        else []
     )
+    llm_by_key = dict(zip(work_keys, llm_results))
+
+    responses: dict[str, PipelineResponse] = {}
+    errors: dict[str, str] = {}
+    for key in keys:
+        pool = pools[key]
+        if not pool:
+            responses[key] = PipelineResponse(summary="No matches found.", recommendations=[])
+            continue
+        try:
+            llm_result = llm_by_key[key]
+            with span("join"):
+                joined = _join_llm_result(pool, llm_result) if llm_result else []
+            if joined:
+                responses[key] = PipelineResponse(summary=llm_result.summary, recommendations=joined)
+            else:
+                if llm_result is not None:
+                    PIPELINE_FALLBACKS.inc(reason="no_match")
+                responses[key] = _heuristic_fallback(pool, distinct[key].limit)
+        except Exception as exc:
+            logger.warning("Batch query failed (%s).", exc)
+            errors[key] = str(exc)
+
+    for i, key in query_key_by_index.items():
+        if key in errors:
+            results[i].error = errors[key]
+            continue
+        response = responses[key]
+        results[i].result = response
+        log_recommendation_event(
+            engine=engine,
+            endpoint="/recommendations/batch",
+            preferences=distinct[key].model_dump(),
+            candidate_count=len(pools[key]),
+            returned_count=len(response.recommendations),
+            restaurant_ids=[r.id for r in response.recommendations],
+        )
 
-    return PipelineResponse(summary=summary, recommendations=joined)
+    return BatchPipelineResponse(results=results)
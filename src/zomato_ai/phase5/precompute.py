@@ -0,0 +1,264 @@
+"""
+Materialized pipeline results for hot query shapes.
+
+`precompute_hot_queries` mines the most frequent preference sets from
+`recommendation_events`, runs the pipeline for each of them (paced to stay
+within a request rate) and stores the responses keyed by their canonical
+form, stamped with the restaurants data version they were computed from.
+`run_pipeline` serves a stored response when the key matches and the data
+version is still current, and computes live otherwise.
+
+Run it off-peak:
+
+    python -m zomato_ai.phase5.precompute --top 200 --per-minute 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, insert, select
+from sqlalchemy.engine import Engine
+
+from zomato_ai.metrics import REGISTRY
+from zomato_ai.phase2.models import UserPreference
+from zomato_ai.data.data_version import current_data_version, fetch_data_version
+from zomato_ai.phase3.groq_client import load_groq_config_from_env
+from zomato_ai.phase4.events import recommendation_events_table
+
+from .models import PipelineResponse
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_ENDPOINT = "/recommendations/pipeline"
+
+PRECOMPUTE_LOOKUPS = REGISTRY.counter(
+    "zomato_precompute_lookups_total",
+    "Pipeline requests checked against precomputed results, by outcome (hit, miss, stale).",
+    labelnames=("result",),
+)
+
+
+metadata = MetaData()
+
+precomputed_recommendations_table = Table(
+    "precomputed_recommendations",
+    metadata,
+    Column("query_key", String, primary_key=True),
+    Column("data_version", String, nullable=False),
+    Column("candidate_count", Integer, nullable=False),
+    Column("response_json", String, nullable=False),
+    Column("computed_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def canonical_preferences(preferences: UserPreference) -> Dict[str, Any]:
+    """
+    Normalise preferences without changing what they match.
+
+    Location matching is a case-insensitive substring test, so only case is
+    folded; cuisines are matched stripped and case-insensitively in any
+    order, so they are sorted and deduplicated. Empty filters become None.
+    """
+    cuisines = sorted(
+        {c.strip().lower() for c in preferences.preferred_cuisines or [] if c.strip()}
+    )
+    canonical = {
+        "location": preferences.location.lower() if preferences.location else None,
+        "min_rating": preferences.min_rating,
+        "min_price": preferences.min_price,
+        "max_price": preferences.max_price,
+        "preferred_cuisines": cuisines or None,
+        "limit": preferences.limit,
+    }
+    # Free-text matching ignores case and spacing. Only present when set, so
+    # keys stored before the field existed still match.
+    query = " ".join((preferences.query or "").lower().split())
+    if query:
+        canonical["query"] = query
+    return canonical
+
+
+def query_key(preferences: UserPreference) -> str:
+    return json.dumps(canonical_preferences(preferences), sort_keys=True, separators=(",", ":"))
+
+
+def lookup_precomputed(
+    engine: Engine, preferences: UserPreference
+) -> Tuple[PipelineResponse, int] | None:
+    """
+    Return (response, candidate_count) for `preferences` if a result computed
+    from the current data version is stored, else None.
+    """
+    t = precomputed_recommendations_table
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(t.c.data_version, t.c.candidate_count, t.c.response_json).where(
+                t.c.query_key == query_key(preferences)
+            )
+        ).first()
+    if row is None:
+        PRECOMPUTE_LOOKUPS.inc(result="miss")
+        return None
+    if row.data_version != current_data_version(engine):
+        PRECOMPUTE_LOOKUPS.inc(result="stale")
+        return None
+    PRECOMPUTE_LOOKUPS.inc(result="hit")
+    return PipelineResponse.model_validate_json(row.response_json), row.candidate_count
+
+
+def store_precomputed(
+    engine: Engine,
+    preferences: UserPreference,
+    response: PipelineResponse,
+    candidate_count: int,
+    data_version: str,
+) -> None:
+    t = precomputed_recommendations_table
+    key = query_key(preferences)
+    with engine.begin() as conn:
+        conn.execute(delete(t).where(t.c.query_key == key))
+        conn.execute(
+            insert(t).values(
+                query_key=key,
+                data_version=data_version,
+                candidate_count=candidate_count,
+                response_json=response.model_dump_json(),
+                computed_at=datetime.now(timezone.utc),
+            )
+        )
+
+
+def mine_query_shapes(
+    engine: Engine, *, since: datetime | None = None
+) -> Tuple[Counter, int]:
+    """
+    Count pipeline requests per canonical preference set.
+
+    Returns (counts by query key, total pipeline requests considered).
+    Offline only: this reads and parses every matching raw event.
+    """
+    t = recommendation_events_table
+    stmt = select(t.c.preferences_json).where(t.c.endpoint == PIPELINE_ENDPOINT)
+    if since is not None:
+        stmt = stmt.where(t.c.created_at >= since)
+
+    counts: Counter = Counter()
+    total = 0
+    with engine.connect() as conn:
+        for (raw,) in conn.execute(stmt):
+            total += 1
+            try:
+                preferences = UserPreference.model_validate_json(raw)
+            except ValidationError:
+                continue
+            counts[query_key(preferences)] += 1
+    return counts, total
+
+
+@dataclass(frozen=True)
+class PrecomputeReport:
+    total_requests: int
+    shapes_seen: int
+    shapes_precomputed: int
+    failed: int
+    covered_requests: int
+
+    @property
+    def coverage(self) -> float:
+        """Share of the mined traffic whose query shape is now precomputed."""
+        return self.covered_requests / self.total_requests if self.total_requests else 0.0
+
+
+def precompute_hot_queries(
+    engine: Engine,
+    *,
+    top_n: int = 100,
+    since: datetime | None = None,
+    max_per_minute: float | None = 20.0,
+) -> PrecomputeReport:
+    """
+    Precompute pipeline results for the `top_n` most requested query shapes.
+
+    Pipeline runs are spaced to at most `max_per_minute` (None: no pacing) so
+    the job stays well inside the Groq rate limits shared with live traffic;
+    the in-process LLM admission limits apply on top. Results are not logged
+    as recommendation events.
+    """
+    # Imported here: the pipeline module imports this one for lookups.
+    from .pipeline import compute_pipeline
+
+    config = load_groq_config_from_env()
+    counts, total = mine_query_shapes(engine, since=since)
+    data_version = fetch_data_version(engine)
+    interval = 60.0 / max_per_minute if max_per_minute else 0.0
+
+    done = failed = covered = 0
+    next_start = time.monotonic()
+    for key, count in counts.most_common(top_n):
+        preferences = UserPreference.model_validate(json.loads(key))
+        time.sleep(max(0.0, next_start - time.monotonic()))
+        next_start = time.monotonic() + interval
+        try:
+            response, candidate_count = compute_pipeline(
+                engine=engine, preferences=preferences, config=config
+            )
+        except Exception:
+            logger.exception("Precompute failed for %s", key)
+            failed += 1
+            continue
+        if response.fallback:
+            # A heuristic stand-in would be served until the data changes.
+            logger.warning("Precompute got no LLM answer for %s", key)
+            failed += 1
+            continue
+        store_precomputed(engine, preferences, response, candidate_count, data_version)
+        done += 1
+        covered += count
+
+    return PrecomputeReport(
+        total_requests=total,
+        shapes_seen=len(counts),
+        shapes_precomputed=done,
+        failed=failed,
+        covered_requests=covered,
+    )
+
+
+def main() -> None:
+    from zomato_ai.data.migrations import bootstrap_schema
+    from zomato_ai.phase2.repository import create_engine_for_url
+
+    parser = argparse.ArgumentParser(description="Precompute pipeline results for hot query shapes.")
+    parser.add_argument("--top", type=int, default=100, help="Number of query shapes to precompute.")
+    parser.add_argument("--days", type=float, default=7.0, help="Mine events from the last N days.")
+    parser.add_argument("--per-minute", type=float, default=20.0, help="Max pipeline runs per minute.")
+    parser.add_argument("--db-url", default=os.getenv("ZOMATO_DB_URL") or None)
+    args = parser.parse_args()
+
+    engine = create_engine_for_url(args.db_url)
+    bootstrap_schema(engine)
+    report = precompute_hot_queries(
+        engine,
+        top_n=args.top,
+        since=datetime.now(timezone.utc) - timedelta(days=args.days),
+        max_per_minute=args.per_minute or None,
+    )
+    print(
+        f"Precomputed {report.shapes_precomputed}/{min(args.top, report.shapes_seen)} shapes "
+        f"({report.failed} failed); coverage {report.coverage:.1%} of "
+        f"{report.total_requests} pipeline requests."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Stored per-restaurant reason templates for the LLM-free "fast" pipeline mode.
+
+`generate_reason_templates` writes one short, preference-independent
+description per restaurant, produced in bulk by Groq or by a local
+stand-in. At request time `assemble_reason` appends the preferences the
+restaurant actually matched, so fast responses still explain themselves
+without an LLM round trip.
+
+    python -m zomato_ai.phase5.reasons            # Groq, 25 restaurants per call
+    python -m zomato_ai.phase5.reasons --local    # deterministic stand-in
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, insert, select
+from sqlalchemy.engine import Engine
+
+from zomato_ai.phase2.models import Restaurant, UserPreference
+from zomato_ai.phase2.repository import fetch_all_restaurants
+from zomato_ai.phase3.groq_client import GroqLLMClient, load_groq_config_from_env
+from zomato_ai.phase3.orchestrator import generate_reason_templates_with_groq
+from zomato_ai.phase3.rate_limit import LLMRateLimitedError
+from zomato_ai.phase4.dedup import dedup_rows_by_name_location
+
+logger = logging.getLogger(__name__)
+
+
+metadata = MetaData()
+
+restaurant_reasons_table = Table(
+    "restaurant_reasons",
+    metadata,
+    Column("restaurant_id", Integer, primary_key=True),
+    Column("template", String, nullable=False),
+    Column("source", String, nullable=False),
+    Column("generated_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def local_reason_template(restaurant: Restaurant) -> str:
+    """Deterministic stand-in for an LLM-written description."""
+    text = restaurant.name
+    if restaurant.cuisines:
+        text += f" serves {restaurant.cuisines}"
+    if restaurant.location:
+        text += f" in {restaurant.location}"
+    details: List[str] = []
+    if restaurant.rating is not None:
+        details.append(f"is rated {restaurant.rating:g}/5")
+    if restaurant.price_range is not None:
+        details.append(f"costs about ₹{restaurant.price_range} for two")
+    if details:
+        text += (", and " if restaurant.cuisines or restaurant.location else " ") + " and ".join(details)
+    return text + "."
+
+
+def _split(value: str | None) -> List[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def assemble_reason(template: str, restaurant: Restaurant, preferences: UserPreference) -> str:
+    """Append the preferences this restaurant matched to its stored template."""
+    matched: List[str] = []
+    wanted = {c.strip().lower() for c in preferences.preferred_cuisines or [] if c.strip()}
+    cuisines = [c for c in _split(restaurant.cuisines) if c.lower() in wanted]
+    if cuisines:
+        matched.append(", ".join(cuisines))
+    if preferences.location and restaurant.location:
+        matched.append(f"in {restaurant.location}")
+    if preferences.max_price is not None and restaurant.price_range is not None:
+        matched.append(f"within ₹{preferences.max_price} for two")
+    if preferences.min_rating is not None and restaurant.rating is not None:
+        matched.append(f"rated {restaurant.rating:g}+")
+    if not matched:
+        return template
+    return f"{template} Matches your search: {'; '.join(matched)}."
+
+
+def fetch_reason_templates(engine: Engine, restaurant_ids: Iterable[int]) -> Dict[int, str]:
+    ids = list(restaurant_ids)
+    if not ids:
+        return {}
+    t = restaurant_reasons_table
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(t.c.restaurant_id, t.c.template).where(t.c.restaurant_id.in_(ids))
+        ).all()
+    return {rid: template for rid, template in rows}
+
+
+def _store(engine: Engine, templates: Dict[int, str], source: Dict[int, str]) -> None:
+    t = restaurant_reasons_table
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(delete(t).where(t.c.restaurant_id.in_(list(templates))))
+        conn.execute(
+            insert(t),
+            [
+                {"restaurant_id": rid, "template": text, "source": source[rid], "generated_at": now}
+                for rid, text in templates.items()
+            ],
+        )
+
+
+@dataclass(frozen=True)
+class ReasonReport:
+    llm: int
+    local: int
+    skipped: int
+
+
+def _restaurants(engine: Engine) -> List[Restaurant]:
+    rows = dedup_rows_by_name_location(fetch_all_restaurants(engine))
+    return [
+        Restaurant(
+            id=row["id"],
+            name=row["name"],
+            location=row.get("location"),
+            cuisines=row.get("cuisines"),
+            price_range=row.get("price_range"),
+            rating=row.get("rating"),
+            score=0.0,
+        )
+        for row in rows
+    ]
+
+
+def _llm_templates(client: GroqLLMClient, chunk: Sequence[Restaurant]) -> Dict[int, str]:
+    for attempt in range(2):
+        try:
+            return generate_reason_templates_with_groq(client=client, restaurants=chunk)
+        except LLMRateLimitedError as exc:
+            if attempt:
+                break
+            time.sleep(exc.retry_after)
+        except Exception as exc:
+            logger.warning("Reason generation failed for %d restaurant(s): %s", len(chunk), exc)
+            break
+    return {}
+
+
+def generate_reason_templates(
+    engine: Engine,
+    *,
+    client: GroqLLMClient | None = None,
+    batch_size: int = 25,
+    regenerate: bool = False,
+) -> ReasonReport:
+    """
+    Store a reason template for every restaurant that lacks one (or for all
+    of them with `regenerate`).
+
+    With a `client`, restaurants are described `batch_size` at a time in one
+    Groq call each; anything the model skips or fails on gets the local
+    stand-in, so every restaurant ends up with a template.
+    """
+    restaurants = _restaurants(engine)
+    existing = set() if regenerate else set(fetch_reason_templates(engine, [r.id for r in restaurants]))
+    todo = [r for r in restaurants if r.id not in existing]
+
+    llm = local = 0
+    for start in range(0, len(todo), batch_size):
+        chunk = todo[start : start + batch_size]
+        templates = _llm_templates(client, chunk) if client is not None else {}
+        source = {rid: "llm" for rid in templates}
+        for r in chunk:
+            if r.id not in templates:
+                templates[r.id] = local_reason_template(r)
+                source[r.id] = "local"
+        _store(engine, templates, source)
+        llm += sum(1 for s in source.values() if s == "llm")
+        local += sum(1 for s in source.values() if s == "local")
+
+    return ReasonReport(llm=llm, local=local, skipped=len(existing))
+
+
+def main() -> None:
+    from zomato_ai.data.migrations import bootstrap_schema
+    from zomato_ai.phase2.repository import create_engine_for_url
+
+    parser = argparse.ArgumentParser(description="Pre-generate per-restaurant reason templates.")
+    parser.add_argument("--local", action="store_true", help="Use the local stand-in instead of Groq.")
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--regenerate", action="store_true", help="Replace existing templates.")
+    parser.add_argument("--db-url", default=os.getenv("ZOMATO_DB_URL") or None)
+    args = parser.parse_args()
+
+    engine = create_engine_for_url(args.db_url)
+    bootstrap_schema(engine)
+    client = None if args.local else GroqLLMClient(load_groq_config_from_env())
+    report = generate_reason_templates(
+        engine, client=client, batch_size=args.batch_size, regenerate=args.regenerate
+    )
+    print(f"Stored {report.llm} LLM and {report.local} local template(s); {report.skipped} already present.")
+
+
+if __name__ == "__main__":
+    main()
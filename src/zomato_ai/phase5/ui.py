@@ -1,24 +1,123 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
+import os
+from dataclasses import dataclass
 from pathlib import Path
 
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Response
 
+try:  # Optional: serve a brotli variant when the package is installed.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
 
-def _load_index_html() -> str:
-    ui_dir = Path(__file__).resolve().parent / "ui"
-    index_path = ui_dir / "index.html"
-    return index_path.read_text(encoding="utf-8")
+INDEX_PATH = Path(__file__).resolve().parent / "ui" / "index.html"
 
+# The page is not fingerprinted, so browsers revalidate every load; the
+# answer is a bodiless 304 while the ETag still matches.
+CACHE_CONTROL = "no-cache"
 
-def mount_ui(app: FastAPI) -> None:
+
+def ui_reload_from_env() -> bool:
+    """ZOMATO_UI_RELOAD=1 re-reads index.html when it changes on disk (development)."""
+    value = os.getenv("ZOMATO_UI_RELOAD", "0").strip().lower()
+    if value in {"1", "true", "yes", "on"}:
+        return True
+    if value in {"0", "false", "no", "off", ""}:
+        return False
+    raise RuntimeError(f"Invalid ZOMATO_UI_RELOAD={value!r}; expected 0 or 1")
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """One file held in memory with its precompressed variants."""
+
+    identity: bytes
+    gzip: bytes
+    brotli: bytes | None
+    etag: str
+    mtime_ns: int
+
+    @classmethod
+    def load(cls, path: Path) -> "StaticAsset":
+        body = path.read_bytes()
+        return cls(
+            identity=body,
+            # mtime=0 keeps the gzip bytes (and so the ETag) stable across restarts.
+            gzip=gzip.compress(body, compresslevel=9, mtime=0),
+            brotli=brotli.compress(body) if brotli is not None else None,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            mtime_ns=path.stat().st_mtime_ns,
+        )
+
+    def variant(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        """Pick the smallest encoding the client accepts."""
+        accepted = _accepted_encodings(accept_encoding)
+        if self.brotli is not None and "br" in accepted:
+            return self.brotli, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.identity, None
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 §13.1.2): W/ prefixes are ignored.
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class _IndexPage:
+    """The UI page, read and compressed once; optionally reloaded on change."""
+
+    def __init__(self, path: Path, reload: bool) -> None:
+        self._path = path
+        self._reload = reload
+        self._asset = StaticAsset.load(path)
+
+    def current(self) -> StaticAsset:
+        if self._reload and self._path.stat().st_mtime_ns != self._asset.mtime_ns:
+            self._asset = StaticAsset.load(self._path)
+        return self._asset
+
+
+def mount_ui(app: FastAPI, *, path: Path = INDEX_PATH, reload: bool | None = None) -> None:
     """
     Mount a simple UI page at `/`.
     The UI calls `/recommendations/pipeline` to run User → Filter → LLM → Response.
+
+    The page is read and compressed once here, so requests cost no disk I/O
+    or compression. Each encoding has its own strong ETag; a matching
+    `If-None-Match` gets a 304.
     """
+    page = _IndexPage(path, ui_reload_from_env() if reload is None else reload)
 
-    @app.get("/", response_class=HTMLResponse, include_in_schema=False)
-    def index() -> HTMLResponse:
-        return HTMLResponse(_load_index_html())
+    @app.get("/", include_in_schema=False)
+    def index(request: Request) -> Response:
+        asset = page.current()
+        body, encoding = asset.variant(request.headers.get("accept-encoding", ""))
+        etag = f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
 
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type="text/html; charset=utf-8", headers=headers)
@@ -0,0 +1,354 @@
+"""
+On-demand profiling for live API workers.
+
+Disabled unless ZOMATO_PROFILING_TOKEN is set. Then:
+
+- A request carrying `X-Profile: 1` (or `cprofile`) and a matching
+  `X-Profile-Token` runs under cProfile, covering both the event loop and
+  the worker thread that runs its handler; the stats are written as a
+  `.pstats` file. Only one such request is profiled at a time per process;
+  others get 409. `X-Profile: sample` instead samples every thread's stack
+  while the request runs and writes speedscope JSON.
+- `SamplingProfiler` records a time-bounded profile of the whole worker, and
+  `tracemalloc_diff` compares allocation snapshots taken over a window.
+
+Files go to ZOMATO_PROFILE_DIR (default ./profiles) and open in standard
+viewers: `python -m pstats <file>`, snakeviz, or https://www.speedscope.app.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import hmac
+import json
+import os
+import pathlib
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PROFILE_DIR = "./profiles"
+DEFAULT_SAMPLE_INTERVAL = 0.005
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# From 3.12 cProfile is built on sys.monitoring: one profiler may be active
+# per interpreter, and it records the calls of every thread. Before 3.12 a
+# profiler sees only the thread that enabled it, so a request's worker
+# thread needs a profiler of its own.
+PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+# Held while a cProfile request profile is running; one at a time per process.
+_cprofile_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    token: str
+    output_dir: pathlib.Path
+
+
+def profiling_config_from_env() -> ProfilingConfig | None:
+    """ZOMATO_PROFILING_TOKEN enables profiling; ZOMATO_PROFILE_DIR sets where files go."""
+    token = os.getenv("ZOMATO_PROFILING_TOKEN", "").strip()
+    if not token:
+        return None
+    output_dir = os.getenv("ZOMATO_PROFILE_DIR", "").strip() or DEFAULT_PROFILE_DIR
+    return ProfilingConfig(token=token, output_dir=pathlib.Path(output_dir))
+
+
+def token_matches(config: ProfilingConfig, presented: str | None) -> bool:
+    return presented is not None and hmac.compare_digest(presented.encode(), config.token.encode())
+
+
+def profile_path(config: ProfilingConfig, label: str, suffix: str) -> pathlib.Path:
+    """A new, unique file in the output directory, e.g. `20260101-120000-pipeline-1a2b3c4d.pstats`."""
+    config.output_dir.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-") or "profile"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return config.output_dir / f"{stamp}-{slug}-{uuid.uuid4().hex[:8]}{suffix}"
+
+
+class RequestProfile:
+    """
+    cProfile for one request. With `per_thread` (before 3.12, where cProfile
+    only sees the thread it is enabled on) each thread the request touches
+    records into its own profiler and the results are merged when the stats
+    are written; otherwise the one profiler on the event loop covers all.
+    """
+
+    def __init__(self, per_thread: bool = True) -> None:
+        self.per_thread = per_thread
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+
+    def new_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def dump(self, path: pathlib.Path) -> None:
+        with self._lock:
+            profiles = [p for p in self._profiles if p.getstats()]
+        if not profiles:
+            return
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+
+
+_request_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "zomato_request_profile", default=None
+)
+
+
+def set_request_profile(profile: RequestProfile | None) -> contextvars.Token:
+    return _request_profile.set(profile)
+
+
+def reset_request_profile(token: contextvars.Token) -> None:
+    _request_profile.reset(token)
+
+
+def call_profiled(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call `func`, under the current request's cProfile if it has one.
+
+    Handlers dispatched to the threadpool go through this so their work is
+    profiled on the worker thread (the context variable travels with them).
+    """
+    profile = _request_profile.get()
+    if profile is None or not profile.per_thread:
+        return func(*args, **kwargs)
+    return profile.new_profile().runcall(func, *args, **kwargs)
+
+
+# (function name, file, first line) identifies a speedscope frame.
+FrameKey = Tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for every thread in the process.
+
+    A daemon thread reads `sys._current_frames()` every `interval` seconds;
+    each thread's samples become one speedscope "sampled" profile, weighted
+    by the time since the previous sample. Nothing is installed in the
+    sampled threads, so overhead is limited to the sampler's own wake-ups.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL, max_depth: int = 128) -> None:
+        self.interval = interval
+        self.max_depth = max_depth
+        self._frames: Dict[FrameKey, int] = {}
+        # Thread id -> (stacks of frame indices, root first; weights in seconds).
+        self._samples: Dict[int, Tuple[List[List[int]], List[float]]] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _frame_index(self, code: Any) -> int:
+        key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+        index = self._frames.get(key)
+        if index is None:
+            index = self._frames[key] = len(self._frames)
+        return index
+
+    def _sample(self, weight: float) -> None:
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack: List[int] = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._frame_index(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            stacks, weights = self._samples.setdefault(ident, ([], []))
+            stacks.append(stack)
+            weights.append(weight)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="zomato-sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread_names = {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+        return self
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    @property
+    def sample_count(self) -> int:
+        return sum(len(weights) for _, weights in self._samples.values())
+
+    def to_speedscope(self, name: str = "zomato_ai") -> Dict[str, Any]:
+        frames = [{"name": fn, "file": file, "line": line} for fn, file, line in self._frames]
+        profiles = []
+        for ident, (stacks, weights) in sorted(self._samples.items()):
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": self._thread_names.get(ident, f"thread {ident}"),
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": stacks,
+                    "weights": weights,
+                }
+            )
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "zomato_ai.profiling",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def dump(self, path: pathlib.Path, name: str = "zomato_ai") -> None:
+        path.write_text(json.dumps(self.to_speedscope(name)), encoding="utf-8")
+
+
+def tracemalloc_diff(
+    wait: Callable[[], None],
+    *,
+    frames: int = 1,
+    top: int = 25,
+    dump_to: Tuple[pathlib.Path, pathlib.Path] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Snapshot allocations, call `wait()`, snapshot again and return the `top`
+    source lines by growth. Tracing is started (and stopped again) if it is
+    not already on. `dump_to` names two files to save the snapshots in, for
+    `tracemalloc.Snapshot.load`.
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    # Leave tracemalloc's own bookkeeping out of the comparison.
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        wait()
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    if dump_to is not None:
+        before.dump(str(dump_to[0]))
+        after.dump(str(dump_to[1]))
+
+    return [
+        {
+            "location": str(stat.traceback),
+            "size_diff": stat.size_diff,
+            "count_diff": stat.count_diff,
+            "size": stat.size,
+            "count": stat.count,
+        }
+        for stat in after.compare_to(before, "lineno")[:top]
+    ]
+
+
+PROFILE_HEADER = b"x-profile"
+TOKEN_HEADER = b"x-profile-token"
+PROFILE_MODES = {b"1": "cprofile", b"cprofile": "cprofile", b"sample": "sample"}
+
+
+class ProfileMiddleware:
+    """
+    ASGI middleware for per-request profiling (`X-Profile` header).
+
+    The profile file name is returned in `X-Profile-Id` and the file is
+    written once the response has been sent. Requests without the header,
+    or with a wrong token, pass straight through. A cProfile request that
+    arrives while another is being profiled gets 409.
+    """
+
+    def __init__(self, app: Callable[..., Any], config: ProfilingConfig) -> None:
+        self.app = app
+        self.config = config
+
+    def _mode(self, scope: dict) -> str | None:
+        headers = dict(scope.get("headers") or ())
+        mode = PROFILE_MODES.get(headers.get(PROFILE_HEADER, b"").strip().lower())
+        if mode is None:
+            return None
+        token = headers.get(TOKEN_HEADER)
+        return mode if token_matches(self.config, token.decode("latin-1") if token else None) else None
+
+    async def __call__(self, scope: dict, receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        mode = self._mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = profile_path(self.config, scope.get("path", ""), ".pstats" if mode == "cprofile" else ".speedscope.json")
+
+        async def send_with_id(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", path.name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if mode == "sample":
+            with SamplingProfiler() as sampler:
+                await self.app(scope, receive, send_with_id)
+            sampler.dump(path, name=f"{scope.get('method', '')} {scope.get('path', '')}")
+            return
+
+        if not _cprofile_lock.acquire(blocking=False):
+            await _send_busy(send)
+            return
+        try:
+            request_profile = RequestProfile(per_thread=not PROFILER_SEES_ALL_THREADS)
+            token = set_request_profile(request_profile)
+            loop_profile = request_profile.new_profile()
+            loop_profile.enable()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                loop_profile.disable()
+                reset_request_profile(token)
+            request_profile.dump(path)
+        finally:
+            _cprofile_lock.release()
+
+
+async def _send_busy(send: Callable[..., Any]) -> None:
+    body = json.dumps({"detail": "Another request is being profiled; retry shortly."}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 409,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
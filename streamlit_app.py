@@ -1,9 +1,14 @@
 """
 Zomato AI Restaurant Recommendation Service — Streamlit Frontend
 Clean centred UI. No sidebar. Compact aligned filter card + single-line CTA.
+
+Script reruns stay cheap: engine, dropdown options and pipeline results are
+cached (keyed by the data version, so a re-ingest invalidates them), the
+"is there data?" check runs once per session, and a first-run ingest runs on
+a background thread while the page polls its progress.
 """
 from __future__ import annotations
-import os, sys
+import logging, os, sys, threading
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
 SRC  = os.path.join(ROOT, "src")
@@ -25,14 +30,27 @@ try:
 except Exception:
     pass
 
+from zomato_ai.data.data_version import NO_DATA_VERSION
+from zomato_ai.data.migrations import bootstrap_schema
 from zomato_ai.phase1.ingestion import DEFAULT_DB_URL, ingest_huggingface_dataset
 from zomato_ai.phase2.models import UserPreference
 from zomato_ai.phase2.repository import (
     create_engine_for_url,
+    fetch_data_version,
     fetch_unique_cuisines,
     fetch_unique_locations,
 )
-from zomato_ai.phase5.pipeline import run_pipeline
+from zomato_ai.phase5.models import PipelineResponse
+from zomato_ai.phase5.pipeline import log_pipeline_event, resolve_pipeline
+from zomato_ai.phase5.precompute import query_key
+
+logger = logging.getLogger(__name__)
+
+# How long the data version is trusted before it is re-read; a re-ingest by
+# another process shows up (and invalidates cached results) within this.
+DATA_VERSION_TTL_SECONDS = 30
+# Identical preferences reuse a pipeline result for this long.
+PIPELINE_CACHE_TTL_SECONDS = 600
 
 # ── Page config ───────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -220,30 +238,128 @@ div[data-testid="stButton"] > button:hover{
 """, unsafe_allow_html=True)
 
 # ── Cached helpers ─────────────────────────────────────────────────────────────
+def _db_url() -> str:
+    return os.getenv("ZOMATO_DB_URL") or DEFAULT_DB_URL
+
 @st.cache_resource(show_spinner=False)
 def get_engine():
-    return create_engine_for_url(os.getenv("ZOMATO_DB_URL") or DEFAULT_DB_URL)
+    engine = create_engine_for_url(_db_url())
+    bootstrap_schema(engine)  # once per process; hot paths assume the schema exists
+    return engine
+
+@st.cache_data(show_spinner=False, ttl=DATA_VERSION_TTL_SECONDS)
+def get_data_version() -> str:
+    return fetch_data_version(get_engine())
 
+# `data_version` is only part of the cache key: new data means new entries.
 @st.cache_data(show_spinner=False, ttl=3600)
-def get_locations():
+def get_locations(data_version: str):
     return fetch_unique_locations(get_engine())
 
 @st.cache_data(show_spinner=False, ttl=3600)
-def get_cuisines():
+def get_cuisines(data_version: str):
     return fetch_unique_cuisines(get_engine())
 
-def _ensure_data():
-    from sqlalchemy import text
+class _UncachedResponse(Exception):
+    """Carries a fallback answer out of `_cached_pipeline`; Streamlit does not cache exceptions."""
+
+
+@st.cache_data(show_spinner=False, ttl=PIPELINE_CACHE_TTL_SECONDS, max_entries=512)
+def _cached_pipeline(preferences_key: str, data_version: str, _prefs: UserPreference) -> tuple[PipelineResponse, int]:
+    """
+    Pipeline result and candidate count for `_prefs`. The key is
+    `query_key(_prefs)`, so choices that match the same restaurants (cuisine
+    order, case) share an entry; the underscore keeps the model itself out
+    of Streamlit's hash.
+    """
+    response, candidate_count = resolve_pipeline(engine=get_engine(), preferences=_prefs)
+    if response.fallback:
+        # One failed LLM call must not pin the heuristic answer for the TTL.
+        raise _UncachedResponse(response, candidate_count)
+    return response, candidate_count
+
+def get_recommendations(prefs: UserPreference, data_version: str) -> PipelineResponse:
+    """Pipeline result for `prefs`, logged as an event whether or not it was cached."""
     try:
-        with get_engine().connect() as c:
-            n = c.execute(text("SELECT COUNT(*) FROM restaurants")).scalar()
-        if n == 0: raise ValueError
-    except Exception:
-        with st.spinner("⏳ First run: ingesting Zomato dataset…"):
-            ingest_huggingface_dataset()
-        st.cache_data.clear()
+        response, candidate_count = _cached_pipeline(query_key(prefs), data_version, prefs)
+    except _UncachedResponse as exc:
+        response, candidate_count = exc.args
+    log_pipeline_event(get_engine(), prefs, response, candidate_count)
+    return response
+
+
+class IngestJob:
+    """First-run dataset ingest on a background thread, shared by all sessions."""
+
+    def __init__(self, db_url: str) -> None:
+        self.db_url = db_url
+        self.message = "Starting"
+        self.fraction = 0.0
+        self.error: Exception | None = None
+        self.done = False
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, *, retry: bool = False) -> None:
+        """Start the ingest unless it has already run; `retry` restarts a failed one."""
+        with self._lock:
+            if self.running or (self._thread is not None and not (retry and self.error)):
+                return
+            self.message, self.fraction, self.error = "Starting", 0.0, None
+            self._thread = threading.Thread(target=self._run, name="zomato-first-run-ingest", daemon=True)
+            self._thread.start()
+
+    def _progress(self, message: str, fraction: float) -> None:
+        self.message, self.fraction = message, fraction
+
+    def _run(self) -> None:
+        try:
+            ingest_huggingface_dataset(self.db_url, progress=self._progress)
+            self.done = True
+        except Exception as exc:
+            logger.exception("First-run ingest failed")
+            self.error = exc
 
-_ensure_data()
+@st.cache_resource(show_spinner=False)
+def get_ingest_job() -> IngestJob:
+    return IngestJob(_db_url())
+
+def _data_ready() -> bool:
+    """
+    True once the database holds restaurants. Checked at most until it first
+    succeeds in a session; an empty database starts the background ingest.
+    """
+    if st.session_state.get("data_ready"):
+        return True
+    job = get_ingest_job()
+    if not job.running:
+        try:
+            ready = job.done or get_data_version() != NO_DATA_VERSION
+        except Exception:
+            ready = False
+        if ready:
+            st.session_state["data_ready"] = True
+            return True
+    job.start()
+    return False
+
+@st.fragment(run_every=1.0)
+def _ingest_progress():
+    """Polls the ingest job without rerunning (or blocking) the rest of the page."""
+    job = get_ingest_job()
+    if job.error is not None:
+        st.error(f"❌ Loading the Zomato dataset failed: {job.error}")
+        if st.button("Retry"):
+            job.start(retry=True)
+        return
+    if job.done:
+        get_data_version.clear()
+        st.rerun()
+    st.progress(job.fraction, text=f"⏳ First run: {job.message}…")
 
 # ─────────────────────────────────────────────────────────────────────────────
 # NAV
@@ -269,6 +385,12 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+if not _data_ready():
+    _ingest_progress()
+    st.stop()
+
+data_version = get_data_version()
+
 # ─────────────────────────────────────────────────────────────────────────────
 # FILTER CARD  (card styled via CSS on the st.container)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -281,7 +403,7 @@ with st.container(border=True):
     # Row 1
     c1, c2 = st.columns([3, 2])
     with c1:
-        loc_opts = [""] + get_locations()
+        loc_opts = [""] + get_locations(data_version)
         location = st.selectbox(
             "📍 Location",
             options=loc_opts,
@@ -304,7 +426,7 @@ with st.container(border=True):
             "💰 Max Price (₹)", min_value=0, value=None, step=100, placeholder="e.g. 1500",
         )
     with c5:
-        cuisines = st.multiselect("🍽️ Cuisines", options=get_cuisines(), placeholder="e.g. Italian")
+        cuisines = st.multiselect("🍽️ Cuisines", options=get_cuisines(data_version), placeholder="e.g. Italian")
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CTA — pill button, perfectly centred, single line
@@ -329,7 +451,7 @@ if go:
     )
     with st.spinner("🤖 AI is ranking the best restaurants for you…"):
         try:
-            result = run_pipeline(engine=get_engine(), preferences=prefs)
+            result = get_recommendations(prefs, data_version)
         except RuntimeError as e:
             st.error(f"⚠️ Configuration error: {e}"); st.stop()
         except Exception as e:
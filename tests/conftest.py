@@ -9,6 +9,9 @@ PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
 SRC_PATH = PROJECT_ROOT / "src"
 if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
+# The load-testing tools (loadtest/) live at the project root.
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
 
 # Ensure pytest and tempfile can use a writable temp directory.
 # Some environments deny access to the default user temp path.
@@ -19,3 +22,9 @@ os.environ["TEMP"] = str(WRITABLE_TMP)
 os.environ["TMP"] = str(WRITABLE_TMP)
 tempfile.tempdir = str(WRITABLE_TMP)
 
+
+# The API tests share one in-memory SQLite connection (StaticPool) between the
+# request thread and any background thread, so write analytics events inline.
+os.environ.setdefault("ZOMATO_EVENT_WRITER", "sync")
+# Tests call refresh_rollups explicitly instead of relying on the timer thread.
+os.environ.setdefault("ZOMATO_ROLLUP_INTERVAL_SECONDS", "0")
@@ -3,7 +3,8 @@ from typing import Any, Dict, List
 from sqlalchemy import create_engine, text
 from sqlalchemy.pool import StaticPool
 
-from zomato_ai.phase1.ingestion import create_schema, ingest_records
+import zomato_ai.phase1.ingestion as ingestion_mod
+from zomato_ai.phase1.ingestion import create_schema, ingest_huggingface_dataset, ingest_records
 
 
 def _make_in_memory_engine():
@@ -132,3 +133,19 @@ def test_ingest_records_cleans_price_rating_cuisines_and_deduplicates():
     # Rating "-" should become NULL/None.
     assert other[4] is None
 
+
+def test_ingest_huggingface_dataset_reports_progress(monkeypatch, tmp_path):
+    import datasets
+
+    rows = [{"name": f"Cafe {i}", "location": "BTM", "rate": "4.0/5"} for i in range(5)]
+    monkeypatch.setattr(datasets, "load_dataset", lambda name, split: rows)
+    monkeypatch.setattr(ingestion_mod, "PROGRESS_EVERY_ROWS", 2)
+    updates: List[Any] = []
+
+    count = ingest_huggingface_dataset(f"sqlite:///{tmp_path / 'r.db'}", progress=lambda m, f: updates.append((m, f)))
+
+    assert count == 5
+    fractions = [f for _, f in updates]
+    assert fractions == sorted(fractions) and fractions[0] == 0.0 and fractions[-1] == 1.0
+    assert any("4 of 5" in m for m, _ in updates)
+    assert (tmp_path / "r.semantic").is_dir()
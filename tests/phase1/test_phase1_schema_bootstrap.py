@@ -0,0 +1,50 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.data.migrations import LATEST_VERSION, bootstrap_schema
+from zomato_ai.phase1.ingestion import create_schema
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def test_bootstrap_creates_all_tables_indexes_and_records_version():
+    engine = _make_in_memory_engine()
+
+    assert bootstrap_schema(engine) == LATEST_VERSION
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    assert {"restaurants", "recommendation_events", "schema_version"} <= tables
+    index_names = {ix["name"] for ix in inspector.get_indexes("restaurants")}
+    assert "ix_restaurants_location" in index_names
+
+    with engine.connect() as conn:
+        versions = conn.execute(text("SELECT version FROM schema_version ORDER BY version")).scalars().all()
+    assert versions == list(range(1, LATEST_VERSION + 1))
+
+    # Second call is a no-op: no new version rows.
+    bootstrap_schema(engine)
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM schema_version")).scalar_one()
+    assert count == LATEST_VERSION
+
+
+def test_bootstrap_upgrades_database_created_before_versioning():
+    engine = _make_in_memory_engine()
+    create_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO restaurants (name, location) VALUES ('Old Place', 'Old Town')"))
+
+    bootstrap_schema(engine)
+
+    inspector = inspect(engine)
+    assert "recommendation_events" in inspector.get_table_names()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM restaurants")).scalar_one() == 1
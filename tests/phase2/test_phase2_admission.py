@@ -0,0 +1,212 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import zomato_ai.phase2.admission as admission_mod
+import zomato_ai.phase2.api as api_mod
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.admission import (
+    ADMISSION_SHED,
+    AdmissionController,
+    AdmissionLimits,
+    AdmissionRejected,
+    admission_limits_from_env,
+    overload_policy_from_env,
+)
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase5.models import PipelineResponse
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def test_controller_queues_hands_off_and_sheds():
+    async def run():
+        controller = AdmissionController("unit", AdmissionLimits(max_in_flight=1, max_queue=1, queue_timeout=5.0))
+        await controller.acquire()
+
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert (controller.in_flight, controller.queued) == (1, 1)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire()
+        assert exc.value.reason == "queue_full"
+
+        # Releasing hands the slot to the waiter rather than freeing it.
+        controller.release()
+        await waiter
+        assert (controller.in_flight, controller.queued) == (1, 0)
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_controller_sheds_after_queue_timeout_and_on_cancel():
+    async def run():
+        controller = AdmissionController("unit", AdmissionLimits(max_in_flight=1, max_queue=4, queue_timeout=0.02))
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire()
+        assert exc.value.reason == "queue_timeout"
+        assert exc.value.retry_after >= 1
+
+        cancelled = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert controller.queued == 0
+
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_slot_handed_over_at_the_deadline_is_not_leaked(monkeypatch):
+    async def release_at_deadline(controller):
+        await controller.acquire()
+        loop = asyncio.get_running_loop()
+        loop.call_at(loop.time() + controller.limits.queue_timeout, controller.release)
+        try:
+            await controller.acquire()
+        except AdmissionRejected:
+            pass
+        else:
+            controller.release()
+        await asyncio.sleep(2 * controller.limits.queue_timeout)
+        return controller.in_flight
+
+    async def run():
+        # Timing race as it happens on Python 3.12+ (the Docker image).
+        for _ in range(20):
+            controller = AdmissionController("unit", AdmissionLimits(max_in_flight=1, max_queue=1, queue_timeout=0.005))
+            assert await release_at_deadline(controller) == 0
+
+        # The same outcome forced on any version: wait_for reports a timeout
+        # although release() has already handed the waiter its slot.
+        async def wait_for_times_out_late(future, timeout):
+            await future
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(admission_mod.asyncio, "wait_for", wait_for_times_out_late)
+        controller = AdmissionController("unit", AdmissionLimits(max_in_flight=1, max_queue=1, queue_timeout=5.0))
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        controller.release()
+        await waiter  # Admitted, not rejected.
+        assert controller.in_flight == 1
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_limits_and_policy_from_env(monkeypatch):
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_MAX_IN_FLIGHT", "3")
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_QUEUE_TIMEOUT_MS", "250")
+    assert admission_limits_from_env("pipeline") == AdmissionLimits(max_in_flight=3, max_queue=16, queue_timeout=0.25)
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_OVERLOAD", "degrade")
+    assert overload_policy_from_env("pipeline") == "degrade"
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_OVERLOAD", "drop")
+    with pytest.raises(RuntimeError):
+        overload_policy_from_env("pipeline")
+
+
+def _overloaded_pipeline_responses(monkeypatch, overload):
+    """Two concurrent pipeline requests against a limit of one and no queue."""
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_MAX_IN_FLIGHT", "1")
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_MAX_QUEUE", "0")
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_OVERLOAD", overload)
+    engine = _make_in_memory_engine()
+    ingest_records(engine, [{"name": "Cafe A", "location": "BTM", "rate": "4.2/5"}])
+    app = create_app(engine=engine)
+
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_pipeline(**_kwargs):
+        started.set()
+        finish.wait(5)
+        return PipelineResponse(summary="slow", recommendations=[])
+
+    monkeypatch.setattr(api_mod, "run_pipeline", slow_pipeline)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/recommendations/pipeline", json={"location": "BTM"}))
+            while not started.is_set():
+                await asyncio.sleep(0.005)
+            second = await client.post("/recommendations/pipeline", json={"location": "BTM"})
+            finish.set()
+            return await first, second
+
+    return asyncio.run(run())
+
+
+def test_pipeline_rejects_with_retry_after_when_overloaded(monkeypatch):
+    before = ADMISSION_SHED.value(endpoint="pipeline", reason="queue_full", action="rejected")
+    first, second = _overloaded_pipeline_responses(monkeypatch, "reject")
+    assert first.status_code == 200 and first.json()["summary"] == "slow"
+    assert second.status_code == 503
+    assert int(second.headers["Retry-After"]) >= 1
+    assert ADMISSION_SHED.value(endpoint="pipeline", reason="queue_full", action="rejected") == before + 1
+
+
+def test_pipeline_degrades_to_heuristic_when_overloaded(monkeypatch):
+    first, second = _overloaded_pipeline_responses(monkeypatch, "degrade")
+    assert first.status_code == 200 and first.json()["summary"] == "slow"
+    assert second.status_code == 200
+    assert [r["name"] for r in second.json()["recommendations"]] == ["Cafe A"]
+
+
+def test_degraded_path_is_bounded_too(monkeypatch):
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_MAX_IN_FLIGHT", "1")
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_MAX_QUEUE", "0")
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_OVERLOAD", "degrade")
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_DEGRADED_MAX_IN_FLIGHT", "1")
+    monkeypatch.setenv("ZOMATO_ADMISSION_PIPELINE_DEGRADED_MAX_QUEUE", "0")
+    app = create_app(engine=_make_in_memory_engine())
+
+    running, finish = threading.Semaphore(0), threading.Event()
+
+    def slow(summary):
+        def run(**_kwargs):
+            running.release()
+            finish.wait(5)
+            return PipelineResponse(summary=summary, recommendations=[])
+
+        return run
+
+    monkeypatch.setattr(api_mod, "run_pipeline", slow("full"))
+    monkeypatch.setattr(api_mod, "run_degraded_pipeline", slow("degraded"))
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            tasks = []
+            for _ in range(2):
+                tasks.append(asyncio.create_task(client.post("/recommendations/pipeline", json={})))
+                while not running.acquire(blocking=False):
+                    await asyncio.sleep(0.005)
+            third = await client.post("/recommendations/pipeline", json={})
+            finish.set()
+            return [await t for t in tasks], third
+
+    (first, second), third = asyncio.run(run())
+    assert first.json()["summary"] == "full"
+    assert second.json()["summary"] == "degraded"
+    assert third.status_code == 503 and "Retry-After" in third.headers
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from zomato_ai.data.engines import async_url_for, create_async_read_engine, create_engine_pair
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2 import repository
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase2.async_repository import (
+    fetch_all_restaurants_async,
+    fetch_restaurant_store_async,
+    fetch_unique_cuisines_async,
+    fetch_unique_locations_async,
+)
+
+RECORDS = [
+    {"name": "A", "location": " BTM ", "cuisines": "North Indian, Chinese", "rate": "4.1/5"},
+    {"name": "B", "location": "HSR", "cuisines": "Cafe", "approx_cost(for two people)": "600"},
+    {"name": "C", "location": "", "cuisines": None},
+]
+
+# A statement that keeps SQLite busy for a while before returning one location.
+SLOW_LOCATIONS = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 500000) "
+    "SELECT 'Slow Town' AS location FROM c WHERE x = 500000"
+)
+
+
+def test_async_urls():
+    assert str(async_url_for("sqlite:///./x.db")) == "sqlite+aiosqlite:///./x.db"
+    assert str(async_url_for("postgresql://u@h/db")) == "postgresql+asyncpg://u@h/db"
+    assert async_url_for("sqlite:///:memory:") is None
+    assert async_url_for("mysql://h/db") is None
+
+
+def test_async_functions_match_sync(tmp_path):
+    pytest.importorskip("aiosqlite")
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+    engine = create_engine_pair(url).write
+    ingest_records(engine, RECORDS)
+
+    async def run():
+        async_engine = create_async_read_engine(url)
+        try:
+            return (
+                await fetch_all_restaurants_async(async_engine),
+                await fetch_restaurant_store_async(async_engine),
+                await fetch_unique_locations_async(async_engine),
+                await fetch_unique_cuisines_async(async_engine),
+            )
+        finally:
+            await async_engine.dispose()
+
+    rows, store, locations, cuisines = asyncio.run(run())
+    assert [dict(r) for r in rows] == [dict(r) for r in repository.fetch_all_restaurants(engine)]
+    assert [store.row(i) for i in range(len(store))] == [dict(r) for r in rows]
+    assert locations == repository.fetch_unique_locations(engine) == ["BTM", "HSR"]
+    assert cuisines == repository.fetch_unique_cuisines(engine)
+
+
+def test_slow_queries_do_not_block_event_loop(tmp_path, monkeypatch):
+    app = create_app(db_url=f"sqlite:///{tmp_path / 'slow.db'}")
+    monkeypatch.setattr(repository, "locations_query", lambda: SLOW_LOCATIONS)
+
+    async def run():
+        lags = []
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - started - 0.005)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            probe_task = asyncio.create_task(probe())
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(client.get("/locations") for _ in range(8)))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await probe_task
+        return responses, lags, elapsed
+
+    responses, lags, elapsed = asyncio.run(run())
+    assert all(r.status_code == 200 and r.json() == ["Slow Town"] for r in responses)
+    # The probe kept ticking while the queries ran.
+    assert len(lags) > 10
+    assert max(lags) < min(0.25, elapsed / 2)
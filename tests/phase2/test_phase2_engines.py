@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from zomato_ai.data.engines import (
+    SQLiteTuning,
+    create_engine_pair,
+    read_engine_for,
+    sqlite_tuning_from_env,
+)
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase2.repository import fetch_unique_locations
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_engine_pair_uses_wal_and_read_only_pool(tmp_path):
+    tuning = SQLiteTuning(mmap_bytes=1 << 20, cache_kib=2048, read_pool_size=3)
+    pair = create_engine_pair(f"sqlite:///{tmp_path / 'r.db'}", tuning=tuning)
+    ingest_records(pair.write, [{"name": "A", "location": "BTM", "rate": "4.0/5"}])
+
+    assert read_engine_for(pair.write) is pair.read
+    assert _pragma(pair.write, "journal_mode") == "wal"
+    assert _pragma(pair.read, "journal_mode") == "wal"
+    assert _pragma(pair.read, "query_only") == 1
+    assert _pragma(pair.read, "mmap_size") == 1 << 20
+    assert _pragma(pair.read, "cache_size") == -2048
+    assert pair.read.pool.size() == 3
+
+    with pytest.raises(OperationalError):
+        with pair.read.begin() as conn:
+            conn.execute(text("DELETE FROM restaurants"))
+
+    # Reads see rows committed through the write engine.
+    ingest_records(pair.write, [{"name": "B", "location": "HSR", "rate": "4.2/5"}])
+    assert fetch_unique_locations(pair.write) == ["BTM", "HSR"]
+
+
+def test_in_memory_urls_share_one_engine():
+    pair = create_engine_pair("sqlite:///:memory:")
+    assert pair.read is pair.write
+    assert read_engine_for(pair.write) is pair.write
+
+
+def test_create_app_serves_reads_from_read_only_engine(tmp_path):
+    app = create_app(db_url=f"sqlite:///{tmp_path / 'api.db'}")
+    with TestClient(app) as client:
+        assert client.get("/locations").json() == []
+        resp = client.post("/recommendations", json={"location": "BTM"})
+        assert resp.status_code == 200
+
+
+def test_invalid_tuning_env_raises(monkeypatch):
+    monkeypatch.setenv("ZOMATO_DB_READ_POOL_SIZE", "zero")
+    with pytest.raises(RuntimeError):
+        sqlite_tuning_from_env()
+
+
+def test_default_page_cache_stays_small_across_the_pool():
+    tuning = sqlite_tuning_from_env()
+    # cache_size is per connection: the read pool plus the writer.
+    assert tuning.cache_kib * (tuning.read_pool_size + 1) <= 256 * 1024
@@ -0,0 +1,98 @@
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import zomato_ai.phase2.api as api_mod
+from zomato_ai.phase1.ingestion import create_schema, ingest_records
+from zomato_ai.phase2.filtering import _filter_rows, compute_score
+from zomato_ai.phase2.models import UserPreference
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _seed_sample_data(engine) -> None:
+    create_schema(engine)
+    sample_records: List[Dict[str, Any]] = [
+        {
+            "name": "Café Mocha \"Original\"",
+            "location": "City Center",
+            "cuisines": "Cafe, Continental",
+            "approx_cost(for two people)": "1,250",
+            "rate": "4.3/5",
+        },
+        {
+            "name": "Budget Bites",
+            "location": "City Center",
+            "cuisines": "Italian, Pizza",
+            "approx_cost(for two people)": "500",
+            "rate": "3.8/5",
+        },
+        {
+            "name": "No Rating Yet",
+            "location": "City Center",
+            "cuisines": "Italian",
+            "approx_cost(for two people)": None,
+            "rate": "NEW",
+        },
+    ]
+    ingest_records(engine, sample_records)
+
+
+REQUESTS = [
+    ("/recommendations", {"location": "City Center", "max_price": 1000}),
+    ("/recommendations/pipeline", {"location": "City Center", "limit": 2}),
+    ("/recommendations/pipeline?mode=fast", {"location": "City Center", "preferred_cuisines": ["Italian"]}),
+    ("/recommendations/batch", {"items": [{"location": "City Center", "limit": 2}, {"min_rating": 9}]}),
+    ("/recommendations/pipeline?mode=fast", {"location": "Nowhere"}),
+]
+
+
+def test_fast_json_matches_response_model_serialization(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "dummy-key")
+
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    class FailingGroqClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            raise RuntimeError("offline")
+
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", FailingGroqClient)
+
+    engine = _make_in_memory_engine()
+    _seed_sample_data(engine)
+    fast = TestClient(api_mod.create_app(engine=engine))
+    # The previous path: handlers return models and FastAPI validates and
+    # serializes them through `response_model`.
+    monkeypatch.setattr(api_mod, "_json_response", lambda model: model)
+    standard = TestClient(api_mod.create_app(engine=engine))
+
+    for path, payload in REQUESTS:
+        fast_resp = fast.post(path, json=payload)
+        standard_resp = standard.post(path, json=payload)
+        assert fast_resp.status_code == standard_resp.status_code == 200
+        assert fast_resp.headers["content-type"] == standard_resp.headers["content-type"]
+        assert fast_resp.content == standard_resp.content, path
+
+    assert fast.get("/analytics/summary").content == standard.get("/analytics/summary").content
+
+
+def test_filter_builds_same_ranking_as_full_sort():
+    rows = [
+        {"id": i, "name": f"R{i}", "location": "X", "cuisines": "Cafe", "price_range": 300, "rating": rating}
+        for i, rating in enumerate([4.0, 4.5, 4.0, 3.0, 4.5, 4.0, None])
+    ]
+    prefs = UserPreference(limit=4)
+    expected = sorted(rows, key=lambda r: compute_score(r["rating"], r["price_range"], r["id"], prefs), reverse=True)[:4]
+    assert [r.id for r in _filter_rows(rows, prefs)] == [r["id"] for r in expected]
@@ -0,0 +1,51 @@
+"""
+Startup-time budget for the API module, measured with `python -X importtime`.
+
+Serving workers only need FastAPI and SQLAlchemy at import; ingestion
+(`datasets` and its pyarrow/pandas stack) and the Groq SDK load lazily.
+Override the budget with ZOMATO_IMPORT_BUDGET_MS on slow machines.
+"""
+
+import os
+import pathlib
+import subprocess
+import sys
+from typing import Dict
+
+SRC_PATH = pathlib.Path(__file__).resolve().parents[2] / "src"
+DEFAULT_IMPORT_BUDGET_MS = 1200
+FORBIDDEN_AT_IMPORT = ("datasets", "pyarrow", "pandas", "groq")
+
+
+def _import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds, keyed by module name."""
+    env = dict(os.environ, PYTHONPATH=str(SRC_PATH))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_api_import_skips_heavy_dependencies_and_app_creation():
+    times = _import_times(
+        "import zomato_ai.phase2.api as api; assert 'app' not in vars(api), 'app built at import'"
+    )
+    heavy = sorted(m for m in times if m.split(".")[0] in FORBIDDEN_AT_IMPORT)
+    assert not heavy, f"imported eagerly: {heavy[:10]}"
+
+
+def test_api_import_time_within_budget():
+    budget_ms = int(os.getenv("ZOMATO_IMPORT_BUDGET_MS", DEFAULT_IMPORT_BUDGET_MS))
+    # Best of three runs to keep cold-cache noise out of the check.
+    elapsed_ms = min(_import_times("import zomato_ai.phase2.api")["zomato_ai.phase2.api"] for _ in range(3)) / 1000
+    assert elapsed_ms <= budget_ms, f"zomato_ai.phase2.api imported in {elapsed_ms:.0f}ms (budget {budget_ms}ms)"
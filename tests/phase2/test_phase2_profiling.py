@@ -0,0 +1,161 @@
+import cProfile
+import json
+import pstats
+import threading
+import tracemalloc
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.api import create_app
+import zomato_ai.profiling as profiling_mod
+from zomato_ai.profiling import SPEEDSCOPE_SCHEMA, SamplingProfiler
+
+TOKEN = "s3cret"
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _client(monkeypatch, tmp_path, *, enabled=True):
+    if enabled:
+        monkeypatch.setenv("ZOMATO_PROFILING_TOKEN", TOKEN)
+        monkeypatch.setenv("ZOMATO_PROFILE_DIR", str(tmp_path))
+    else:
+        monkeypatch.delenv("ZOMATO_PROFILING_TOKEN", raising=False)
+    engine = _make_in_memory_engine()
+    ingest_records(engine, [{"name": "Cafe A", "location": "BTM", "rate": "4.2/5"}])
+    return TestClient(create_app(engine=engine))
+
+
+def test_profiling_is_off_without_token(monkeypatch, tmp_path):
+    client = _client(monkeypatch, tmp_path, enabled=False)
+    resp = client.post("/recommendations", json={"location": "BTM"}, headers={"X-Profile": "1"})
+    assert resp.status_code == 200
+    assert "x-profile-id" not in resp.headers
+    assert client.post("/debug/profile?seconds=0.1").status_code == 404
+
+
+def test_x_profile_header_writes_merged_pstats(monkeypatch, tmp_path):
+    client = _client(monkeypatch, tmp_path)
+
+    wrong = client.post(
+        "/recommendations", json={"location": "BTM"}, headers={"X-Profile": "1", "X-Profile-Token": "nope"}
+    )
+    assert "x-profile-id" not in wrong.headers
+
+    resp = client.post(
+        "/recommendations", json={"location": "BTM"}, headers={"X-Profile": "1", "X-Profile-Token": TOKEN}
+    )
+    assert resp.status_code == 200
+    stats = pstats.Stats(str(tmp_path / resp.headers["x-profile-id"]))
+    functions = {name for _, _, name in stats.stats}
+    # The handler's own work runs on a worker thread and is merged in.
+    assert "filter_restaurants" in functions
+    assert "dedup_store_by_name_location" in functions
+
+    download = client.get(f"/debug/profiles/{resp.headers['x-profile-id']}", headers={"X-Profile-Token": TOKEN})
+    assert download.content == (tmp_path / resp.headers["x-profile-id"]).read_bytes()
+    assert client.get("/debug/profiles/..%2Fsecrets", headers={"X-Profile-Token": TOKEN}).status_code == 404
+
+
+class _OneActiveProfile(cProfile.Profile):
+    """cProfile as on Python 3.12+ (the Docker image): one enabled profiler per process."""
+
+    active = None
+
+    def enable(self, *args, **kwargs):
+        if _OneActiveProfile.active not in (None, self):
+            raise ValueError("Another profiling tool is already active")
+        _OneActiveProfile.active = self
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        if _OneActiveProfile.active is self:
+            _OneActiveProfile.active = None
+
+
+def test_x_profile_uses_one_profiler_when_it_sees_all_threads(monkeypatch, tmp_path):
+    monkeypatch.setattr(cProfile, "Profile", _OneActiveProfile)
+    monkeypatch.setattr(profiling_mod, "PROFILER_SEES_ALL_THREADS", True)
+    client = _client(monkeypatch, tmp_path)
+
+    resp = client.post(
+        "/recommendations", json={"location": "BTM"}, headers={"X-Profile": "1", "X-Profile-Token": TOKEN}
+    )
+    assert resp.status_code == 200
+    pstats.Stats(str(tmp_path / resp.headers["x-profile-id"]))
+    assert _OneActiveProfile.active is None
+
+
+def test_x_profile_while_another_profile_runs_gets_409(monkeypatch, tmp_path):
+    client = _client(monkeypatch, tmp_path)
+    headers = {"X-Profile": "1", "X-Profile-Token": TOKEN}
+    with profiling_mod._cprofile_lock:
+        busy = client.post("/recommendations", json={"location": "BTM"}, headers=headers)
+    assert busy.status_code == 409
+    assert "x-profile-id" not in busy.headers
+    # Sampling does not use cProfile and is never refused.
+    with profiling_mod._cprofile_lock:
+        sampled = client.post("/recommendations", json={"location": "BTM"}, headers={**headers, "X-Profile": "sample"})
+    assert sampled.status_code == 200
+    assert client.post("/recommendations", json={"location": "BTM"}, headers=headers).status_code == 200
+
+
+def test_x_profile_sample_writes_speedscope(monkeypatch, tmp_path):
+    client = _client(monkeypatch, tmp_path)
+    resp = client.post(
+        "/recommendations", json={"location": "BTM"}, headers={"X-Profile": "sample", "X-Profile-Token": TOKEN}
+    )
+    profile = json.loads((tmp_path / resp.headers["x-profile-id"]).read_text())
+    assert profile["$schema"] == SPEEDSCOPE_SCHEMA
+
+
+def test_worker_profile_and_tracemalloc_endpoints(monkeypatch, tmp_path):
+    client = _client(monkeypatch, tmp_path)
+    assert client.post("/debug/profile?seconds=0.1").status_code == 403
+
+    resp = client.post("/debug/profile?seconds=0.2&interval_ms=2", headers={"X-Profile-Token": TOKEN})
+    assert resp.status_code == 200
+    profile = resp.json()
+    assert profile["profiles"] and all(p["type"] == "sampled" for p in profile["profiles"])
+    frame_count = len(profile["shared"]["frames"])
+    for p in profile["profiles"]:
+        assert len(p["samples"]) == len(p["weights"])
+        assert all(0 <= index < frame_count for stack in p["samples"] for index in stack)
+
+    resp = client.post("/debug/tracemalloc?seconds=0.05&top=5", headers={"X-Profile-Token": TOKEN})
+    body = resp.json()
+    assert len(body["top"]) <= 5
+    for name in body["snapshots"]:
+        tracemalloc.Snapshot.load(str(tmp_path / name))
+
+
+def test_sampling_profiler_sees_busy_thread():
+    stop = threading.Event()
+
+    def spin_in_named_function():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=spin_in_named_function)
+    worker.start()
+    try:
+        with SamplingProfiler(interval=0.002) as sampler:
+            stop.wait(0.1)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.sample_count > 0
+    names = {frame["name"] for frame in sampler.to_speedscope()["shared"]["frames"]}
+    assert any(name.endswith("spin_in_named_function") for name in names)
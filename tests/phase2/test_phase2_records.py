@@ -0,0 +1,99 @@
+import random
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine
+
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.filtering import (
+    _filter_store,
+    _matches_cuisines,
+    _matches_location,
+    _matches_price,
+    _matches_rating,
+    compute_score,
+)
+from zomato_ai.phase2.models import UserPreference
+from zomato_ai.phase2.records import RestaurantStore
+from zomato_ai.phase2.repository import fetch_all_restaurants, fetch_restaurant_store
+from zomato_ai.phase4.dedup import dedup_rows_by_name_location, dedup_store_by_name_location
+from zomato_ai.phase4.popularity import get_popularity_priors
+
+
+LOCATIONS = ["BTM", "Koramangala 5th Block", "Indiranagar", "btm layout", "", None]
+CUISINES = ["North Indian, Chinese", "Cafe", "Italian, Pizza, Cafe", " chinese ,Momos", "", None]
+
+
+def _random_rows(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i + 1,
+            # Some repeated names so dedup has work to do.
+            "name": rng.choice(["Dup Diner", "dup diner ", f"Place {i}", f"Place {i}", ""]),
+            "location": rng.choice(LOCATIONS),
+            "cuisines": rng.choice(CUISINES),
+            "price_range": rng.choice([None, 0, 300, 800, 1500]),
+            "rating": rng.choice([None, 0.0, 3.2, 3.9, 4.1, 4.5]),
+        }
+        for i in range(n)
+    ]
+
+
+def _reference_filter(rows, prefs):
+    priors = get_popularity_priors()
+    matched = [
+        (compute_score(row["rating"], row["price_range"], row["id"], prefs, priors), row)
+        for row in rows
+        if _matches_location(row["location"], prefs.location)
+        and _matches_price(row["price_range"], prefs.min_price, prefs.max_price)
+        and _matches_rating(row["rating"], prefs.min_rating)
+        and _matches_cuisines(row["cuisines"], prefs.preferred_cuisines)
+    ]
+    matched.sort(key=lambda item: item[0], reverse=True)
+    return [(row["id"], score) for score, row in matched[: prefs.limit]]
+
+
+def test_store_round_trips_rows_and_interns_strings():
+    rows = _random_rows(200)
+    store = RestaurantStore.from_rows(rows)
+    assert len(store) == len(rows)
+    assert [store.row(i) for i in range(len(store))] == rows
+    assert len(store.locations) <= len(LOCATIONS)
+    assert len(store.cuisines) <= len(CUISINES)
+
+
+def test_store_filter_matches_row_by_row_reference():
+    rows = _random_rows(500)
+    store = RestaurantStore.from_rows(rows)
+    preference_sets = [
+        UserPreference(),
+        UserPreference(location="btm", limit=50),
+        UserPreference(min_rating=4.1, limit=50),
+        UserPreference(min_price=300, max_price=800, limit=50),
+        UserPreference(max_price=500, preferred_cuisines=["Chinese", "cafe"], limit=50),
+        UserPreference(location="Koramangala", min_rating=0.0, min_price=0, limit=7),
+    ]
+    for prefs in preference_sets:
+        got = [(r.id, r.score) for r in _filter_store(store, prefs)]
+        assert got == _reference_filter(rows, prefs), prefs
+
+
+def test_dedup_store_matches_row_dedup():
+    rows = _random_rows(300)
+    expected = [row["id"] for row in dedup_rows_by_name_location(rows)]
+    deduped = dedup_store_by_name_location(RestaurantStore.from_rows(rows))
+    assert list(deduped.ids) == expected
+    assert [deduped.row(i) for i in range(len(deduped))] == dedup_rows_by_name_location(rows)
+
+
+def test_fetch_restaurant_store_matches_fetch_all(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}", future=True)
+    ingest_records(
+        engine,
+        [
+            {"name": "A", "location": "BTM", "cuisines": "Cafe", "approx_cost(for two people)": "1,200", "rate": "4.1/5"},
+            {"name": "B", "location": "BTM", "cuisines": "Cafe", "approx_cost(for two people)": None, "rate": "NEW"},
+        ],
+    )
+    store = fetch_restaurant_store(engine)
+    assert [store.row(i) for i in range(len(store))] == [dict(r) for r in fetch_all_restaurants(engine)]
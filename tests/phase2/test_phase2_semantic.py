@@ -0,0 +1,156 @@
+import random
+import threading
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase2.filtering import filter_restaurants
+from zomato_ai.phase2.models import UserPreference
+from zomato_ai.phase2.semantic import (
+    HashedTfidfEncoder,
+    SemanticIndex,
+    semantic_index_dir_for,
+    semantic_index_for,
+)
+from zomato_ai.phase5.precompute import canonical_preferences
+
+RECORDS = [
+    {"name": "Skyline Rooftop Grill", "location": "Indiranagar", "cuisines": "Continental, BBQ", "rate": "4.1/5"},
+    {"name": "Quiet Corner Cafe", "location": "Koramangala", "cuisines": "Cafe, Desserts", "rate": "4.4/5"},
+    {"name": "Rooftop Pizzeria", "location": "Koramangala", "cuisines": "Italian, Pizza", "rate": "3.9/5"},
+    {"name": "Biryani House", "location": "BTM", "cuisines": "Biryani, North Indian", "rate": "4.6/5"},
+]
+
+WORDS = ["spice", "garden", "grill", "cafe", "bistro", "tandoor", "wok", "bay", "table", "house"]
+CUISINES = ["North Indian", "Chinese", "Biryani", "Cafe", "Desserts", "Italian", "Pizza", "Thai", "Momos"]
+LOCATIONS = ["BTM", "HSR", "Indiranagar", "Koramangala", "Whitefield", "Jayanagar"]
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _random_documents(n, seed=3):
+    rng = random.Random(seed)
+    return [
+        (
+            f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+            ", ".join(rng.sample(CUISINES, rng.randint(1, 3))),
+            rng.choice(LOCATIONS),
+        )
+        for _ in range(n)
+    ]
+
+
+def test_encoder_is_deterministic_and_matches_documents():
+    docs = _random_documents(50)
+    matrix = HashedTfidfEncoder(dim=64).fit_transform(docs)
+    again = HashedTfidfEncoder(dim=64)
+    assert np.array_equal(again.fit_transform(docs), matrix)
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0, atol=1e-5)
+    # A document encoded as one query string lands on its own row.
+    assert np.allclose(again.encode(" ".join(docs[7])), matrix[7], atol=1e-6)
+
+
+def test_ivf_search_agrees_with_exact_search():
+    docs = _random_documents(3000)
+    index = SemanticIndex.build(list(range(1, 3001)), docs, nlist=30)
+    assert sorted(index.ids.tolist()) == list(range(1, 3001))
+    for query in ("spicy tandoor biryani", "quiet cafe desserts", "thai wok"):
+        ids, sims = index.search(query, k=50, nprobe=8)
+        exact = index.similarities(query, list(range(1, 3001)))
+        best = np.sort(exact)[::-1][:50]
+        assert np.all(np.diff(sims) <= 0)
+        # Every returned similarity is exact, and IVF finds (nearly) the true top 50.
+        assert np.allclose(sims, exact[ids - 1], atol=1e-6)
+        assert np.mean(sims[:10]) >= 0.95 * np.mean(best[:10])
+
+
+def test_saved_index_is_memory_mapped(tmp_path):
+    index = SemanticIndex.build([10, 20, 30], [r[:1] for r in _random_documents(3)], data_version="3:30")
+    for _ in range(3):
+        index.save(tmp_path / "idx")  # Replacing an existing index is fine.
+    # The current save and the one before it are kept.
+    assert len(list((tmp_path / "idx").glob("v*"))) == 2
+    loaded = SemanticIndex.load(tmp_path / "idx")
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.data_version == "3:30"
+    assert np.array_equal(loaded.similarities("garden", [30, 10, 99]), index.similarities("garden", [30, 10, 99]))
+
+
+def test_concurrent_saves_leave_a_loadable_index(tmp_path):
+    index = SemanticIndex.build([10, 20, 30], [r[:1] for r in _random_documents(3)], data_version="3")
+    errors = []
+
+    def save_and_load():
+        try:
+            for _ in range(5):
+                index.save(tmp_path / "idx")
+                assert len(SemanticIndex.load(tmp_path / "idx")) == 3
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=save_and_load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert SemanticIndex.load(tmp_path / "idx").data_version == "3"
+
+
+def test_query_combines_with_filters():
+    engine = _make_in_memory_engine()
+    ingest_records(engine, RECORDS)
+
+    results = filter_restaurants(engine, UserPreference(query="rooftop"))
+    assert {r.name for r in results} == {"Skyline Rooftop Grill", "Rooftop Pizzeria"}
+
+    results = filter_restaurants(engine, UserPreference(query="rooftop", location="Koramangala"))
+    assert [r.name for r in results] == ["Rooftop Pizzeria"]
+
+    # Relevance outweighs the small rating gap.
+    results = filter_restaurants(engine, UserPreference(query="quiet desserts cafe"))
+    assert results[0].name == "Quiet Corner Cafe"
+
+    assert filter_restaurants(engine, UserPreference(query="xyzzy")) == []
+
+
+def test_index_follows_data_changes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}", future=True)
+    ingest_records(engine, RECORDS[:2])
+    assert semantic_index_dir_for(engine) == tmp_path / "r.semantic"
+
+    first = semantic_index_for(engine)
+    assert len(first) == 2 and (tmp_path / "r.semantic" / "current").exists()
+    assert semantic_index_for(engine) is first
+
+    # The old index keeps answering while the new one is built in the background.
+    ingest_records(engine, RECORDS[2:])
+    assert semantic_index_for(engine) is first
+    deadline = time.monotonic() + 10
+    while semantic_index_for(engine) is first and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(semantic_index_for(engine)) == 4
+    assert len(SemanticIndex.load(tmp_path / "r.semantic")) == 4
+
+
+def test_api_accepts_query_and_keys_precompute_by_it():
+    engine = _make_in_memory_engine()
+    ingest_records(engine, RECORDS)
+    client = TestClient(create_app(engine=engine))
+    resp = client.post("/recommendations", json={"query": "biryani"})
+    assert [r["name"] for r in resp.json()["recommendations"]] == ["Biryani House"]
+
+    assert "query" not in canonical_preferences(UserPreference(location="BTM"))
+    assert canonical_preferences(UserPreference(query="  Rooftop   GRILL "))["query"] == "rooftop grill"
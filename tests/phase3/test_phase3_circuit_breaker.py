@@ -0,0 +1,123 @@
+import pytest
+
+from zomato_ai.phase3.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitOpenError,
+    CircuitState,
+    configure_llm_circuit_breaker,
+)
+from zomato_ai.phase3.rate_limit import LLMRateLimitedError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fail(breaker: CircuitBreaker) -> None:
+    with pytest.raises(RuntimeError):
+        with breaker.guard():
+            raise RuntimeError("groq down")
+
+
+def test_breaker_opens_short_circuits_and_recovers_via_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        CircuitBreakerConfig(failure_threshold=3, open_seconds=10, slow_call_seconds=5),
+        clock=clock,
+    )
+
+    for _ in range(3):
+        _fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+
+    # While open, calls are rejected before reaching the body.
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            raise AssertionError("should not run while open")
+
+    clock.now = 10.0
+    assert breaker.state == CircuitState.HALF_OPEN
+    with breaker.guard():
+        # Only one probe at a time.
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        clock.now = 11.0
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.open_for() == 0.0
+
+
+def test_failed_probe_reopens_and_slow_calls_count_as_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        CircuitBreakerConfig(failure_threshold=2, open_seconds=10, slow_call_seconds=5),
+        clock=clock,
+    )
+
+    for _ in range(2):
+        with breaker.guard():
+            clock.now += 6.0  # slow success
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now += 10.0
+    _fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+
+    # Client-side rejections neither trip nor heal the breaker.
+    healthy = CircuitBreaker(CircuitBreakerConfig(failure_threshold=1), clock=clock)
+    with pytest.raises(LLMRateLimitedError):
+        with healthy.guard():
+            raise LLMRateLimitedError("requests_per_minute")
+    assert healthy.state == CircuitState.CLOSED
+
+
+def test_interrupted_probe_frees_its_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=1, open_seconds=10), clock=clock)
+    _fail(breaker)
+    clock.now = 10.0
+
+    # E.g. the request was cancelled mid-call (asyncio.CancelledError is a BaseException).
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.guard():
+            raise KeyboardInterrupt
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    # The next probe is admitted instead of the breaker staying half-open forever.
+    with breaker.guard():
+        pass
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_open_breaker_skips_groq_in_orchestrator():
+    from zomato_ai.phase2.models import Restaurant, UserPreference
+    from zomato_ai.phase3.orchestrator import recommend_with_groq
+
+    class CountingClient:
+        model = "dummy"
+        calls = 0
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            CountingClient.calls += 1
+            raise RuntimeError("timeout")
+
+    prefs = UserPreference(location="Breaker Town", limit=1)
+    candidates = [
+        Restaurant(id=1, name="A", location="Breaker Town", cuisines=None,
+                   price_range=None, rating=4.0, score=8.0)
+    ]
+    configure_llm_circuit_breaker(CircuitBreakerConfig(failure_threshold=1, open_seconds=60))
+    try:
+        with pytest.raises(RuntimeError):
+            recommend_with_groq(client=CountingClient(), preferences=prefs,  # type: ignore[arg-type]
+                                candidates=candidates, limit=1)
+        with pytest.raises(CircuitOpenError):
+            recommend_with_groq(client=CountingClient(), preferences=prefs,  # type: ignore[arg-type]
+                                candidates=candidates, limit=1)
+    finally:
+        configure_llm_circuit_breaker(CircuitBreakerConfig())
+    assert CountingClient.calls == 1
@@ -0,0 +1,90 @@
+from collections import Counter
+
+import groq
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from loadtest.fake_groq import FakeGroqSettings, create_fake_groq_app
+from loadtest.run import PreferenceMix, _is_fallback, percentile
+from zomato_ai.phase2.models import Restaurant, UserPreference
+from zomato_ai.phase3.parsing import parse_llm_result
+from zomato_ai.phase3.prompt_builder import build_recommendation_prompt
+
+
+def _prompt():
+    candidates = [
+        Restaurant(id=rid, name=f"Resto {rid}", location="BTM", cuisines="Cafe", price_range=500, rating=4.0, score=8.0)
+        for rid in (7, 3, 9)
+    ]
+    return build_recommendation_prompt(preferences=UserPreference(location="BTM", limit=2), candidates=candidates, limit=2)
+
+
+def _sdk_client(app):
+    # The SDK sends its requests through the in-process app instead of the network.
+    return groq.Groq(api_key="fake", base_url="http://testserver", http_client=TestClient(app), max_retries=0)
+
+
+def test_fake_groq_answers_the_real_sdk():
+    system_prompt, user_prompt = _prompt()
+    client = _sdk_client(create_fake_groq_app())
+    resp = client.chat.completions.create(
+        model="llama-3.3-70b-versatile",
+        messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+        response_format={"type": "json_object"},
+    )
+    result = parse_llm_result(resp.choices[0].message.content)
+    # The first N candidate ids, in prompt order.
+    assert [r.id for r in result.recommendations] == [7, 3]
+
+
+def test_fake_groq_streams_to_the_real_sdk():
+    _, user_prompt = _prompt()
+    client = _sdk_client(create_fake_groq_app())
+    chunks = list(
+        client.chat.completions.create(
+            model="fake", messages=[{"role": "user", "content": user_prompt}], stream=True
+        )
+    )
+    assert len(chunks) > 1 and chunks[-1].choices[0].finish_reason == "stop"
+    content = "".join(c.choices[0].delta.content or "" for c in chunks)
+    assert [r.id for r in parse_llm_result(content).recommendations] == [7, 3]
+
+
+def test_fake_groq_injects_rate_limits_the_sdk_understands():
+    client = _sdk_client(create_fake_groq_app(FakeGroqSettings(rate_limit_rate=1.0, retry_after=2.0)))
+    with pytest.raises(groq.RateLimitError) as exc_info:
+        client.chat.completions.create(model="fake", messages=[{"role": "user", "content": "hi"}])
+    assert exc_info.value.response.headers["retry-after"] == "2"
+
+
+def test_runner_counts_fallbacks_per_endpoint():
+    def response(status, body=None):
+        return httpx.Response(status, json=body if body is not None else {})
+
+    assert _is_fallback("pipeline", response(200, {"summary": "Top 5 ...", "fallback": True}))
+    assert not _is_fallback("pipeline", response(200, {"summary": "Top 5 ...", "fallback": False}))
+    assert not _is_fallback("pipeline", response(503))
+    assert _is_fallback("llm", response(503))
+    assert not _is_fallback("llm", response(200))
+    assert not _is_fallback("filter", response(200, {"fallback": True}))
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0 and percentile([], 99) == 0.0
+
+
+def test_preference_mix_is_seeded_skewed_and_valid():
+    locations = [f"Area {i}" for i in range(20)]
+    cuisines = [f"Cuisine {i}" for i in range(10)]
+    payloads = [PreferenceMix(list(locations), list(cuisines), seed=5).next() for _ in range(2)]
+    assert payloads[0] == payloads[1]
+
+    mix = PreferenceMix(list(locations), list(cuisines), seed=5)
+    sample = [mix.next() for _ in range(4000)]
+    for payload in sample:
+        UserPreference.model_validate(payload)
+
+    by_location = Counter(p["location"] for p in sample if "location" in p)
+    assert 0.85 < sum(by_location.values()) / len(sample) < 0.95
+    # Zipf-like: the most popular location is drawn several times as often as the median one.
+    counts = sorted(by_location.values(), reverse=True)
+    assert counts[0] > 4 * counts[len(counts) // 2]
+    assert 0.55 < sum("preferred_cuisines" in p for p in sample) / len(sample) < 0.65
@@ -0,0 +1,118 @@
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.phase1.ingestion import create_schema, ingest_records
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase3.rate_limit import (
+    LLMAdmission,
+    LLMLimits,
+    LLMRateLimitedError,
+    TokenBucket,
+    configure_llm_admission,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, refill_per_second=1.0, clock=clock)
+
+    assert bucket.try_take(1)
+    assert bucket.try_take(1)
+    assert not bucket.try_take(1)
+
+    clock.now = 1.5
+    assert bucket.try_take(1)
+    assert bucket.available() == pytest.approx(0.5)
+
+
+def test_admission_rejects_over_budget_without_waiting():
+    clock = FakeClock()
+    admission = LLMAdmission(
+        LLMLimits(requests_per_minute=10, tokens_per_minute=1000, max_concurrency=1),
+        clock=clock,
+    )
+
+    admission.acquire(600)
+    # Concurrency slot is taken.
+    with pytest.raises(LLMRateLimitedError) as exc:
+        admission.acquire(100)
+    assert exc.value.reason == "concurrency"
+    admission.release()
+
+    # Token budget is exhausted; the request token must be refunded.
+    requests_before = admission.available_requests()
+    with pytest.raises(LLMRateLimitedError) as exc:
+        admission.acquire(600)
+    assert exc.value.reason == "tokens_per_minute"
+    assert admission.available_requests() == pytest.approx(requests_before)
+
+    admission.backoff(5)
+    with pytest.raises(LLMRateLimitedError) as exc:
+        admission.acquire(1)
+    assert exc.value.reason == "upstream_backoff"
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def test_pipeline_over_budget_goes_straight_to_heuristic(monkeypatch):
+    engine = _make_in_memory_engine()
+    create_schema(engine)
+    sample_records: List[Dict[str, Any]] = [
+        {
+            "name": "Fine Dine",
+            "location": "City Center",
+            "cuisines": "Italian, Continental",
+            "approx_cost(for two people)": "2,000",
+            "rate": "4.6/5",
+        },
+    ]
+    ingest_records(engine, sample_records)
+    monkeypatch.setenv("GROQ_API_KEY", "dummy-key")
+
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    calls: List[str] = []
+
+    class DummyGroqClient:
+        model = "dummy"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            calls.append(user_prompt)
+            return '{"summary": "LLM pick.", "recommendations": [{"id": 1, "reason": "Great."}]}'
+
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", DummyGroqClient)
+    configure_llm_admission(LLMLimits(requests_per_minute=1, tokens_per_minute=0, max_concurrency=0))
+    try:
+        client = TestClient(create_app(engine=engine))
+        first = client.post("/recommendations/pipeline", json={"location": "City Center", "limit": 1})
+        second = client.post("/recommendations/pipeline", json={"location": "City", "limit": 1})
+    finally:
+        configure_llm_admission(LLMLimits())
+
+    assert first.json()["summary"] == "LLM pick."
+    assert second.status_code == 200
+    assert second.json()["recommendations"][0]["name"] == "Fine Dine"
+    assert second.json()["summary"].startswith("Top 1")
+    assert len(calls) == 1
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+from zomato_ai.phase2.models import Restaurant, UserPreference
+from zomato_ai.phase3.orchestrator import recommend_with_groq, recommend_with_groq_async
+from zomato_ai.phase3.single_flight import COALESCE_FOLLOWERS, SingleFlight
+
+
+class SlowCountingClient:
+    """Dummy client that counts calls and holds each call open briefly."""
+
+    model = "dummy-model"
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return '{"summary": "ok", "recommendations": [{"id": 1, "reason": "Good."}]}'
+
+
+def _inputs():
+    prefs = UserPreference(location="City Center", preferred_cuisines=["Italian"], limit=1)
+    candidates = [
+        Restaurant(
+            id=1,
+            name="Resto A",
+            location="City Center",
+            cuisines="Italian, Pizza",
+            price_range=1200,
+            rating=4.5,
+            score=9.0,
+        )
+    ]
+    return prefs, candidates
+
+
+def test_identical_concurrent_requests_share_one_llm_call():
+    client = SlowCountingClient()
+    prefs, candidates = _inputs()
+    coalesced_before = COALESCE_FOLLOWERS.value()
+
+    results = []
+
+    def _call():
+        results.append(
+            recommend_with_groq(
+                client=client,  # type: ignore[arg-type]
+                preferences=prefs,
+                candidates=candidates,
+                limit=1,
+            )
+        )
+
+    threads = [threading.Thread(target=_call) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert client.calls == 1
+    assert len(results) == 5
+    assert all(r.recommendations[0].id == 1 for r in results)
+    assert COALESCE_FOLLOWERS.value() - coalesced_before == 4
+
+
+def test_async_callers_coalesce_and_errors_propagate():
+    client = SlowCountingClient()
+    prefs, candidates = _inputs()
+
+    async def _run():
+        return await asyncio.gather(
+            *[
+                recommend_with_groq_async(
+                    client=client,  # type: ignore[arg-type]
+                    preferences=prefs,
+                    candidates=candidates,
+                    limit=1,
+                )
+                for _ in range(4)
+            ]
+        )
+
+    results = asyncio.run(_run())
+    assert client.calls == 1
+    assert len(results) == 4
+
+    group = SingleFlight()
+
+    def _fail():
+        raise ValueError("upstream down")
+
+    try:
+        group.do("k", _fail)
+    except ValueError as exc:
+        assert "upstream down" in str(exc)
+    else:
+        raise AssertionError("leader exception should propagate")
+    assert group.in_flight() == 0
+
+
+def test_cancelling_one_async_waiter_leaves_the_others():
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def _slow():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    sync_results = []
+    sync_waiter = threading.Thread(target=lambda: sync_results.append(group.do("k", _slow)))
+
+    async def _run():
+        waiters = [asyncio.create_task(group.do_async("k", _slow)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        sync_waiter.start()
+        # A client disconnect cancels one awaiting request.
+        waiters[1].cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    results = asyncio.run(_run())
+    sync_waiter.join(5)
+
+    assert len(calls) == 1
+    assert results[0] == results[2] == "answer"
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert sync_results == ["answer"]
+    assert group.in_flight() == 0
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase4.events import log_recommendation_event
+from zomato_ai.phase4.rollups import refresh_rollups
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _log(engine, endpoint, preferences, candidates, returned):
+    log_recommendation_event(
+        engine=engine,
+        endpoint=endpoint,
+        preferences=preferences,
+        candidate_count=candidates,
+        returned_count=returned,
+    )
+
+
+def test_analytics_summary_reads_incremental_rollups():
+    engine = _make_in_memory_engine()
+    client = TestClient(create_app(engine=engine))
+
+    _log(engine, "/recommendations", {"location": "BTM", "preferred_cuisines": ["Pizza", "Cafe"]}, 0, 5)
+    _log(engine, "/recommendations", {"location": "btm ", "preferred_cuisines": ["pizza"]}, 0, 0)
+    _log(engine, "/recommendations/llm", {"location": "Indiranagar"}, 15, 5)
+
+    # Nothing is visible until a rollup pass runs.
+    assert client.get("/analytics/summary").json()["totals"]["event_count"] == 0
+    assert refresh_rollups(engine) == 3
+
+    body = client.get("/analytics/summary").json()
+    assert body["totals"] == {
+        "event_count": 3,
+        "zero_result_rate": 0.3333,
+        "avg_candidate_count": 5.0,
+        "avg_returned_count": 3.33,
+    }
+    assert [e["endpoint"] for e in body["endpoints"]] == ["/recommendations", "/recommendations/llm"]
+    assert body["endpoints"][0]["zero_result_rate"] == 0.5
+    assert [(d["value"], d["event_count"]) for d in body["top_locations"]] == [
+        ("btm", 2),
+        ("indiranagar", 1),
+    ]
+    assert [(d["value"], d["event_count"]) for d in body["top_cuisines"]] == [("pizza", 2), ("cafe", 1)]
+    assert sum(h["event_count"] for h in body["hourly"]) == 3
+
+    # A second pass only folds in events logged since the watermark.
+    _log(engine, "/recommendations/llm", {"location": "Indiranagar"}, 15, 0)
+    assert refresh_rollups(engine) == 1
+    body = client.get("/analytics/summary", params={"endpoint": "/recommendations/llm"}).json()
+    assert body["totals"]["event_count"] == 2
+    assert body["totals"]["zero_result_rate"] == 0.5
+    assert [(d["value"], d["event_count"]) for d in body["top_locations"]] == [("indiranagar", 2)]
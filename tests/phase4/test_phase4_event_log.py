@@ -0,0 +1,80 @@
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, select, text
+
+from zomato_ai.data.migrations import bootstrap_schema
+from zomato_ai.phase4.event_log import JsonlEventSink, compact_event_log
+from zomato_ai.phase4.event_writer import start_event_writer, stop_event_writer
+from zomato_ai.phase4.events import log_recommendation_event
+from zomato_ai.phase4.rollups import hourly_rollups_table, refresh_rollups
+
+
+def _count_events(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM recommendation_events")).scalar_one()
+
+
+def test_jsonl_sink_keeps_events_off_db_until_compaction(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}", future=True)
+    bootstrap_schema(engine)
+    log_dir = tmp_path / "event_log"
+
+    # Tiny segments so the 12 events span several rotated files.
+    sink = JsonlEventSink(log_dir, max_segment_bytes=200)
+    start_event_writer(engine, sink=sink, batch_size=3, flush_interval=0.01)
+    for i in range(12):
+        log_recommendation_event(
+            engine=engine,
+            endpoint="/recommendations" if i % 2 else "/recommendations/llm",
+            preferences={"location": "Area"},
+            candidate_count=10,
+            returned_count=0 if i < 3 else 2,
+        )
+    stop_event_writer(engine)
+
+    assert _count_events(engine) == 0
+    assert not list(log_dir.glob("*.open"))
+    assert len(list(log_dir.glob("*.jsonl"))) > 1
+
+    report = compact_event_log(engine, log_dir, keep_segments=True)
+    assert report.events == 12
+    assert report.rolled_up == 12
+    assert _count_events(engine) == 12
+    assert not list(log_dir.glob("*.jsonl"))
+
+    # Re-running is a no-op, even if an archived segment is put back.
+    archived = next((log_dir / "compacted").iterdir())
+    archived.rename(log_dir / archived.name)
+    assert compact_event_log(engine, log_dir).events == 0
+    assert refresh_rollups(engine) == 0
+    assert _count_events(engine) == 12
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(hourly_rollups_table)).mappings().all()
+    assert sum(r["event_count"] for r in rows) == 12
+    assert sum(r["zero_result_count"] for r in rows) == 3
+    assert sum(r["returned_sum"] for r in rows) == 18
+    assert {r["endpoint"] for r in rows} == {"/recommendations", "/recommendations/llm"}
+
+
+def test_idle_segment_is_closed_once_it_is_old_enough(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}", future=True)
+    bootstrap_schema(engine)
+    log_dir = tmp_path / "event_log"
+
+    sink = JsonlEventSink(log_dir, max_segment_seconds=1.0)
+    try:
+        sink.write_many(
+            [{"created_at": datetime.now(timezone.utc), "endpoint": "/recommendations", "preferences_json": "{}",
+              "candidate_count": 1, "returned_count": 1, "restaurant_ids": None}]
+        )
+        assert list(log_dir.glob("*.open"))
+        # No further writes: the timer, not the next event, closes the segment.
+        deadline = time.monotonic() + 5
+        while not list(log_dir.glob("*.jsonl")) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not list(log_dir.glob("*.open"))
+        assert compact_event_log(engine, log_dir).events == 1
+    finally:
+        sink.close()
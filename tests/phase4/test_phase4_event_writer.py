@@ -0,0 +1,62 @@
+import time
+
+from sqlalchemy import create_engine, text
+
+from zomato_ai.phase4.event_writer import (
+    EVENTS_DROPPED,
+    BackgroundEventWriter,
+    get_event_writer,
+    start_event_writer,
+    stop_event_writer,
+)
+from zomato_ai.phase4.events import create_schema, log_recommendation_event
+
+
+def _count_events(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM recommendation_events")).scalar_one()
+
+
+def test_background_writer_batches_and_flushes_on_shutdown(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}", future=True)
+    create_schema(engine)
+
+    # Long interval: nothing is written until the batch fills or we shut down.
+    writer = start_event_writer(engine, batch_size=1000, flush_interval=60.0)
+    assert get_event_writer(engine) is writer
+
+    for i in range(25):
+        log_recommendation_event(
+            engine=engine,
+            endpoint="/recommendations",
+            preferences={"location": f"Area {i}"},
+            candidate_count=i,
+            returned_count=1,
+        )
+
+    # Shut down only once the worker holds every event and is blocked
+    # waiting (up to flush_interval) for more; close() must wake it.
+    deadline = time.monotonic() + 5
+    while not writer._queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    stop_event_writer(engine, timeout=5.0)
+    assert time.monotonic() - started < 2
+    assert get_event_writer(engine) is None
+    assert _count_events(engine) == 25
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}", future=True)
+    create_schema(engine)
+
+    # Not started: nothing drains the queue.
+    writer = BackgroundEventWriter(engine, max_queue=2)
+    dropped_before = EVENTS_DROPPED.value(reason="queue_full")
+
+    accepted = [writer.submit({"n": i}) for i in range(5)]
+
+    assert accepted == [True, True, False, False, False]
+    assert EVENTS_DROPPED.value(reason="queue_full") - dropped_before == 3
@@ -0,0 +1,143 @@
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.data.migrations import bootstrap_schema
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase4.event_writer import start_event_writer, stop_event_writer
+from zomato_ai.phase4.events import log_recommendation_event
+from zomato_ai.phase4.popularity import (
+    SELECTIONS_STREAM,
+    PopularityPriors,
+    build_priors,
+    configure_popularity_priors,
+    get_popularity_priors,
+    load_popularity_priors,
+    log_selection,
+    refresh_popularity,
+    restaurant_popularity_table,
+    update_popularity_counts,
+)
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def test_selections_raise_ranking_through_popularity_prior():
+    engine = _make_in_memory_engine()
+    records: List[Dict[str, Any]] = [
+        {"name": name, "location": "BTM", "cuisines": "Cafe", "approx_cost(for two people)": "500", "rate": "4.0/5"}
+        for name in ("Alpha", "Bravo", "Charlie")
+    ]
+    ingest_records(engine, records)
+    client = TestClient(create_app(engine=engine))
+
+    try:
+        load_popularity_priors(engine, weight=1.0)
+        first = client.post("/recommendations", json={"location": "BTM"}).json()["recommendations"]
+        assert {r["score"] for r in first} == {8.0}
+        picked = next(r["id"] for r in first if r["name"] == "Charlie")
+
+        for _ in range(5):
+            assert client.post("/events/selection", json={"restaurant_id": picked}).status_code == 204
+
+        # Priors only change when the job runs; the request path never queries them.
+        assert get_popularity_priors().prior(picked) == 0.0
+        assert refresh_popularity(engine) == 6
+        assert get_popularity_priors().prior(picked) == 1.0
+
+        ranked = client.post("/recommendations", json={"location": "BTM"}).json()["recommendations"]
+        assert ranked[0]["name"] == "Charlie"
+        assert ranked[0]["score"] == 9.0
+        assert all(r["score"] < 9.0 for r in ranked[1:])
+
+        # Incremental: a second pass only consumes the new impression event.
+        assert refresh_popularity(engine) == 1
+    finally:
+        configure_popularity_priors(PopularityPriors())
+
+
+def test_counts_are_folded_in_bounded_batches():
+    engine = _make_in_memory_engine()
+    bootstrap_schema(engine)
+    for i in range(5):
+        log_recommendation_event(
+            engine=engine, endpoint="/recommendations", preferences={}, candidate_count=2,
+            returned_count=2, restaurant_ids=[1, 2 + i % 2],
+        )
+        log_selection(engine=engine, restaurant_id=1)
+    log_selection(engine=engine, restaurant_id=3)
+
+    statements: List[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert update_popularity_counts(engine, batch_size=2) == 11
+    selects = [s for s in statements if "FROM restaurant_selections" in s]
+    # Three full batches of selections, then one that finds nothing left.
+    assert len(selects) == 4 and all("LIMIT" in s for s in selects)
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(restaurant_popularity_table)).all()
+    counts = {r.restaurant_id: (r.impressions, r.selections) for r in rows}
+    assert counts == {1: (5, 5), 2: (3, 0), 3: (2, 1)}
+    assert update_popularity_counts(engine, batch_size=2) == 0
+
+
+def test_selections_are_queued_when_a_writer_runs():
+    engine = _make_in_memory_engine()
+    written: List[Dict[str, Any]] = []
+
+    class ListSink:
+        def write_many(self, batch):
+            written.extend(batch)
+
+        def close(self):
+            pass
+
+    start_event_writer(engine, stream=SELECTIONS_STREAM, sink=ListSink(), flush_interval=0.01)
+    try:
+        # No table exists yet: an inline write would fail.
+        log_selection(engine=engine, restaurant_id=7, endpoint="/recommendations")
+    finally:
+        stop_event_writer(engine, stream=SELECTIONS_STREAM)
+    assert [(r["restaurant_id"], r["endpoint"]) for r in written] == [(7, "/recommendations")]
+
+
+def test_huge_selection_ids_cannot_blow_up_the_priors(monkeypatch):
+    engine = _make_in_memory_engine()
+    ingest_records(engine, [{"name": "Alpha", "location": "BTM", "rate": "4.0/5"}])
+    client = TestClient(create_app(engine=engine))
+
+    try:
+        assert client.post("/events/selection", json={"restaurant_id": 10**12}).status_code == 404
+        # A row that got in anyway (e.g. logged before ids were checked).
+        log_selection(engine=engine, restaurant_id=10**12)
+        log_selection(engine=engine, restaurant_id=1)
+        assert refresh_popularity(engine) == 2
+        priors = get_popularity_priors()
+        assert len(priors) == 1 and priors.prior(1) == 1.0 and priors.prior(10**12) == 0.0
+        assert build_priors({10**12: (1, 1)}, weight=1.0).prior(10**12) == 1.0
+
+        # Restarting survives a priors load that fails outright.
+        import zomato_ai.phase4.popularity as popularity_mod
+
+        def fail(*args, **kwargs):
+            raise MemoryError
+
+        monkeypatch.setattr(popularity_mod, "load_popularity_priors", fail)
+        restarted = TestClient(create_app(engine=engine))
+        assert len(get_popularity_priors()) == 0
+        assert restarted.post("/recommendations", json={"location": "BTM"}).status_code == 200
+        # The periodic refresh keeps going too (consuming the impression above).
+        assert refresh_popularity(engine) == 1
+        assert len(get_popularity_priors()) == 0
+    finally:
+        configure_popularity_priors(PopularityPriors())
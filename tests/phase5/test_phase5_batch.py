@@ -0,0 +1,156 @@
+import json
+import re
+import threading
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.phase1.ingestion import create_schema, ingest_records
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase3.rate_limit import LLMLimits, configure_llm_admission
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _seed_sample_data(engine) -> None:
+    create_schema(engine)
+    sample_records: List[Dict[str, Any]] = [
+        {
+            "name": "Fine Dine",
+            "location": "City Center",
+            "cuisines": "Italian, Continental",
+            "approx_cost(for two people)": "2,000",
+            "rate": "4.6/5",
+        },
+        {
+            "name": "Budget Bites",
+            "location": "City Center",
+            "cuisines": "Italian, Pizza",
+            "approx_cost(for two people)": "500",
+            "rate": "3.8/5",
+        },
+        {
+            "name": "Spicy House",
+            "location": "Old Town",
+            "cuisines": "Indian, Biryani",
+            "approx_cost(for two people)": "800",
+            "rate": "4.2/5",
+        },
+    ]
+    ingest_records(engine, sample_records)
+
+
+def test_batch_endpoint_groups_queries_and_preserves_order(monkeypatch):
+    engine = _make_in_memory_engine()
+    _seed_sample_data(engine)
+    monkeypatch.setenv("GROQ_API_KEY", "dummy-key")
+
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    prompts: List[str] = []
+
+    class DummyGroqClient:
+        model = "dummy"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            prompts.append(user_prompt)
+            # Answer each query section with its first candidate ID.
+            results = []
+            for query_id, section in re.findall(r"### Query (Q\d+)\n(.*?)Select the best", user_prompt, re.S):
+                first_id = int(re.search(r"^(\d+) \|", section, re.M).group(1))
+                results.append(
+                    {"query": query_id, "summary": f"Picks for {query_id}.",
+                     "recommendations": [{"id": first_id, "reason": "Batched pick."}]}
+                )
+            return json.dumps({"results": results})
+
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", DummyGroqClient)
+
+    client = TestClient(create_app(engine=engine))
+    resp = client.post(
+        "/recommendations/batch",
+        json={
+            "items": [
+                {"location": "City Center", "limit": 1},
+                {"location": "Old Town", "limit": 1},
+                {"location": "Nowhere", "limit": 1},
+                {"limit": 500},
+                {"location": "City Center", "limit": 1},
+            ]
+        },
+    )
+
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+
+    # Two distinct non-empty queries share a single LLM call.
+    assert len(prompts) == 1
+
+    assert results[0]["result"]["recommendations"][0]["name"] == "Fine Dine"
+    assert results[0]["result"]["recommendations"][0]["reason"] == "Batched pick."
+    assert results[1]["result"]["recommendations"][0]["name"] == "Spicy House"
+    assert results[2]["result"] == {"summary": "No matches found.", "recommendations": [], "fallback": False}
+    assert results[3]["result"] is None
+    assert "Invalid preferences" in results[3]["error"]
+    assert results[4]["result"] == results[0]["result"]
+
+
+def test_batch_items_that_are_not_objects_fail_individually(monkeypatch):
+    engine = _make_in_memory_engine()
+    _seed_sample_data(engine)
+    monkeypatch.setenv("GROQ_API_KEY", "dummy-key")
+    client = TestClient(create_app(engine=engine))
+    resp = client.post("/recommendations/batch", json={"items": [5, "City Center", None, [], {"limit": 0}]})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert all(r["result"] is None and "Invalid preferences" in r["error"] for r in results)
+
+
+def test_batch_llm_calls_run_concurrently(monkeypatch):
+    engine = _make_in_memory_engine()
+    _seed_sample_data(engine)
+    monkeypatch.setenv("GROQ_API_KEY", "dummy-key")
+
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    # Each call waits for the other one: run one after the other, both time out.
+    both_in_flight = threading.Barrier(2, timeout=5)
+
+    class DummyGroqClient:
+        model = "dummy"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            both_in_flight.wait()
+            first_id = int(user_prompt.split("):\n", 1)[1].split(" |", 1)[0])
+            return json.dumps({"summary": "Concurrent.", "recommendations": [{"id": first_id, "reason": "Picked."}]})
+
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", DummyGroqClient)
+    configure_llm_admission(LLMLimits(max_concurrency=2))
+    try:
+        client = TestClient(create_app(engine=engine))
+        # Queries asking for more than BATCH_SMALL_QUERY_LIMIT get a call each.
+        resp = client.post(
+            "/recommendations/batch",
+            json={"items": [{"location": "City Center", "limit": 11}, {"location": "Old Town", "limit": 11}]},
+        )
+    finally:
+        configure_llm_admission(LLMLimits())
+
+    assert [r["result"]["summary"] for r in resp.json()["results"]] == ["Concurrent.", "Concurrent."]
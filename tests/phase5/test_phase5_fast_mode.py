@@ -0,0 +1,72 @@
+import json
+import re
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase5.reasons import generate_reason_templates
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def test_fast_mode_uses_stored_reason_templates_without_llm(monkeypatch):
+    engine = _make_in_memory_engine()
+    records: List[Dict[str, Any]] = [
+        {"name": "Fine Dine", "location": "City Center", "cuisines": "Italian, Continental",
+         "approx_cost(for two people)": "2,000", "rate": "4.6/5"},
+        {"name": "Budget Bites", "location": "City Center", "cuisines": "Italian, Pizza",
+         "approx_cost(for two people)": "500", "rate": "3.8/5"},
+    ]
+    ingest_records(engine, records)
+
+    class BulkReasonClient:
+        model = "dummy"
+        calls = 0
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            BulkReasonClient.calls += 1
+            # Describe only the first restaurant; the other falls back to the local stand-in.
+            first_id = int(re.search(r"^(\d+) \|", user_prompt, re.M).group(1))
+            return json.dumps({"reasons": [{"id": first_id, "reason": "Elegant Italian dining."}]})
+
+    report = generate_reason_templates(engine, client=BulkReasonClient(), batch_size=10)
+    assert (report.llm, report.local, report.skipped) == (1, 1, 0)
+    assert BulkReasonClient.calls == 1
+    assert generate_reason_templates(engine).skipped == 2
+
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    class FailingGroqClient:
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("fast mode must not call the LLM")
+
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", FailingGroqClient)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    client = TestClient(create_app(engine=engine))
+
+    resp = client.post(
+        "/recommendations/pipeline",
+        params={"mode": "fast"},
+        json={"location": "City Center", "preferred_cuisines": ["pizza", "Continental"]},
+    )
+    assert resp.status_code == 200
+    recs = resp.json()["recommendations"]
+    assert [r["name"] for r in recs] == ["Fine Dine", "Budget Bites"]
+    assert recs[0]["reason"] == "Elegant Italian dining. Matches your search: Continental; in City Center."
+    assert recs[1]["reason"] == (
+        "Budget Bites serves Italian, Pizza in City Center, and is rated 3.8/5 and costs about "
+        "₹500 for two. Matches your search: Pizza; in City Center."
+    )
+
+    assert client.post("/recommendations/pipeline", params={"mode": "slow"}, json={}).status_code == 422
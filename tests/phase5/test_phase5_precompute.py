@@ -0,0 +1,109 @@
+import json
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.data.data_version import (
+    NO_DATA_VERSION,
+    bump_data_version,
+    current_data_version,
+    fetch_data_version,
+)
+from zomato_ai.data.migrations import bootstrap_schema
+from zomato_ai.phase1.ingestion import ingest_records
+from zomato_ai.phase2.api import create_app
+from zomato_ai.phase5.precompute import precompute_hot_queries
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _record(name: str, location: str) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "location": location,
+        "cuisines": "Italian, Pizza",
+        "approx_cost(for two people)": "800",
+        "rate": "4.2/5",
+    }
+
+
+def test_hot_queries_are_served_from_precompute_until_data_changes(monkeypatch):
+    engine = _make_in_memory_engine()
+    ingest_records(engine, [_record("Fine Dine", "City Center"), _record("Spicy House", "Old Town")])
+    monkeypatch.setenv("GROQ_API_KEY", "dummy-key")
+
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    calls: List[str] = []
+
+    class DummyGroqClient:
+        model = "dummy"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            calls.append(user_prompt)
+            first_id = int(user_prompt.split("):\n", 1)[1].split(" |", 1)[0])
+            return json.dumps(
+                {"summary": f"Call {len(calls)}.", "recommendations": [{"id": first_id, "reason": "Good."}]}
+            )
+
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", DummyGroqClient)
+    client = TestClient(create_app(engine=engine))
+
+    hot = {"location": "City Center", "limit": 1}
+    for _ in range(3):
+        assert client.post("/recommendations/pipeline", json=hot).status_code == 200
+    client.post("/recommendations/pipeline", json={"location": "Old Town", "limit": 1})
+
+    report = precompute_hot_queries(engine, top_n=1, max_per_minute=None)
+    assert (report.total_requests, report.shapes_seen, report.shapes_precomputed) == (4, 2, 1)
+    assert report.coverage == 0.75
+
+    # Same shape, different spelling: served from the table, no LLM call.
+    before = len(calls)
+    resp = client.post("/recommendations/pipeline", json={"location": "city center", "limit": 1})
+    assert resp.json()["summary"] == f"Call {before}."
+    assert len(calls) == before
+
+    # New data invalidates the stored result; the pipeline computes live again.
+    ingest_records(engine, [_record("New Place", "City Center")])
+    resp = client.post("/recommendations/pipeline", json=hot)
+    assert len(calls) == before + 1
+    assert resp.json()["summary"] == f"Call {before + 1}."
+
+
+def test_data_version_is_bumped_by_ingest_and_cached_between(monkeypatch):
+    engine = _make_in_memory_engine()
+    bootstrap_schema(engine)
+    assert fetch_data_version(engine) == NO_DATA_VERSION
+    ingest_records(engine, [_record("Fine Dine", "City Center")])
+    assert fetch_data_version(engine) == "1"
+
+    statements: List[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert current_data_version(engine) == "1"
+    assert current_data_version(engine) == "1"
+    assert len(statements) == 1
+
+    # Replacing the rows with the same number of rows still moves the version on.
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM restaurants"))
+    ingest_records(engine, [_record("Spicy House", "Old Town")])
+    monkeypatch.setenv("ZOMATO_DATA_VERSION_TTL_SECONDS", "0")
+    assert current_data_version(engine) == "2"
+
+    # Writes from another process show up once the cached value expires.
+    with engine.begin() as conn:
+        bump_data_version(conn)
+    assert current_data_version(engine) == "3"
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from zomato_ai.metrics import REGISTRY, STAGE_SECONDS, MetricsRegistry
+from zomato_ai.phase1.ingestion import create_schema, ingest_records
+from zomato_ai.phase2.api import HTTP_REQUEST_SECONDS, create_app
+from zomato_ai.phase5.pipeline import PIPELINE_FALLBACKS
+
+
+def _make_in_memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _seed_sample_data(engine) -> None:
+    create_schema(engine)
+    sample_records: List[Dict[str, Any]] = [
+        {
+            "name": "Fine Dine",
+            "location": "City Center",
+            "cuisines": "Italian, Continental",
+            "approx_cost(for two people)": "2,000",
+            "rate": "4.6/5",
+        },
+        {
+            "name": "Budget Bites",
+            "location": "City Center",
+            "cuisines": "Italian, Pizza",
+            "approx_cost(for two people)": "500",
+            "rate": "3.8/5",
+        },
+    ]
+    ingest_records(engine, sample_records)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", labelnames=("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(2.0, stage="a")
+
+    assert registry.histogram("demo_seconds", "Demo.") is histogram
+    assert histogram.count(stage="a") == 3
+    lines = registry.render().splitlines()
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_sum{stage="a"} 2.55' in lines
+    assert 'demo_seconds_count{stage="a"} 3' in lines
+
+
+def test_pipeline_records_stage_timings_and_fallbacks(monkeypatch):
+    engine = _make_in_memory_engine()
+    _seed_sample_data(engine)
+    monkeypatch.setenv("GROQ_API_KEY", "dummy-key")
+
+    import zomato_ai.phase5.pipeline as pipeline_mod
+
+    class DummyGroqClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            return '{"summary": "Picked.", "recommendations": [{"id": 1, "reason": "Great."}]}'
+
+    class BrokenGroqClient(DummyGroqClient):
+        def complete_json(self, *, system_prompt: str, user_prompt: str) -> str:
+            return "not json at all"
+
+    stages = ("db_fetch", "dedup", "filter", "prompt_build", "llm", "parse", "join", "event_log")
+    before = {stage: STAGE_SECONDS.count(stage=stage) for stage in stages}
+    no_match_before = PIPELINE_FALLBACKS.value(reason="no_match")
+    parse_errors_before = REGISTRY.get("zomato_llm_errors_total").value(error="parse")
+
+    client = TestClient(create_app(engine=engine))
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", DummyGroqClient)
+    resp = client.post("/recommendations/pipeline", json={"location": "City Center", "limit": 1})
+    assert resp.status_code == 200
+    assert resp.json()["fallback"] is False
+    for stage in stages:
+        assert STAGE_SECONDS.count(stage=stage) == before[stage] + 1, stage
+
+    monkeypatch.setattr(pipeline_mod, "GroqLLMClient", BrokenGroqClient)
+    resp = client.post("/recommendations/pipeline", json={"location": "City Center", "limit": 2})
+    assert resp.status_code == 200
+    assert resp.json()["fallback"] is True
+    assert PIPELINE_FALLBACKS.value(reason="llm_error") >= 1
+    assert PIPELINE_FALLBACKS.value(reason="no_match") == no_match_before
+    assert REGISTRY.get("zomato_llm_errors_total").value(error="parse") == parse_errors_before + 1
+
+
+def test_metrics_endpoint_exposes_request_histogram():
+    engine = _make_in_memory_engine()
+    _seed_sample_data(engine)
+    client = TestClient(create_app(engine=engine))
+
+    before = HTTP_REQUEST_SECONDS.count(method="GET", route="/locations", status="200")
+    assert client.get("/locations").status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+    assert HTTP_REQUEST_SECONDS.count(method="GET", route="/locations", status="200") == before + 1
+    assert HTTP_REQUEST_SECONDS.count(method="GET", route="unmatched", status="404") >= 1
+
+    body = client.get("/metrics").text
+    assert 'zomato_http_request_duration_seconds_bucket{method="GET",route="/locations",status="200",le="+Inf"}' in body
+    assert 'zomato_stage_duration_seconds_count{stage="db_fetch"}' in body
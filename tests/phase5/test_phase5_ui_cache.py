@@ -0,0 +1,77 @@
+import gzip
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import zomato_ai.phase5.ui as ui_mod
+from zomato_ai.phase5.ui import INDEX_PATH, StaticAsset, mount_ui
+
+
+def _client(**kwargs) -> TestClient:
+    app = FastAPI()
+    mount_ui(app, **kwargs)
+    return TestClient(app)
+
+
+def test_index_loaded_once_and_served_gzipped(monkeypatch):
+    loads = []
+    original = StaticAsset.load.__func__
+
+    def counting_load(cls, path):
+        loads.append(path)
+        return original(cls, path)
+
+    monkeypatch.setattr(StaticAsset, "load", classmethod(counting_load))
+    client = _client(reload=False)
+
+    for _ in range(3):
+        resp = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert resp.headers["cache-control"] == ui_mod.CACHE_CONTROL
+        assert resp.text == INDEX_PATH.read_text(encoding="utf-8")
+    assert len(loads) == 1
+
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != resp.headers["etag"]
+
+
+def test_etag_revalidation_returns_304():
+    client = _client(reload=False)
+    first = client.get("/", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+
+    again = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    weak = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+
+    stale = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+
+
+def test_gzip_variant_is_deterministic():
+    asset = StaticAsset.load(INDEX_PATH)
+    assert gzip.decompress(asset.gzip) == asset.identity
+    assert StaticAsset.load(INDEX_PATH).gzip == asset.gzip
+
+
+def test_reload_picks_up_changed_file(tmp_path):
+    page = tmp_path / "index.html"
+    page.write_text("<h1>one</h1>", encoding="utf-8")
+    client = _client(path=page, reload=True)
+    first = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert first.text == "<h1>one</h1>"
+
+    page.write_text("<h1>two</h1>", encoding="utf-8")
+    stat = page.stat()
+    os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert second.text == "<h1>two</h1>"
+    assert second.headers["etag"] != first.headers["etag"]